@@ -0,0 +1 @@
+# Benchmarks package for IFC Translate Tool
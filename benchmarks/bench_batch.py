@@ -0,0 +1,88 @@
+"""
+Batch Throughput Benchmark
+
+Runs the same batch of IFC files through BatchRunner in serial,
+thread-pool and process-pool mode and reports wall time and throughput
+for each.
+
+Usage (run from project root):
+    python -m benchmarks.bench_batch INPUT_DIR [--workers N] [--x 100 --y 50] [--strategy fast_text]
+"""
+
+import argparse
+import queue
+import tempfile
+import threading
+import time
+
+from src.batch import (
+    BatchRunner,
+    EXECUTION_MODES,
+    build_transform_kwargs,
+    default_worker_count
+)
+from src.model import IFCTransformModel, TRANSFORM_STRATEGIES, STRATEGY_IFCPATCH
+from src.utils.validation import find_ifc_files
+
+
+def run_mode(mode: str, files, transform_kwargs: dict, workers: int) -> dict:
+    """
+    Run one batch in the given mode and measure it.
+
+    Returns:
+        Dictionary with mode, seconds, files_per_s, mb_per_s and errors
+    """
+    result_queue = queue.Queue()
+    total_bytes = sum(f.stat().st_size for f in files)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        runner = BatchRunner(IFCTransformModel(), workers=workers, mode=mode)
+        start = time.perf_counter()
+        runner.run(files, output_dir, transform_kwargs, result_queue, threading.Event())
+        elapsed = time.perf_counter() - start
+
+    errors = 0
+    while not result_queue.empty():
+        if result_queue.get_nowait().get('type') == 'batch_error':
+            errors += 1
+
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'files_per_s': len(files) / elapsed,
+        'mb_per_s': total_bytes / 1e6 / elapsed,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch execution modes")
+    parser.add_argument('input_dir', help="Directory of IFC files to transform")
+    parser.add_argument('--workers', type=int, default=default_worker_count())
+    parser.add_argument('--x', type=float, default=100.0)
+    parser.add_argument('--y', type=float, default=50.0)
+    parser.add_argument('--z', type=float, default=0.0)
+    parser.add_argument('--rotation', type=float, default=0.0)
+    parser.add_argument('--strategy', choices=TRANSFORM_STRATEGIES, default=STRATEGY_IFCPATCH)
+    args = parser.parse_args()
+
+    files = find_ifc_files(args.input_dir)
+    if not files:
+        parser.error(f"No IFC files found in {args.input_dir}")
+
+    transform_kwargs = build_transform_kwargs({
+        'x': args.x, 'y': args.y, 'z': args.z,
+        'rotation': args.rotation, 'rotate_first': True,
+        'strategy': args.strategy
+    })
+
+    print(f"{len(files)} files, {args.workers} workers, strategy {args.strategy}")
+    print(f"{'mode':<10}{'seconds':>10}{'files/s':>10}{'MB/s':>10}{'errors':>8}")
+    for mode in EXECUTION_MODES:
+        r = run_mode(mode, files, transform_kwargs, args.workers)
+        print(f"{r['mode']:<10}{r['seconds']:>10.2f}{r['files_per_s']:>10.2f}"
+              f"{r['mb_per_s']:>10.2f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Operation Chain Equivalence Check
+
+Transforms each IFC file with an operation chain in a single pass, and
+again by applying each step of the chain as its own full transformation
+(each pass reading the previous pass's output), then checks every product
+ends up at the same absolute placement both ways. Reports the time of the
+single pass against the step-by-step passes.
+
+Usage (run from project root):
+    python -m benchmarks.bench_chain INPUT.ifc [INPUT_DIR ...] [--strategy native]
+    python -m benchmarks.bench_chain corpus/ --operations '[{"op": "rotate", "angle": 90}]'
+
+Exits with status 1 if any single-pass output differs from the step-by-step result.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_strategies import collect_files, compare_placements, load_placements
+from src.model import IFCTransformModel, STRATEGY_NATIVE, STRATEGY_GEOREFERENCE, TRANSFORM_STRATEGIES
+
+
+# Rotate about a pivot, translate, rotate again about the origin
+DEFAULT_OPERATIONS = [
+    {"op": "rotate", "angle": 30.0, "pivot": [100.0, 50.0]},
+    {"op": "translate", "x": 250.0, "y": -40.0, "z": 2.0},
+    {"op": "rotate", "angle": -12.0},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a single-pass operation chain against step-by-step passes")
+    parser.add_argument('inputs', nargs='+', help="IFC files or directories of IFC files")
+    parser.add_argument('--operations', type=json.loads, default=DEFAULT_OPERATIONS,
+                        help="Operation chain as JSON (default: rotate about a pivot, translate, rotate)")
+    parser.add_argument('--strategy', choices=[s for s in TRANSFORM_STRATEGIES if s != STRATEGY_GEOREFERENCE],
+                        default=STRATEGY_NATIVE, help="Transform method used for every pass")
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help="Allowed placement difference in project units")
+    args = parser.parse_args()
+
+    model = IFCTransformModel()
+    failed = 0
+    print(f"{len(args.operations)} steps, {args.strategy}")
+    print(f"{'file':<32}{'chain s':>10}{'steps s':>10}{'speedup':>10}{'max dev':>12}  result")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for input_file in collect_files(args.inputs):
+            chained = os.path.join(output_dir, "chained.ifc")
+            start = time.perf_counter()
+            model.transform_file(str(input_file), chained, strategy=args.strategy, operations=args.operations)
+            chain_seconds = time.perf_counter() - start
+
+            current = str(input_file)
+            start = time.perf_counter()
+            for index, operation in enumerate(args.operations):
+                step_output = os.path.join(output_dir, f"step{index}.ifc")
+                model.transform_file(current, step_output, strategy=args.strategy, operations=[operation])
+                current = step_output
+            step_seconds = time.perf_counter() - start
+
+            mismatches, deviation = compare_placements(load_placements(current), chained, args.tolerance)
+            result = "ok" if mismatches == 0 else f"{mismatches} placements differ"
+            failed += mismatches > 0
+            print(f"{input_file.name:<32}{chain_seconds:>10.2f}{step_seconds:>10.2f}"
+                  f"{step_seconds / chain_seconds:>9.1f}x{deviation:>12.2e}  {result}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
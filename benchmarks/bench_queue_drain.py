@@ -0,0 +1,133 @@
+"""
+GUI Queue Drain Benchmark
+
+Floods TransformController's result queue with batch progress messages
+from a worker thread (as a batch of thousands of tiny files would) and
+measures how far the progress display falls behind, using a stand-in for
+the Tk view whose redraws take a fixed time. Reports the worst display lag,
+how long after the last message the completion summary appeared, and the
+number of redraws.
+
+No display is needed. Exits with status 1 if the completion lag exceeds
+--max-lag.
+
+Usage (run from project root):
+    python -m benchmarks.bench_queue_drain [--events 10000] [--redraw-ms 2] [--max-lag 1.0]
+"""
+
+import argparse
+import heapq
+import itertools
+import threading
+import time
+
+from src.controller import TransformController
+
+
+class FakeRoot:
+    """Minimal Tk root: runs after() callbacks from a timer heap."""
+
+    def __init__(self):
+        self._timers = []
+        self._counter = itertools.count()
+        self.running = True
+
+    def after(self, ms: int, callback):
+        heapq.heappush(self._timers, (time.monotonic() + ms / 1000, next(self._counter), callback))
+
+    def mainloop(self):
+        while self.running and self._timers:
+            due, _, callback = heapq.heappop(self._timers)
+            time.sleep(max(0.0, due - time.monotonic()))
+            callback()
+
+
+class FakeView:
+    """Records what the controller displays; each progress redraw costs redraw_s."""
+
+    def __init__(self, redraw_s: float):
+        self.root = FakeRoot()
+        self.redraw_s = redraw_s
+        self.redraws = 0
+        self.max_lag = 0.0
+        self.completed_at = None
+        self.posted = {}
+
+    def update_batch_progress(self, current, total, filename, fraction=None, detail=""):
+        self.max_lag = max(self.max_lag, time.monotonic() - self.posted[current])
+        self.redraws += 1
+        time.sleep(self.redraw_s)
+
+    def show_success(self, message):
+        self.completed_at = time.monotonic()
+        self.root.running = False
+
+    show_error = show_success
+
+    def __getattr__(self, name):
+        # Any other view call is a no-op
+        return lambda *args, **kwargs: None
+
+
+class NoPresets:
+    """Presets model stand-in with nothing saved."""
+
+    def list_presets(self):
+        return []
+
+    def search_presets(self, prefix, limit=None):
+        return []
+
+    def get_last_used(self):
+        return None
+
+
+def flood(controller, view, events: int, total: int) -> float:
+    """Post progress messages as fast as possible, then batch_complete; return end time."""
+    for current in range(1, events + 1):
+        view.posted[current] = time.monotonic()
+        controller.result_queue.put({
+            'type': 'batch_progress',
+            'current': current,
+            'total': total,
+            'filename': f"file_{current}.ifc"
+        })
+    finished = time.monotonic()
+    controller.result_queue.put({
+        'type': 'batch_complete', 'total': total, 'errors': 0, 'skipped': 0, 'deduplicated': 0,
+        'timings': None
+    })
+    return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GUI progress lag under a message flood")
+    parser.add_argument('--events', type=int, default=10_000)
+    parser.add_argument('--redraw-ms', type=float, default=2.0,
+                        help="Simulated cost of one progress bar redraw")
+    parser.add_argument('--max-lag', type=float, default=1.0,
+                        help="Allowed seconds between the last message and the summary dialog")
+    args = parser.parse_args()
+
+    view = FakeView(args.redraw_ms / 1000)
+    controller = TransformController(model=None, view=view, presets_model=NoPresets())
+
+    finished = {}
+    producer = threading.Thread(
+        target=lambda: finished.setdefault('at', flood(controller, view, args.events, args.events))
+    )
+    start = time.monotonic()
+    producer.start()
+    view.root.mainloop()
+    producer.join()
+
+    completion_lag = view.completed_at - finished['at']
+    print(f"{args.events} events posted in {finished['at'] - start:.2f}s")
+    print(f"Progress redraws:      {view.redraws}")
+    print(f"Worst display lag:     {view.max_lag:.3f}s")
+    print(f"Completion lag:        {completion_lag:.3f}s")
+    raise SystemExit(0 if completion_lag <= args.max_lag else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Transform Strategy Benchmark and Equivalence Check
+
+Transforms each IFC file of a corpus with the IfcPatch strategy and the
+placement-rewriting alternatives (native and fast text), reports wall time
+and peak memory for each, then opens the outputs and checks every product
+ends up at the same absolute placement as with IfcPatch.
+
+Each run happens in a fresh process so peak memory is measured per
+strategy (peak memory is reported on POSIX only).
+
+Usage (run from project root):
+    python -m benchmarks.bench_strategies INPUT.ifc [INPUT_DIR ...] [--x 100 --y 50 --rotation 30]
+    python -m benchmarks.bench_strategies corpus/ --exact
+
+Exits with status 1 if any output differs from the IfcPatch output.
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.model import IFCTransformModel, STRATEGY_IFCPATCH, STRATEGY_NATIVE, STRATEGY_FAST_TEXT
+from src.utils.validation import find_ifc_files
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Strategies compared against the IfcPatch reference
+CANDIDATE_STRATEGIES = (STRATEGY_NATIVE, STRATEGY_FAST_TEXT)
+
+
+def _timed_transform(input_path: str, output_path: str, kwargs: dict) -> tuple:
+    """Run one transform in this (fresh) process; return (seconds, peak_rss_mb)."""
+    start = time.perf_counter()
+    IFCTransformModel().transform_file(input_path=input_path, output_path=output_path, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    peak_mb = None
+    if resource is not None:
+        # ru_maxrss is KiB on Linux
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, peak_mb
+
+
+def run_strategy(input_path: str, output_path: str, kwargs: dict) -> tuple:
+    """Run _timed_transform in a new spawned process."""
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return executor.submit(_timed_transform, input_path, output_path, kwargs).result()
+
+
+def load_placements(path: str) -> dict:
+    """Return {GlobalId: absolute placement matrix} for every placed product."""
+    import ifcopenshell
+    import ifcopenshell.util.placement
+
+    ifc_file = ifcopenshell.open(path)
+    return {
+        product.GlobalId: ifcopenshell.util.placement.get_local_placement(product.ObjectPlacement)
+        for product in ifc_file.by_type("IfcProduct")
+        if product.ObjectPlacement
+    }
+
+
+def compare_placements(reference: dict, path: str, tolerance: float) -> tuple[int, float]:
+    """
+    Compare a file's absolute product placements with reference placements.
+
+    Args:
+        reference: Placements from load_placements
+        path: IFC file to check
+        tolerance: Allowed difference per matrix element (0 for exact)
+
+    Returns:
+        (products whose placement differs, largest element difference)
+    """
+    import numpy as np
+
+    placements = load_placements(path)
+    mismatches = 0
+    max_deviation = 0.0
+    for global_id, matrix in reference.items():
+        other = placements.get(global_id)
+        if other is None:
+            mismatches += 1
+            continue
+        deviation = float(np.max(np.abs(matrix - other)))
+        max_deviation = max(max_deviation, deviation)
+        if deviation > tolerance:
+            mismatches += 1
+    return mismatches, max_deviation
+
+
+def collect_files(inputs) -> list[Path]:
+    """Expand input files and directories into a sorted list of IFC files."""
+    files = []
+    for item in inputs:
+        path = Path(item)
+        files.extend(find_ifc_files(path) if path.is_dir() else [path])
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transform strategies against IfcPatch")
+    parser.add_argument('inputs', nargs='+', help="IFC files or directories of IFC files")
+    parser.add_argument('--x', type=float, default=100.0)
+    parser.add_argument('--y', type=float, default=50.0)
+    parser.add_argument('--z', type=float, default=0.0)
+    parser.add_argument('--rotation', type=float, default=0.0)
+    parser.add_argument('--rotate-first', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--strategies', nargs='+', choices=CANDIDATE_STRATEGIES,
+                        default=list(CANDIDATE_STRATEGIES), help="Strategies to compare")
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help="Allowed placement difference in project units")
+    parser.add_argument('--exact', action='store_true',
+                        help="Require bit-identical placement matrices (tolerance 0)")
+    args = parser.parse_args()
+
+    tolerance = 0.0 if args.exact else args.tolerance
+    base_kwargs = {
+        'x': args.x, 'y': args.y, 'z': args.z,
+        'should_rotate_first': args.rotate_first,
+        'rotation_z': args.rotation or None
+    }
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as output_dir:
+        for input_file in collect_files(args.inputs):
+            size_mb = os.path.getsize(input_file) / 1e6
+            print(f"\n{input_file}: {size_mb:.1f} MB")
+            print(f"{'strategy':<12}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}{'max dev':>12}  result")
+
+            reference = None
+            for strategy in (STRATEGY_IFCPATCH, *args.strategies):
+                output_path = os.path.join(output_dir, f"{strategy}.ifc")
+                seconds, peak_mb = run_strategy(
+                    str(input_file), output_path, dict(base_kwargs, strategy=strategy)
+                )
+                peak = f"{peak_mb:>10.0f}" if peak_mb is not None else f"{'n/a':>10}"
+                line = f"{strategy:<12}{seconds:>10.2f}{size_mb / seconds:>10.2f}{peak}"
+
+                if reference is None:
+                    reference = load_placements(output_path)
+                    print(f"{line}{'':>12}  reference ({len(reference)} products)")
+                    continue
+
+                mismatches, deviation = compare_placements(reference, output_path, tolerance)
+                status = "EQUIVALENT" if mismatches == 0 else f"{mismatches} MISMATCHES"
+                failed += mismatches > 0
+                print(f"{line}{deviation:>12.2e}  {status}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
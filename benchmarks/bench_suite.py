@@ -0,0 +1,223 @@
+"""
+Benchmark Suite
+
+Generates (or reuses) a synthetic corpus with benchmarks.corpus, then
+measures every transform strategy on each model and every batch execution
+mode on the whole corpus. Each measurement is appended as one JSON line to
+a results file, tagged with a run id, the git commit and the machine, so
+runs before and after a change can be compared.
+
+Single-file runs happen in a fresh process per measurement so peak memory
+is per run (peak memory is reported on POSIX only).
+
+Usage (run from project root):
+    python -m benchmarks.bench_suite [--entities 1k 10k 100k] [--results benchmarks/results.jsonl]
+    python -m benchmarks.bench_suite --entities 1M 5M --trees flat --strategies native fast_text
+    python -m benchmarks.bench_suite --compare benchmarks/results.jsonl
+"""
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.bench_batch import run_mode
+from benchmarks.corpus import SCHEMAS, TREES, UNITS, generate_corpus, parse_size
+from src.batch import EXECUTION_MODES, build_transform_kwargs, default_worker_count
+from src.model import (
+    IFCTransformModel,
+    TRANSFORM_STRATEGIES,
+    STRATEGY_FAST_TEXT,
+    STRATEGY_GEOREFERENCE
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_CORPUS_DIR = Path(__file__).parent / "corpus_data"
+DEFAULT_RESULTS_FILE = Path(__file__).parent / "results.jsonl"
+
+# Transformation applied in every measurement
+BENCH_VALUES = {'x': 100.0, 'y': 50.0, 'z': 0.0, 'rotation': 30.0, 'rotate_first': True}
+
+
+def _measure_transform(input_path: str, output_path: str, transform_kwargs: dict) -> dict:
+    """Run one transform in this (fresh) process; return its result and peak RSS."""
+    model = IFCTransformModel()
+    if transform_kwargs['strategy'] != STRATEGY_FAST_TEXT:
+        # Keep library import time out of the measurement
+        model.warm_up()
+    result = model.transform_file(input_path=input_path, output_path=output_path, **transform_kwargs)
+    peak_mb = None
+    if resource is not None:
+        # ru_maxrss is KiB on Linux
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return dict(result.to_dict(), peak_mb=peak_mb)
+
+
+def measure_transform(input_path: str, output_path: str, transform_kwargs: dict) -> dict:
+    """Run _measure_transform in a new spawned process."""
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return executor.submit(_measure_transform, input_path, output_path, transform_kwargs).result()
+
+
+def run_metadata() -> dict:
+    """Describe this run: id, commit and machine."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'run': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def record(results_file: Path, metadata: dict, entry: dict):
+    """Append one measurement to the results file."""
+    with results_file.open('a', encoding='utf-8') as f:
+        f.write(json.dumps({**metadata, **entry}) + "\n")
+
+
+def bench_strategies(cases, strategies, output_dir, results_file, metadata):
+    """Measure each strategy on each corpus model."""
+    print(f"\n{'model':<28}{'strategy':<14}{'seconds':>9}{'MB/s':>9}{'entities/s':>12}{'peak MB':>9}")
+    for case in cases:
+        size_mb = case['path'].stat().st_size / 1e6
+        for strategy in strategies:
+            if strategy == STRATEGY_GEOREFERENCE and case['schema'] == 'IFC2X3':
+                continue  # Not supported for IFC2X3
+
+            transform_kwargs = build_transform_kwargs(dict(BENCH_VALUES, strategy=strategy))
+            output_path = os.path.join(output_dir, f"{strategy}.ifc")
+            try:
+                result = measure_transform(str(case['path']), output_path, transform_kwargs)
+            except Exception as e:
+                print(f"{case['path'].name:<28}{strategy:<14}  FAILED: {e}")
+                continue
+
+            entry = {
+                'benchmark': 'transform',
+                'model': case['path'].name,
+                'schema': case['schema'],
+                'entities': result['entity_count'],
+                'tree': case['tree'],
+                'units': case['units'],
+                'strategy': strategy,
+                'input_mb': round(size_mb, 3),
+                'seconds': result['seconds'],
+                'mb_per_s': round(size_mb / result['seconds'], 3),
+                'entities_per_s': round(result['entity_count'] / result['seconds']),
+                'peak_mb': result['peak_mb'],
+                'stages': {name: stage['seconds'] for name, stage in result['stages'].items()}
+            }
+            record(results_file, metadata, entry)
+
+            peak = f"{entry['peak_mb']:>9.0f}" if entry['peak_mb'] is not None else f"{'n/a':>9}"
+            print(f"{entry['model']:<28}{strategy:<14}{entry['seconds']:>9.2f}"
+                  f"{entry['mb_per_s']:>9.2f}{entry['entities_per_s']:>12}{peak}")
+
+
+def bench_batch(cases, strategy, workers, results_file, metadata):
+    """Measure each batch execution mode on the whole corpus."""
+    files = [case['path'] for case in cases]
+    transform_kwargs = build_transform_kwargs(dict(BENCH_VALUES, strategy=strategy))
+
+    print(f"\nBatch: {len(files)} files, {workers} workers, strategy {strategy}")
+    print(f"{'mode':<10}{'seconds':>10}{'files/s':>10}{'MB/s':>10}{'errors':>8}")
+    for mode in EXECUTION_MODES:
+        r = run_mode(mode, files, transform_kwargs, workers)
+        record(results_file, metadata, {
+            'benchmark': 'batch',
+            'mode': mode,
+            'strategy': strategy,
+            'workers': workers,
+            'files': len(files),
+            **{key: r[key] for key in ('seconds', 'files_per_s', 'mb_per_s', 'errors')}
+        })
+        print(f"{mode:<10}{r['seconds']:>10.2f}{r['files_per_s']:>10.2f}"
+              f"{r['mb_per_s']:>10.2f}{r['errors']:>8}")
+
+
+def compare(results_file: Path):
+    """Print the latest run against the previous one, per benchmark case."""
+    runs = {}
+    with results_file.open('r', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            key = (entry['benchmark'], entry.get('model') or entry.get('mode'), entry['strategy'])
+            runs.setdefault(entry['run'], {})[key] = entry
+
+    if len(runs) < 2:
+        print("Need at least two runs to compare")
+        return
+
+    previous_run, latest_run = sorted(runs)[-2:]
+    previous, latest = runs[previous_run], runs[latest_run]
+    print(f"{latest_run} ({next(iter(latest.values()))['commit']}) "
+          f"vs {previous_run} ({next(iter(previous.values()))['commit']})")
+    print(f"{'case':<50}{'before s':>10}{'after s':>10}{'speedup':>9}")
+    for key in sorted(latest.keys() & previous.keys()):
+        before = previous[key]['seconds']
+        after = latest[key]['seconds']
+        print(f"{' '.join(key):<50}{before:>10.2f}{after:>10.2f}{before / after:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on a synthetic corpus")
+    parser.add_argument('--entities', nargs='+', default=['1k', '10k', '100k'],
+                        help="Model sizes in entities, e.g. 1k 100k 1M 5M (default: 1k 10k 100k)")
+    parser.add_argument('--schemas', nargs='+', choices=SCHEMAS, default=list(SCHEMAS))
+    parser.add_argument('--trees', nargs='+', choices=TREES, default=list(TREES))
+    parser.add_argument('--units', nargs='+', choices=UNITS, default=list(UNITS))
+    parser.add_argument('--strategies', nargs='+', choices=TRANSFORM_STRATEGIES,
+                        default=list(TRANSFORM_STRATEGIES))
+    parser.add_argument('--batch-strategy', choices=TRANSFORM_STRATEGIES, default=TRANSFORM_STRATEGIES[0],
+                        help="Strategy used for the batch mode benchmark")
+    parser.add_argument('--no-batch', action='store_true', help="Skip the batch mode benchmark")
+    parser.add_argument('--workers', type=int, default=default_worker_count())
+    parser.add_argument('--corpus-dir', type=Path, default=DEFAULT_CORPUS_DIR)
+    parser.add_argument('--results', type=Path, default=DEFAULT_RESULTS_FILE,
+                        help="JSON Lines file the measurements are appended to")
+    parser.add_argument('--compare', type=Path, metavar='RESULTS',
+                        help="Compare the last two runs in a results file and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    sizes = [parse_size(s) for s in args.entities]
+    cases = generate_corpus(args.corpus_dir, sizes, args.schemas, args.trees, args.units)
+    metadata = run_metadata()
+    print(f"Run {metadata['run']} at {metadata['commit']}, results -> {args.results}")
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as output_dir:
+        bench_strategies(cases, args.strategies, output_dir, args.results, metadata)
+    if not args.no_batch:
+        bench_batch(cases, args.batch_strategy, args.workers, args.results, metadata)
+    print(f"\nSuite finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
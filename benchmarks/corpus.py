@@ -0,0 +1,242 @@
+"""
+Synthetic IFC Corpus Generator
+
+Writes IFC2X3 or IFC4 models of a controlled size straight to STEP text
+(no ifcopenshell needed, so multi-million entity files take seconds). Each
+model has a project, units, a site and a number of IfcBuildingElementProxy
+elements, each with its own placement (4 entities per element), contained
+in the site in chunks.
+
+Placement tree shapes:
+    flat     Every element placement is a root (PlacementRelTo unset), the
+             worst case for engines that rewrite root placements
+    deep     Elements form chains of DEEP_CHAIN_LENGTH placements, each
+             relative to the previous one, with only the chain heads relative
+             to the site; the worst case for engines that walk placement chains
+    flat2d   As flat, but the roots are rotated IfcAxis2Placement2Ds
+    orphans  As flat, plus a root placement no product uses every
+             ORPHAN_INTERVAL elements (IfcPatch leaves those alone)
+
+Usage (run from project root):
+    python -m benchmarks.corpus OUTPUT_DIR --entities 10k 1M --schemas IFC4 --trees flat deep --units mm m
+"""
+
+import argparse
+import math
+from pathlib import Path
+
+
+SCHEMAS = ('IFC2X3', 'IFC4')
+TREES = ('flat', 'deep', 'flat2d', 'orphans')
+UNITS = ('mm', 'm')
+
+# Placements per chain in 'deep' trees
+DEEP_CHAIN_LENGTH = 50
+
+# Elements per unused root placement in 'orphans' trees
+ORPHAN_INTERVAL = 10
+
+# Elements per IfcRelContainedInSpatialStructure (keeps records a sane length)
+CONTAINMENT_CHUNK = 1000
+
+# Entities per element: point, axis placement, local placement, proxy
+ENTITIES_PER_ELEMENT = 4
+
+# IFC GlobalId alphabet (compressed base64)
+_GUID_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$"
+
+_SIZE_SUFFIXES = {'k': 1_000, 'M': 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """Parse an entity count such as '5000', '10k' or '5M'."""
+    if text and text[-1] in _SIZE_SUFFIXES:
+        return int(float(text[:-1]) * _SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(count: int) -> str:
+    """Format an entity count compactly ('10k', '5M')."""
+    for suffix, factor in sorted(_SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if count >= factor and count % factor == 0:
+            return f"{count // factor}{suffix}"
+    return str(count)
+
+
+def corpus_name(schema: str, entities: int, tree: str, units: str) -> str:
+    """Return the file name of a generated model, e.g. 'IFC4_10k_flat_mm.ifc'."""
+    return f"{schema}_{format_size(entities)}_{tree}_{units}.ifc"
+
+
+def _guid(n: int) -> str:
+    """Return a deterministic, unique 22 character GlobalId for n."""
+    chars = []
+    for _ in range(22):
+        n, remainder = divmod(n, 64)
+        chars.append(_GUID_CHARS[remainder])
+    return ''.join(reversed(chars))
+
+
+def generate_model(path, schema: str = 'IFC4', entities: int = 10_000,
+                   tree: str = 'flat', units: str = 'm') -> int:
+    """
+    Write a synthetic IFC model.
+
+    Args:
+        path: Output file path
+        schema: 'IFC2X3' or 'IFC4'
+        entities: Approximate number of entity instances to write
+        tree: Placement tree shape (see TREES)
+        units: 'mm' or 'm' project length unit
+
+    Returns:
+        Number of entity instances written
+
+    Raises:
+        ValueError: If schema, tree or units is unknown
+    """
+    if schema not in SCHEMAS:
+        raise ValueError(f"Unknown schema: {schema}")
+    if tree not in TREES:
+        raise ValueError(f"Unknown placement tree: {tree}")
+    if units not in UNITS:
+        raise ValueError(f"Unknown units: {units}")
+
+    scale = 1000.0 if units == 'mm' else 1.0
+    prefix = '.MILLI.' if units == 'mm' else '$'
+    lines = []
+    next_id = 0
+
+    def add(record: str) -> int:
+        nonlocal next_id
+        next_id += 1
+        lines.append(f"#{next_id}={record};\n")
+        return next_id
+
+    person = add("IFCPERSON($,$,'bench',$,$,$,$,$)")
+    organization = add("IFCORGANIZATION($,'bench',$,$,$)")
+    owner = add(f"IFCPERSONANDORGANIZATION(#{person},#{organization},$)")
+    application = add(f"IFCAPPLICATION(#{organization},'1.0','IFC Translate Tool benchmark','bench')")
+    history = add(f"IFCOWNERHISTORY(#{owner},#{application},$,.ADDED.,$,$,$,0)")
+    length_unit = add(f"IFCSIUNIT(*,.LENGTHUNIT.,{prefix},.METRE.)")
+    unit_assignment = add(f"IFCUNITASSIGNMENT((#{length_unit}))")
+    origin = add("IFCCARTESIANPOINT((0.,0.,0.))")
+    z_axis = add("IFCDIRECTION((0.,0.,1.))")
+    x_axis = add("IFCDIRECTION((1.,0.,0.))")
+    # Shared by the 2D element placements of 'flat2d' trees (30 degrees)
+    x_axis_2d = add("IFCDIRECTION((0.866025403784439,0.5))")
+    world = add(f"IFCAXIS2PLACEMENT3D(#{origin},#{z_axis},#{x_axis})")
+    context = add(f"IFCGEOMETRICREPRESENTATIONCONTEXT($,'Model',3,1.E-05,#{world},$)")
+    project = add(f"IFCPROJECT('{_guid(1)}',#{history},'Benchmark',$,$,$,$,(#{context}),#{unit_assignment})")
+    site_placement = add(f"IFCLOCALPLACEMENT($,#{world})")
+    site = add(f"IFCSITE('{_guid(2)}',#{history},'Site',$,$,#{site_placement},$,$,.ELEMENT.,$,$,$,$,$)")
+    add(f"IFCRELAGGREGATES('{_guid(3)}',#{history},$,$,#{project},(#{site}))")
+
+    # Each chunk of elements also needs one containment relationship
+    element_count = max(1, (entities - next_id) * CONTAINMENT_CHUNK
+                        // (ENTITIES_PER_ELEMENT * CONTAINMENT_CHUNK + 1))
+    side = max(1, int(math.sqrt(element_count)))
+
+    with open(path, 'w', encoding='ascii', newline='\n') as f:
+        f.write("ISO-10303-21;\nHEADER;\n")
+        f.write("FILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');\n")
+        f.write(f"FILE_NAME('{Path(path).name}','2026-01-01T00:00:00',(''),(''),"
+                f"'IFC Translate Tool benchmark','benchmarks.corpus','');\n")
+        f.write(f"FILE_SCHEMA(('{schema}'));\nENDSEC;\nDATA;\n")
+        f.writelines(lines)
+        lines.clear()
+
+        chunk = []
+        previous = None
+        for i in range(element_count):
+            if tree != 'deep':
+                # Spread roots over a grid so every placement differs
+                x, y = (i % side) * 5.0 * scale, (i // side) * 5.0 * scale
+                relative_to = '$'
+            elif i % DEEP_CHAIN_LENGTH == 0:
+                # Chain head, relative to the site
+                x, y = (i // DEEP_CHAIN_LENGTH) * 10.0 * scale, 0.0
+                relative_to = f"#{site_placement}"
+            else:
+                # Each chain link is a small step from the previous element
+                x, y = 1.0 * scale, 0.5 * scale
+                relative_to = f"#{previous}"
+
+            if tree == 'flat2d':
+                point = add(f"IFCCARTESIANPOINT(({x:.1f},{y:.1f}))")
+                axis_placement = add(f"IFCAXIS2PLACEMENT2D(#{point},#{x_axis_2d})")
+            else:
+                point = add(f"IFCCARTESIANPOINT(({x:.1f},{y:.1f},0.))")
+                axis_placement = add(f"IFCAXIS2PLACEMENT3D(#{point},$,$)")
+            previous = add(f"IFCLOCALPLACEMENT({relative_to},#{axis_placement})")
+            chunk.append(add(
+                f"IFCBUILDINGELEMENTPROXY('{_guid(10 + i)}',#{history},'P{i}',$,$,#{previous},$,$,$)"
+            ))
+
+            if tree == 'orphans' and i % ORPHAN_INTERVAL == 0:
+                # Unused root, offset from the element's so it can't be mistaken for it
+                point = add(f"IFCCARTESIANPOINT(({x + 2.5 * scale:.1f},{y:.1f},0.))")
+                orphan_placement = add(f"IFCAXIS2PLACEMENT3D(#{point},$,$)")
+                add(f"IFCLOCALPLACEMENT($,#{orphan_placement})")
+
+            if len(chunk) == CONTAINMENT_CHUNK or i == element_count - 1:
+                members = ','.join(f"#{e}" for e in chunk)
+                add(f"IFCRELCONTAINEDINSPATIALSTRUCTURE('{_guid(10 + element_count + next_id)}',"
+                    f"#{history},$,$,({members}),#{site})")
+                chunk.clear()
+
+            if len(lines) >= 10_000:
+                f.writelines(lines)
+                lines.clear()
+
+        f.writelines(lines)
+        f.write("ENDSEC;\nEND-ISO-10303-21;\n")
+
+    return next_id
+
+
+def generate_corpus(output_dir, sizes, schemas=SCHEMAS, trees=TREES, units=UNITS) -> list[dict]:
+    """
+    Generate every combination of the given parameters, reusing existing files.
+
+    Returns:
+        One dictionary per model: path, schema, entities, tree, units
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cases = []
+    for schema in schemas:
+        for entities in sizes:
+            for tree in trees:
+                for unit in units:
+                    path = output_dir / corpus_name(schema, entities, tree, unit)
+                    if not path.exists():
+                        print(f"Generating {path.name}...")
+                        generate_model(path, schema, entities, tree, unit)
+                    cases.append({
+                        'path': path,
+                        'schema': schema,
+                        'entities': entities,
+                        'tree': tree,
+                        'units': unit
+                    })
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic IFC models")
+    parser.add_argument('output_dir', help="Directory for generated models")
+    parser.add_argument('--entities', nargs='+', default=['1k', '10k', '100k'],
+                        help="Entity counts, e.g. 1k 100k 5M (default: 1k 10k 100k)")
+    parser.add_argument('--schemas', nargs='+', choices=SCHEMAS, default=list(SCHEMAS))
+    parser.add_argument('--trees', nargs='+', choices=TREES, default=list(TREES))
+    parser.add_argument('--units', nargs='+', choices=UNITS, default=list(UNITS))
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.entities]
+    for case in generate_corpus(args.output_dir, sizes, args.schemas, args.trees, args.units):
+        print(f"{case['path']}: {case['path'].stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
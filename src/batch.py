@@ -0,0 +1,1410 @@
+"""
+Batch Processing Engine
+
+This module provides the BatchRunner class that fans IFC files (a list,
+or a generator that is still discovering them) out to a pool of workers (separate processes, threads, or the calling
+thread) and streams per-file results back to the controller through a
+queue using the same message format as the GUI batch loop. A
+MemoryScheduler decides the processing order and holds files back while
+the memory budget is used up. In incremental mode a BatchManifest in the
+output directory lets unchanged inputs be skipped, and with checkpointing
+a BatchJournal records completed files so an interrupted batch can be
+resumed. With preflight, each discovered file's header is checked before
+it is queued, so broken inputs fail without occupying a worker.
+Cancelling kills the worker processes of running files and removes their
+partial outputs; a TransformWorker does the same for single-file runs
+and fan-out, reusing one warm worker process between them.
+If a worker process dies (e.g. killed for running out of memory), the
+files running in the pool fail and the batch continues on a new pool.
+With a staging directory, a StagingPipeline reads inputs ahead and
+publishes outputs on I/O threads, so slow storage doesn't hold up workers.
+With deduplication, inputs with identical content are transformed once and
+the others get a link or copy of that output (see src.dedupe). With
+profiling, each transformation runs under cProfile and tracemalloc, its
+reports are written next to its output (see src.profiling) and the final
+message lists the functions that took the most time across the batch.
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import dataclasses
+import itertools
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from src.dedupe import DuplicateIndex
+from src.journal import BatchJournal
+from src.manifest import BatchManifest
+from src.model import STRATEGY_IFCPATCH, TransformCancelled
+from src.preflight import preflight_files
+from src.profiling import SUMMARY_FUNCTIONS, TransformProfiler
+from src.scheduler import MemoryScheduler
+from src.staging import StagingPipeline
+from src.utils.fileio import (
+    atomic_output,
+    file_sha256,
+    link_or_copy,
+    partial_output_path,
+    remove_partial_outputs
+)
+from src.utils.resources import peak_rss_bytes
+from src.utils.timing import ThroughputTracker
+from src.utils.transform import chain_parameters
+from src.utils.validation import build_output_path
+
+
+# Execution modes for BatchRunner
+MODE_SERIAL = 'serial'
+MODE_THREAD = 'thread'
+MODE_PROCESS = 'process'
+EXECUTION_MODES = (MODE_SERIAL, MODE_THREAD, MODE_PROCESS)
+
+# Seconds to wait on running workers before re-checking stop_event
+POLL_INTERVAL = 0.2
+
+# Seconds a terminated worker process gets to exit before it is killed
+TERMINATE_TIMEOUT = 2.0
+
+# Seconds between manifest saves during a long batch
+MANIFEST_SAVE_INTERVAL = 30.0
+
+# Finished distinct inputs whose outputs later duplicates can reuse (the
+# oldest are forgotten, so a watch daemon's memory stays bounded)
+DEDUPE_OUTCOMES_KEPT = 1000
+
+# Minimum seconds between 'batch_file_progress' messages
+FILE_PROGRESS_INTERVAL = 0.5
+
+# Progress queue of a process pool worker (set by init_worker)
+_worker_progress_queue = None
+
+# Seconds a process pool worker spent importing the IFC libraries (set by init_worker)
+_worker_warm_up_seconds = None
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_count() -> int:
+    """Return the default number of batch workers (one per CPU core)."""
+    return os.cpu_count() or 1
+
+
+def resolve_operations(values: dict) -> dict:
+    """
+    Replace an operation chain in form values by its single-pass equivalent.
+
+    Args:
+        values: Form values or a preset, optionally with 'operations'
+                (see src.utils.transform)
+
+    Returns:
+        Copy of values without 'operations' whose x, y, z, rotation and
+        rotate_first (always True) apply the whole chain
+
+    Raises:
+        ValueError: If the operation chain is invalid
+    """
+    values = dict(values)
+    operations = values.pop('operations', None)
+    if operations is None:
+        return values
+
+    x, y, z, rotation_z = chain_parameters(operations)
+    values.update(x=x, y=y, z=z, rotation=rotation_z or 0.0, rotate_first=True)
+    return values
+
+
+def build_transform_kwargs(values: dict) -> dict:
+    """
+    Build IFCTransformModel.transform_file keyword arguments from form values.
+
+    An operation chain is reduced to the equivalent single
+    transformation, so batches, manifests and verification see plain
+    offsets and rotation.
+
+    Args:
+        values: Dictionary with keys x, y, z, rotation, rotate_first and
+               optionally strategy (as returned by TransformView.get_values
+               or a preset), or a preset with 'operations' instead
+
+    Returns:
+        Dictionary of transform_file keyword arguments, excluding paths
+
+    Raises:
+        ValueError: If the operation chain is invalid
+    """
+    values = resolve_operations(values)
+    rotation_z = values['rotation'] if values['rotation'] != 0 else None
+    return {
+        'x': values['x'],
+        'y': values['y'],
+        'z': values['z'],
+        'should_rotate_first': values['rotate_first'],
+        'rotation_z': rotation_z,
+        'strategy': values.get('strategy', STRATEGY_IFCPATCH)
+    }
+
+
+def init_worker(log_level: int, progress_queue=None, model=None):
+    """
+    Process pool initializer: match the parent's logging level, keep the progress queue.
+
+    If a model is given, the IFC libraries are imported up front so the
+    worker's first file doesn't pay for it. Anything the libraries print
+    goes to stderr, so a worker never writes into the parent's stdout
+    (which the command line keeps for JSON lines).
+    """
+    global _worker_progress_queue, _worker_warm_up_seconds
+    logging.getLogger().setLevel(log_level)
+    sys.stdout = sys.stderr
+    _worker_progress_queue = progress_queue
+    if model is not None:
+        _worker_warm_up_seconds = model.warm_up()
+
+
+def worker_warm_up_seconds() -> float | None:
+    """Return the seconds this worker spent importing the IFC libraries (worker entry point)."""
+    return _worker_warm_up_seconds
+
+
+def transform_one(
+    model,
+    input_path: str,
+    output_path: str,
+    transform_kwargs: dict,
+    progress=None,
+    progress_key=None,
+    verify_tolerance: float | None = None,
+    stop_event=None,
+    profile_to=None
+):
+    """
+    Transform a single file (worker entry point).
+
+    Defined at module level so process pools can pickle it. The model is
+    pickled into the worker process, which is cheap because
+    IFCTransformModel carries no state. The output is written under a
+    temporary name and renamed into place, so a partial output never
+    appears (or replaces a previous one) if the transform fails.
+
+    Args:
+        progress: Callable receiving (key, stage, fraction) tuples;
+                  process workers use the queue passed to init_worker
+        progress_key: Key identifying this transform in progress reports
+                      (default: input_path)
+        verify_tolerance: If set, check the output against the input
+                          (see src.verify) before renaming it into place,
+                          allowing this position error in metres
+        stop_event: threading.Event checked as each stage starts (and
+                    while fast text streams); once set, the transform
+                    stops and its partial output is removed. Process
+                    workers are killed instead (see TransformWorker).
+        profile_to: If set, profile the transformation and write its
+                    reports next to this output path (see src.profiling);
+                    the result's profile holds their summary
+
+    Returns:
+        TransformResult with the file's stage timings and memory use
+
+    Raises:
+        ValueError: If the transform fails or the output fails verification
+        TransformCancelled: If stop_event was set before the output was written
+    """
+    if progress is None and _worker_progress_queue is not None:
+        progress = _worker_progress_queue.put
+
+    key = progress_key if progress_key is not None else input_path
+    profiler = TransformProfiler(profile_to) if profile_to is not None else None
+
+    def report(stage, fraction):
+        if stop_event is not None and stop_event.is_set():
+            raise TransformCancelled(f"Cancelled during {stage}")
+        if profiler is not None and fraction is None:
+            profiler.stage_started(stage)
+        if progress is not None:
+            progress((key, stage, fraction))
+
+    reporting = progress is not None or stop_event is not None or profiler is not None
+    with atomic_output(output_path) as temp_path:
+        with profiler.run() if profiler is not None else nullcontext():
+            result = model.transform_file(
+                input_path=input_path,
+                output_path=str(temp_path),
+                progress=report if reporting else None,
+                **transform_kwargs
+            )
+        if verify_tolerance is not None:
+            _verify_output(input_path, temp_path, transform_kwargs, verify_tolerance, result,
+                           report if reporting else None)
+    result.output_path = output_path
+    if result.verification is not None:
+        # Verified under its temporary name; report the file that now exists
+        result.verification['output_path'] = str(output_path)
+
+    if profiler is not None:
+        try:
+            result.profile = profiler.save(os.path.basename(key))
+        except OSError as e:
+            # The output was written; only its reports are missing
+            logger.warning(f"Could not write profile for {input_path}: {e}")
+    return result
+
+
+def fanout_one(model, input_path: str, targets: list[tuple], strategy: str, progress_key=None):
+    """
+    Write several transformations of one file from a single parse (worker entry point).
+
+    Each output is written under a temporary name and renamed into place
+    as soon as it is complete, then its TransformResult is reported as a
+    (key, 'output', result) progress tuple. Outputs not yet written when
+    the fan-out fails are removed.
+
+    Args:
+        model: IFCTransformModel instance
+        input_path: Path to input IFC file
+        targets: (output_path, kwargs) pairs (see transform_file_fanout)
+        strategy: Transform strategy used for every target
+        progress_key: Key identifying this fan-out in progress reports
+                      (default: input_path)
+
+    Returns:
+        One TransformResult per target, in order
+
+    Raises:
+        ValueError: If the strategy is not supported or the input is not a valid IFC file
+    """
+    key = progress_key if progress_key is not None else input_path
+    # temporary path -> target path
+    final_paths = {str(partial_output_path(output_path)): output_path for output_path, _ in targets}
+
+    def on_result(result):
+        final_path = final_paths.pop(result.output_path)
+        os.replace(result.output_path, final_path)
+        result.output_path = str(final_path)
+        if _worker_progress_queue is not None:
+            _worker_progress_queue.put((key, 'output', result))
+
+    try:
+        return model.transform_file_fanout(
+            input_path,
+            [(temp_path, kwargs) for temp_path, (_, kwargs) in zip(final_paths, targets)],
+            strategy,
+            on_result=on_result
+        )
+    finally:
+        for temp_path in final_paths:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class TransformWorker:
+    """
+    A warm worker process for single-file transforms that is killed to cancel.
+
+    ifcopenshell can't be interrupted while it parses or writes a file, so
+    transforms run in a worker process: stop_event is checked every
+    POLL_INTERVAL and, once it is set, the process is killed and its
+    partial outputs removed. The worker imports the IFC libraries when it
+    starts and is reused for every transform; only a killed or crashed
+    worker is replaced, and the replacement starts loading the libraries
+    straight away.
+    """
+
+    def __init__(self, model):
+        """
+        Initialize worker (the process is started by start() or the first run).
+
+        Args:
+            model: IFCTransformModel instance (pickled into the worker)
+        """
+        self.model = model
+        self._executor = None
+        self._progress_queue = None
+        # Future of the first task, done once the worker has imported the libraries
+        self._ready = None
+        self._lock = threading.Lock()
+        self._runs = itertools.count()
+
+    def start(self):
+        """Start the worker process and its library import, unless it is running."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            context = multiprocessing.get_context('spawn')
+            self._progress_queue = context.Queue()
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(logging.getLogger().level, self._progress_queue, self.model)
+            )
+            # The process is only spawned for the first task
+            self._ready = self._executor.submit(worker_warm_up_seconds)
+
+    def wait_ready(self) -> float:
+        """
+        Start the worker if needed and wait until it has imported the IFC libraries.
+
+        Returns:
+            Seconds the worker spent importing
+
+        Raises:
+            ValueError: If the worker process failed to start or import the libraries
+        """
+        self.start()
+        try:
+            return self._ready.result()
+        except BrokenProcessPool:
+            # The initializer failed (its error is logged by the worker)
+            with self._lock:
+                if self._executor is not None:
+                    self._discard()
+            raise ValueError("Worker process failed to load the IFC libraries")
+
+    def transform(
+        self,
+        input_path: str,
+        output_path: str,
+        transform_kwargs: dict,
+        stop_event,
+        verify_tolerance: float | None = None,
+        profile: bool = False
+    ):
+        """
+        Transform a single file in the worker.
+
+        Args:
+            input_path: Path to input IFC file
+            output_path: Path for the output file
+            transform_kwargs: transform_file keyword arguments
+            stop_event: threading.Event set to request cancellation
+            verify_tolerance: If set, verify the output (see transform_one)
+            profile: If True, profile the transformation and write its reports
+                     next to the output (see src.profiling)
+
+        Returns:
+            TransformResult with the file's stage timings and memory use
+
+        Raises:
+            TransformCancelled: If stop_event was set before the transform finished
+            ValueError: If the transform fails, the output fails verification
+                        or the worker process dies
+        """
+        future = self._submit(
+            transform_one, self.model, input_path, output_path, transform_kwargs,
+            verify_tolerance=verify_tolerance,
+            profile_to=output_path if profile else None
+        )
+        return self._wait(future, input_path, [output_path], stop_event)
+
+    def fanout(self, input_path: str, targets: list[tuple], strategy: str, stop_event, on_result=None):
+        """
+        Write several transformations of one file in the worker (see fanout_one).
+
+        Args:
+            input_path: Path to input IFC file
+            targets: (output_path, kwargs) pairs (see transform_file_fanout)
+            strategy: Transform strategy used for every target
+            stop_event: threading.Event set to request cancellation
+            on_result: Optional callback receiving each TransformResult as
+                       its output is written
+
+        Returns:
+            One TransformResult per target, in order
+
+        Raises:
+            TransformCancelled: If stop_event was set before every output was written
+            ValueError: If the fan-out fails or the worker process dies
+        """
+        key = f"fanout-{next(self._runs)}"
+        reported = []
+
+        def on_progress(item):
+            item_key, stage, result = item
+            if item_key == key and stage == 'output':
+                reported.append(result)
+                if on_result is not None:
+                    on_result(result)
+
+        future = self._submit(fanout_one, self.model, input_path, targets, strategy, progress_key=key)
+        results = self._wait(
+            future, input_path, [output_path for output_path, _ in targets], stop_event, on_progress
+        )
+        # Results whose progress report hadn't arrived when the fan-out returned
+        for result in results[len(reported):]:
+            if on_result is not None:
+                on_result(result)
+        return results
+
+    def close(self):
+        """Stop the worker process, whatever it is running."""
+        with self._lock:
+            if self._executor is not None:
+                _terminate_workers(self._executor)
+                self._discard()
+
+    def _submit(self, fn, *args, **kwargs):
+        """Submit a task to the worker, starting it (again) if needed."""
+        self.start()
+        try:
+            return self._executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # The idle worker died (e.g. killed by the system); start another
+            self._replace()
+            return self._executor.submit(fn, *args, **kwargs)
+
+    def _wait(self, future, input_path: str, output_paths: list, stop_event, on_progress=None):
+        """Wait for a task, killing the worker and removing partial outputs if cancelled."""
+        while not future.done():
+            cancelled = stop_event.wait(POLL_INTERVAL)
+            self._drain_progress(on_progress)
+            if cancelled:
+                self._replace()
+                for output_path in output_paths:
+                    remove_partial_outputs(output_path)
+                logger.info(f"Cancelled transformation of {input_path}")
+                raise TransformCancelled(f"Cancelled: {os.path.basename(input_path)}")
+
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            self._replace()
+            for output_path in output_paths:
+                remove_partial_outputs(output_path)
+            raise ValueError(
+                "Worker process died (it crashed or was killed, e.g. for running out of memory)"
+            )
+        self._drain_progress(on_progress)
+        return result
+
+    def _drain_progress(self, on_progress):
+        """Pass queued progress items to on_progress (or drop them)."""
+        while True:
+            try:
+                item = self._progress_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            if on_progress is not None:
+                on_progress(item)
+
+    def _replace(self):
+        """Kill the worker process and start warming up a new one."""
+        with self._lock:
+            if self._executor is not None:
+                _terminate_workers(self._executor)
+                self._discard()
+        self.start()
+
+    def _discard(self):
+        """Drop the (dead) executor and its progress queue."""
+        # The worker is dead, so this doesn't block
+        self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+        self._progress_queue.close()
+        self._progress_queue = None
+
+
+def _terminate_workers(executor):
+    """
+    Stop the worker processes of a process pool, whatever they are running.
+
+    ProcessPoolExecutor only gained a public way to do this in Python 3.14.
+    """
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(TERMINATE_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def _verify_output(input_path: str, output_path, transform_kwargs: dict, tolerance: float, result, report=None):
+    """
+    Verify a transformed file, adding a 'verify' stage and the outcome to its result.
+
+    Raises:
+        ValueError: If the output does not match the expected transformation
+    """
+    # Imported here so NumPy is only loaded when verification is used
+    from src.verify import verify_transform
+
+    if report is not None:
+        report('verify', None)
+    verification = verify_transform(input_path, output_path, tolerance=tolerance, **transform_kwargs)
+    result.stages['verify'] = {'seconds': verification.seconds, 'peak_rss_bytes': peak_rss_bytes()}
+    result.seconds = round(result.seconds + verification.seconds, 4)
+    result.verification = verification.to_dict()
+    if not verification.ok:
+        raise ValueError(f"Verification failed: {verification.summary()}")
+
+
+class BatchRunner:
+    """
+    Runs a batch of IFC transformations across a pool of workers.
+
+    Results are streamed into a queue as 'batch_progress', 'batch_error',
+    'batch_cancelled' and 'batch_complete' messages, matching what
+    TransformController._check_queue expects. Each 'batch_progress' carries
+    the file's TransformResult as a dictionary, and the final message
+    carries stage time totals and the slowest file. Progress and error
+    messages also carry byte-weighted progress (bytes_done, bytes_total,
+    mb_per_s, eta_seconds), and 'batch_file_progress' messages report the
+    stage (and, where known, fraction) of running files. Cancellation is signalled
+    through a threading.Event; files not yet started are skipped. Process
+    workers running files are killed and their partial outputs removed;
+    in serial and thread mode a running file stops as its next stage
+    starts (or, for fast text, at its next progress report).
+    """
+
+    def __init__(
+        self,
+        model,
+        workers: int | None = None,
+        mode: str = MODE_PROCESS,
+        scheduler: MemoryScheduler | None = None,
+        incremental: bool = False,
+        checkpoint: bool = False,
+        preflight: bool = False,
+        verify_tolerance: float | None = None,
+        staging_dir=None,
+        dedupe: bool = False,
+        profile: bool = False
+    ):
+        """
+        Initialize runner.
+
+        Args:
+            model: IFCTransformModel instance (pickled into process workers)
+            workers: Number of concurrent workers (default: CPU core count)
+            mode: One of 'serial', 'thread' or 'process'
+            scheduler: MemoryScheduler for ordering and admission
+                       (default: largest first, 75% of physical memory)
+            incremental: If True, skip inputs whose output in the output
+                         directory is current according to its manifest
+            checkpoint: If True, keep a BatchJournal in the output directory
+                        so the batch can be resumed after a crash or cancel
+            preflight: If True, check each file's STEP header as it is
+                       discovered (see src.preflight); failing files are
+                       reported as errors without being transformed
+            verify_tolerance: If set, check each output against its input
+                              before publishing it (see src.verify),
+                              allowing this position error in metres;
+                              failing outputs are reported as errors
+            staging_dir: If set, stage files in this fast local directory
+                         (see src.staging): inputs are copied there ahead
+                         of their turn and outputs are written there,
+                         then moved to the output directory by an I/O
+                         thread while workers start the next file. For
+                         inputs or outputs on slow or network storage;
+                         thread and process modes only.
+            dedupe: If True, transform each distinct input content once:
+                    inputs identical to another input get a reflink, hard
+                    link or copy of its output instead (reported with
+                    duplicate_of set, and counted in 'deduplicated')
+            profile: If True, profile each transformation and write its
+                     reports next to its output (see src.profiling); the
+                     final message's timings list the hottest functions
+                     across the batch. Profiling slows transformations.
+
+        Raises:
+            ValueError: If mode is unknown, workers is less than 1 or
+                        staging is requested in serial mode
+        """
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown batch mode: {mode}")
+        if staging_dir is not None and mode == MODE_SERIAL:
+            raise ValueError("Staging needs the thread or process batch mode")
+        if workers is None:
+            workers = default_worker_count()
+        if workers < 1:
+            raise ValueError(f"Worker count must be at least 1, got: {workers}")
+
+        self.model = model
+        self.workers = workers
+        self.mode = mode
+        self.scheduler = scheduler if scheduler is not None else MemoryScheduler()
+        self.incremental = incremental
+        self.checkpoint = checkpoint
+        self.preflight = preflight
+        self.verify_tolerance = verify_tolerance
+        self.staging_dir = staging_dir
+        self.dedupe = dedupe
+        self.profile = profile
+        self._duplicates = None
+        # primary input -> duplicates waiting for its output
+        self._waiting_copies = {}
+        # primary input -> its TransformResult or error, once finished (oldest first)
+        self._primary_outcomes = {}
+        self._copies = []
+        self._deduplicated = 0
+        self._manifest = None
+        self._journal = None
+        self._stage_seconds = {}
+        self._function_seconds = {}
+        self._slowest = None
+        self._skipped = 0
+        self._total = 0
+        self._rejected = []
+        self._estimate = {}
+        self._tracker = ThroughputTracker()
+        self._file_progress_at = 0.0
+        self._output_dir = None
+        self._input_root = None
+        self._manifest_saved_at = 0.0
+
+    def run(
+        self,
+        files,
+        output_dir,
+        transform_kwargs: dict,
+        result_queue,
+        stop_event,
+        journal: BatchJournal | None = None,
+        input_root=None
+    ) -> int:
+        """
+        Transform every file, posting a message to result_queue per file.
+
+        This method blocks until the batch completes or is cancelled, so
+        the GUI calls it from a background thread. files may be a lazy
+        iterable (e.g. iter_ifc_files): it is consumed in a background
+        thread and workers start on the first files while discovery is
+        still running, so 'total' in messages grows until discovery ends.
+        In incremental mode 'batch_skipped' messages report up-to-date
+        files as they are found, and 'total' counts only the files run.
+        With preflight, 'batch_preflight' messages report the running
+        totals of checked and rejected files, input bytes, estimated
+        entities and files per schema; rejected files count as errors.
+        With dedupe, the final message's 'deduplicated' counts the files
+        that were given another input's output instead of a transform.
+
+        Args:
+            files: Input file Paths (list or iterable)
+            output_dir: Directory for output files
+            transform_kwargs: transform_file keyword arguments (see build_transform_kwargs)
+            result_queue: Queue receiving progress dictionaries
+            stop_event: threading.Event set to request cancellation
+            journal: Journal of an interrupted batch being resumed (files
+                     should be its remaining files). A new journal is
+                     started when this is None and checkpointing is on.
+            input_root: Directory the files were found under; its
+                        subdirectories are mirrored in output_dir
+
+        Returns:
+            Number of files that finished (successfully or with an error)
+        """
+        self._manifest = None
+        self._skipped = 0
+        self._total = 0
+        self._rejected = []
+        self._estimate = {'checked': 0, 'rejected': 0, 'bytes': 0, 'entities': 0, 'schemas': {}}
+        self._tracker = ThroughputTracker()
+        self._file_progress_at = 0.0
+        self._stage_seconds = {}
+        self._function_seconds = {}
+        self._slowest = None
+        self._waiting_copies = {}
+        self._primary_outcomes = {}
+        self._copies = []
+        self._deduplicated = 0
+        self._output_dir = output_dir
+        self._input_root = input_root
+        self._journal = journal
+        if self._journal is None and self.checkpoint:
+            self._journal = BatchJournal(output_dir)
+            self._journal.start(transform_kwargs, input_root)
+
+        if self.incremental:
+            self._manifest = BatchManifest(output_dir, input_root)
+            self._manifest_saved_at = time.monotonic()
+
+        self._duplicates = None
+        if self.dedupe:
+            # Shares the manifest's hashes, so no input is hashed twice
+            self._duplicates = DuplicateIndex(self._manifest.input_hash if self._manifest else file_sha256)
+
+        feed = _FileFeed(files, stop_event)
+        if self.mode == MODE_SERIAL:
+            return self._run_serial(feed, transform_kwargs, result_queue, stop_event)
+        return self._run_pool(feed, transform_kwargs, result_queue, stop_event)
+
+    def _run_serial(self, feed, transform_kwargs, result_queue, stop_event) -> int:
+        """Process files one at a time in the calling thread."""
+        pending = []
+        completed = 0
+        errors = 0
+
+        while True:
+            pending = self._discover(feed, pending, transform_kwargs, result_queue)
+            for input_file, error in self._take_rejected():
+                completed += 1
+                errors += 1
+                result_queue.put(self._error_message(input_file, error, completed, self._total))
+            completed, copy_errors = self._report_copies(completed, transform_kwargs, result_queue)
+            errors += copy_errors
+
+            # Check cancellation before each file
+            if stop_event.is_set():
+                self._finish(result_queue, {
+                    'type': 'batch_cancelled',
+                    'processed': completed,
+                    'total': self._total
+                })
+                return completed
+
+            if not pending:
+                if feed.done:
+                    break
+                feed.wait(POLL_INTERVAL)
+                continue
+
+            input_file = pending.pop()
+            completed += 1
+            try:
+                result = transform_one(
+                    self.model, str(input_file), str(self._output_path(input_file)), transform_kwargs,
+                    progress=lambda item: self._file_progress(item, result_queue),
+                    verify_tolerance=self.verify_tolerance,
+                    stop_event=stop_event,
+                    profile_to=self._profile_path(input_file)
+                )
+                self._file_finished(input_file)
+                self._file_succeeded(input_file, transform_kwargs, result)
+                result_queue.put(self._progress_message(input_file, completed, self._total, result))
+            except TransformCancelled:
+                # Reported as not processed by the cancellation check above
+                completed -= 1
+            except Exception as e:
+                # Report error but continue batch
+                errors += 1
+                self._file_finished(input_file)
+                self._file_failed(input_file, e)
+                result_queue.put(self._error_message(input_file, e, completed, self._total))
+
+        self._finish(result_queue, {'type': 'batch_complete', 'total': self._total, 'errors': errors})
+        return self._total
+
+    def _run_pool(self, feed, transform_kwargs, result_queue, stop_event) -> int:
+        """
+        Process files concurrently on a thread or process pool.
+
+        At most `workers` files are in flight at once, and fewer while the
+        scheduler's memory budget is used up. When cancelled, process
+        workers are killed mid-file; thread workers stop at their next
+        cancellation check. With a staging directory, inputs are read
+        ahead and outputs published by a StagingPipeline, and no file is
+        admitted while its publish queue is full. If a process worker
+        dies, ProcessPoolExecutor terminates the others: the files in
+        flight fail and the batch continues on a new pool.
+        """
+        pending = []
+        in_flight = {}
+        # input file -> output path its worker writes (under staging, a staged path)
+        worker_outputs = {}
+        # input file -> TransformResult whose staged output is waiting to be published
+        publishing = {}
+        completed = 0
+        errors = 0
+
+        # Process workers report file progress through a queue drained here
+        progress_queue = None
+        progress = lambda item: self._file_progress(item, result_queue)
+        # Thread workers check stop_event themselves; process workers are killed
+        worker_stop_event = stop_event
+        if self.mode == MODE_PROCESS:
+            progress_queue = multiprocessing.get_context('spawn').Queue()
+            progress = None
+            worker_stop_event = None
+        broken = False
+
+        staging = StagingPipeline(self.staging_dir, depth=self.workers) if self.staging_dir is not None else None
+        executor = self._create_executor(progress_queue)
+        try:
+            while True:
+                pending = self._discover(feed, pending, transform_kwargs, result_queue)
+                for input_file, error in self._take_rejected():
+                    completed += 1
+                    errors += 1
+                    result_queue.put(self._error_message(input_file, error, completed, self._total))
+
+                # Report files whose outputs are now in place
+                for input_file, seconds, error in staging.take_published() if staging is not None else []:
+                    result = publishing.pop(input_file)
+                    completed += 1
+                    self._file_finished(input_file)
+                    if error is not None:
+                        errors += 1
+                        self._file_failed(input_file, error)
+                        result_queue.put(self._error_message(input_file, error, completed, self._total))
+                        continue
+                    result.output_path = str(self._output_path(input_file))
+                    if result.verification is not None:
+                        # Verified as staged copies; report the files they stand for
+                        result.verification.update(input_path=result.input_path, output_path=result.output_path)
+                    result.stages['publish'] = {'seconds': round(seconds, 4), 'peak_rss_bytes': None}
+                    self._file_succeeded(input_file, transform_kwargs, result)
+                    result_queue.put(self._progress_message(input_file, completed, self._total, result))
+
+                # Then the duplicates given outputs since the last pass
+                completed, copy_errors = self._report_copies(completed, transform_kwargs, result_queue)
+                errors += copy_errors
+
+                if stop_event.is_set():
+                    for future in in_flight:
+                        future.cancel()
+                    if self.mode == MODE_PROCESS and in_flight:
+                        _terminate_workers(executor)
+                        for input_file in in_flight.values():
+                            remove_partial_outputs(self._output_path(input_file))
+                    if staging is not None:
+                        staging.close(cancel=True)
+                        staging = None
+                    self._finish(result_queue, {
+                        'type': 'batch_cancelled',
+                        'processed': completed,
+                        'total': self._total
+                    })
+                    return completed
+
+                if not (pending or in_flight or publishing or not feed.done):
+                    break
+
+                if broken and not in_flight:
+                    # Every file the dead worker's pool was running has been reported
+                    broken = False
+                    executor, progress_queue = self._replace_pool(executor, progress_queue)
+
+                # Keep every worker busy while the memory budget (and publish queue) allows
+                while (
+                    pending
+                    and len(in_flight) < self.workers
+                    and (staging is None or staging.has_room())
+                    and self.scheduler.try_admit(pending[-1])
+                ):
+                    input_file = pending.pop()
+                    input_path, output_path = str(input_file), str(self._output_path(input_file))
+                    if staging is not None:
+                        input_path = str(staging.claim_input(input_file))
+                        output_path = str(staging.output_path(output_path))
+                    try:
+                        future = executor.submit(
+                            transform_one, self.model, input_path, output_path, transform_kwargs, progress,
+                            progress_key=str(input_file),
+                            verify_tolerance=self.verify_tolerance,
+                            stop_event=worker_stop_event,
+                            profile_to=self._profile_path(input_file)
+                        )
+                    except BrokenProcessPool:
+                        # Not started: it runs on the new pool
+                        pending.append(input_file)
+                        self.scheduler.release(input_file)
+                        if staging is not None:
+                            staging.release_input(input_file)
+                        broken = True
+                        break
+                    in_flight[future] = input_file
+                    worker_outputs[input_file] = output_path
+
+                if staging is not None:
+                    # Copy the next files to run while the workers are busy
+                    staging.read_ahead(reversed(pending[-self.workers:]))
+
+                if not in_flight:
+                    if publishing:
+                        staging.wait(POLL_INTERVAL)
+                    else:
+                        # Waiting for discovery to find more files
+                        feed.wait(POLL_INTERVAL)
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    in_flight,
+                    timeout=POLL_INTERVAL,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                self._drain_progress(progress_queue, result_queue)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    # A worker process died and the pool failed every file in flight
+                    broken = True
+                    done, _ = concurrent.futures.wait(in_flight)
+
+                for future in done:
+                    input_file = in_flight.pop(future)
+                    output_path = worker_outputs.pop(input_file)
+                    if staging is not None:
+                        staging.release_input(input_file)
+                    try:
+                        result = future.result()
+                        result.input_path = str(input_file)
+                        self.scheduler.release(input_file, self._learnable(result.memory_bytes))
+                        if staging is not None:
+                            # Reported once the writer thread has put the output in place
+                            publishing[input_file] = result
+                            staging.publish(input_file, result.output_path, self._output_path(input_file))
+                            continue
+                        completed += 1
+                        self._file_finished(input_file)
+                        self._file_succeeded(input_file, transform_kwargs, result)
+                        result_queue.put(self._progress_message(input_file, completed, self._total, result))
+                    except TransformCancelled:
+                        # A thread worker saw the cancellation first; reported below
+                        self.scheduler.release(input_file)
+                    except BrokenProcessPool:
+                        completed += 1
+                        errors += 1
+                        self.scheduler.release(input_file)
+                        self._file_finished(input_file)
+                        remove_partial_outputs(output_path)
+                        error = ValueError("Worker process died (it crashed or was killed, "
+                                           "e.g. for running out of memory)")
+                        self._file_failed(input_file, error)
+                        result_queue.put(self._error_message(input_file, error, completed, self._total))
+                    except Exception as e:
+                        completed += 1
+                        self.scheduler.release(input_file)
+                        self._file_finished(input_file)
+                        errors += 1
+                        self._file_failed(input_file, e)
+                        result_queue.put(self._error_message(input_file, e, completed, self._total))
+
+        finally:
+            # Don't block on running workers when cancelled
+            executor.shutdown(wait=not stop_event.is_set(), cancel_futures=True)
+            if progress_queue is not None:
+                progress_queue.close()
+            if staging is not None:
+                staging.close(cancel=stop_event.is_set())
+
+        self._finish(result_queue, {'type': 'batch_complete', 'total': self._total, 'errors': errors})
+        return self._total
+
+    def _replace_pool(self, executor, progress_queue) -> tuple:
+        """
+        Shut down a process pool a worker died in and create a new one.
+
+        Returns:
+            (new executor, new progress queue): the dead worker may have
+            held the old queue's lock
+        """
+        logger.error("A worker process died; restarting the worker pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+        progress_queue.close()
+        progress_queue = multiprocessing.get_context('spawn').Queue()
+        return self._create_executor(progress_queue), progress_queue
+
+    def _discover(self, feed, pending: list, transform_kwargs: dict, result_queue) -> list:
+        """
+        Add newly discovered files to the pending list.
+
+        Files whose output is already current are skipped (incremental
+        mode), files failing preflight are set aside for _take_rejected,
+        and the rest are merged into pending in scheduler order (reversed,
+        so pop() takes the next file).
+
+        Raises:
+            OSError: If discovery failed (e.g. the input directory vanished)
+        """
+        new = feed.take()
+        if not new:
+            return pending
+
+        if self._journal is not None:
+            try:
+                self._journal.add_files(new)
+            except OSError as e:
+                logger.warning(f"Could not update batch journal: {e}")
+
+        if self._manifest is not None:
+            new, up_to_date = self._manifest.partition(new, transform_kwargs)
+            if up_to_date:
+                self._skipped += len(up_to_date)
+                self._journal_completed(*up_to_date)
+                result_queue.put({
+                    'type': 'batch_skipped',
+                    'skipped': self._skipped,
+                    'total': self._total + len(new)
+                })
+
+        self._total += len(new)
+        if self.preflight and new:
+            new = self._preflight(new, result_queue)
+        for input_file in new:
+            self._tracker.add(self.scheduler.file_size(input_file))
+        if self._duplicates is not None and new:
+            for input_file in new:
+                # Found again (rewritten): its earlier output mustn't be reused
+                self._primary_outcomes.pop(input_file, None)
+            new, duplicates = self._duplicates.add(new)
+            for duplicate, primary in duplicates:
+                if primary in self._primary_outcomes:
+                    self._copy_output(duplicate, primary)
+                else:
+                    self._waiting_copies.setdefault(primary, []).append(duplicate)
+        pending = self.scheduler.order_files(pending + new)
+        pending.reverse()
+        return pending
+
+    def _preflight(self, files: list, result_queue) -> list:
+        """
+        Check new files' headers concurrently and post the running estimate.
+
+        Returns:
+            The files that passed; the others are kept for _take_rejected
+        """
+        passed = []
+        for input_file, result in zip(files, preflight_files(files)):
+            self._estimate['checked'] += 1
+            if not result.ok:
+                self._estimate['rejected'] += 1
+                self._rejected.append((input_file, ValueError(result.error)))
+                continue
+
+            passed.append(input_file)
+            self._estimate['bytes'] += result.size
+            self._estimate['entities'] += result.estimated_entities
+            schemas = self._estimate['schemas']
+            schemas[result.schema] = schemas.get(result.schema, 0) + 1
+
+        result_queue.put({
+            'type': 'batch_preflight',
+            'checked': self._estimate['checked'],
+            'rejected': self._estimate['rejected'],
+            'estimated_bytes': self._estimate['bytes'],
+            'estimated_entities': self._estimate['entities'],
+            'schemas': dict(self._estimate['schemas'])
+        })
+        return passed
+
+    def _take_rejected(self) -> list[tuple]:
+        """Return and clear the (input_file, error) pairs that failed preflight."""
+        rejected, self._rejected = self._rejected, []
+        return rejected
+
+    def _output_path(self, input_file):
+        """Return the output path for an input, creating mirrored subdirectories."""
+        output_path = build_output_path(input_file, self._output_dir, self._input_root)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path
+
+    def _profile_path(self, input_file):
+        """Return the output path profile reports are written next to, or None when not profiling."""
+        return str(self._output_path(input_file)) if self.profile else None
+
+    def _file_progress(self, item: tuple, result_queue):
+        """
+        Record a running file's progress and post it, at most every FILE_PROGRESS_INTERVAL.
+
+        Args:
+            item: (input_path, stage, fraction) from transform_one;
+                  fraction is None when only the stage is known
+        """
+        input_path, stage, fraction = item
+        # No cached size: a late report for a file that has already finished
+        size = self.scheduler.cached_size(input_path)
+        if size is None:
+            return
+        if fraction is not None:
+            self._tracker.update(input_path, size, fraction)
+
+        now = time.monotonic()
+        if now - self._file_progress_at < FILE_PROGRESS_INTERVAL:
+            return
+        self._file_progress_at = now
+        result_queue.put({
+            'type': 'batch_file_progress',
+            'filename': os.path.basename(input_path),
+            'stage': stage,
+            'fraction': fraction,
+            **self._tracker.snapshot()
+        })
+
+    def _drain_progress(self, progress_queue, result_queue):
+        """Handle the progress reports process workers have queued."""
+        if progress_queue is None:
+            return
+        while True:
+            try:
+                item = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._file_progress(item, result_queue)
+
+    def _file_finished(self, input_file):
+        """Count a finished file's bytes as done (whether it succeeded or not)."""
+        self._tracker.finish(str(input_file), self.scheduler.file_size(input_file))
+        self.scheduler.forget(input_file)
+
+    def _create_executor(self, progress_queue=None):
+        """Create the pool executor for the configured mode."""
+        if self.mode == MODE_THREAD:
+            return concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+
+        # Always spawn: forking a process that runs a Tk mainloop and
+        # background threads is unsafe, and spawn matches Windows behaviour
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(logging.getLogger().level, progress_queue)
+        )
+
+    def _file_succeeded(self, input_file, transform_kwargs: dict, result):
+        """Add a finished file's timings and record it in the journal and manifest."""
+        for name, stage in result.stages.items():
+            self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + stage['seconds']
+        if self._slowest is None or result.seconds > self._slowest[1]:
+            self._slowest = (input_file.name, result.seconds)
+        if result.profile is not None:
+            for function in result.profile['functions']:
+                name = function['function']
+                self._function_seconds[name] = self._function_seconds.get(name, 0.0) + function['seconds']
+
+        self._journal_completed(input_file)
+        if result.duplicate_of is None:
+            self._settle_copies(input_file, result)
+        if self._manifest is None:
+            return
+
+        try:
+            self._manifest.record(input_file, transform_kwargs)
+            if time.monotonic() - self._manifest_saved_at >= MANIFEST_SAVE_INTERVAL:
+                self._manifest.save()
+                self._manifest_saved_at = time.monotonic()
+        except OSError as e:
+            # The output was written; it just won't be skipped next time
+            logger.warning(f"Could not update manifest for {input_file}: {e}")
+
+    def _file_failed(self, input_file, error: Exception):
+        """
+        Record a failed file in the journal and manifest and settle its duplicates.
+
+        The journal keeps it among the remaining files, so resuming retries
+        it, and the manifest drops its entry, so it is never skipped.
+        """
+        self._settle_copies(input_file, error)
+        if self._journal is not None:
+            try:
+                self._journal.mark_failed(input_file, error)
+            except OSError as e:
+                logger.warning(f"Could not update batch journal: {e}")
+        if self._manifest is not None:
+            self._manifest.forget(input_file)
+
+    def _settle_copies(self, primary, outcome):
+        """
+        Record a distinct input's outcome and give its waiting duplicates their outputs.
+
+        Args:
+            primary: Input file that was transformed
+            outcome: Its TransformResult, or the exception it failed with
+        """
+        if self._duplicates is None:
+            return
+        self._primary_outcomes[primary] = outcome
+        for duplicate in self._waiting_copies.pop(primary, []):
+            self._copy_output(duplicate, primary)
+
+        while len(self._primary_outcomes) > DEDUPE_OUTCOMES_KEPT:
+            oldest = next(iter(self._primary_outcomes))
+            del self._primary_outcomes[oldest]
+            self._duplicates.forget(oldest)
+
+    def _copy_output(self, duplicate, primary):
+        """Link or copy a finished primary's output for a duplicate, queueing the outcome for _report_copies."""
+        outcome = self._primary_outcomes[primary]
+        if isinstance(outcome, Exception):
+            self._copies.append((duplicate, ValueError(f"Same content as {primary.name}, which failed: {outcome}")))
+            return
+
+        output_path = self._output_path(duplicate)
+        start = time.perf_counter()
+        try:
+            method = link_or_copy(outcome.output_path, output_path)
+        except OSError as e:
+            self._copies.append((duplicate, e))
+            return
+        seconds = round(time.perf_counter() - start, 4)
+        logger.info(f"{duplicate.name} has the same content as {primary.name}: output by {method}")
+
+        self._deduplicated += 1
+        self._copies.append((duplicate, dataclasses.replace(
+            outcome,
+            input_path=str(duplicate),
+            output_path=str(output_path),
+            stages={'link': {'seconds': seconds, 'peak_rss_bytes': None}},
+            seconds=seconds,
+            memory_bytes=None,
+            duplicate_of=str(primary),
+            profile=None,
+            # Only the primary's output was verified (this one is identical)
+            verification=None
+        )))
+
+    def _report_copies(self, completed: int, transform_kwargs: dict, result_queue) -> tuple[int, int]:
+        """
+        Post the outcomes of duplicates given outputs since the last call.
+
+        Returns:
+            (completed count including them, number that failed)
+        """
+        copies, self._copies = self._copies, []
+        errors = 0
+        for input_file, outcome in copies:
+            completed += 1
+            self._file_finished(input_file)
+            if isinstance(outcome, Exception):
+                errors += 1
+                result_queue.put(self._error_message(input_file, outcome, completed, self._total))
+                continue
+            self._file_succeeded(input_file, transform_kwargs, outcome)
+            result_queue.put(self._progress_message(input_file, completed, self._total, outcome))
+        return completed, errors
+
+    def _journal_completed(self, *input_files):
+        """Checkpoint finished files in the journal, if there is one."""
+        if self._journal is None:
+            return
+
+        try:
+            self._journal.mark_completed(*input_files)
+        except OSError as e:
+            # Resuming would only redo these files
+            logger.warning(f"Could not update batch journal: {e}")
+
+    def _finish(self, result_queue, message: dict):
+        """Save the manifest, settle the journal and post the final batch message."""
+        if self._manifest is not None:
+            try:
+                self._manifest.save()
+            except OSError as e:
+                logger.warning(f"Could not save manifest: {e}")
+
+        # A cancelled batch keeps its journal so it can be resumed; a
+        # completed batch drops it (its failed files are run by the next batch)
+        if self._journal is not None and message['type'] == 'batch_complete':
+            try:
+                self._journal.finish()
+            except OSError as e:
+                logger.warning(f"Could not remove batch journal: {e}")
+
+        message['skipped'] = self._skipped
+        message['deduplicated'] = self._deduplicated
+        message['timings'] = {
+            'stages': {name: round(seconds, 4) for name, seconds in self._stage_seconds.items()},
+            'slowest': self._slowest
+        }
+        if self.profile:
+            # Summed over each file's hottest functions, so a function hot in few files may be missing
+            hottest = sorted(self._function_seconds.items(), key=lambda item: item[1], reverse=True)
+            message['timings']['hotspots'] = [
+                (name, round(seconds, 4)) for name, seconds in hottest[:SUMMARY_FUNCTIONS]
+            ]
+        result_queue.put(message)
+
+    def _learnable(self, observed_peak: int | None) -> int | None:
+        """Discard memory peaks measured in a process shared by several workers."""
+        return observed_peak if self.mode == MODE_PROCESS else None
+
+    def _progress_message(self, input_file, current: int, total: int, result) -> dict:
+        """Build a 'batch_progress' queue message carrying the file's TransformResult."""
+        return {
+            'type': 'batch_progress',
+            'current': current,
+            'total': total,
+            'filename': input_file.name,
+            'result': result.to_dict(),
+            **self._tracker.snapshot()
+        }
+
+    def _error_message(self, input_file, error: Exception, current: int, total: int) -> dict:
+        """Build a 'batch_error' queue message."""
+        return {
+            'type': 'batch_error',
+            'filename': input_file.name,
+            'error': str(error),
+            'current': current,
+            'total': total,
+            **self._tracker.snapshot()
+        }
+
+
+class _FileFeed:
+    """
+    Collects input files for a BatchRunner.
+
+    Lists are available immediately; other iterables (such as a directory
+    scan generator) are consumed in a background thread so processing can
+    start before discovery finishes.
+    """
+
+    def __init__(self, files, stop_event):
+        """
+        Start collecting files.
+
+        Args:
+            files: List or iterable of input file Paths
+            stop_event: threading.Event that stops discovery early
+        """
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._error = None
+
+        if isinstance(files, (list, tuple)):
+            self._items = list(files)
+            self._done = True
+        else:
+            self._items = []
+            self._done = False
+            thread = threading.Thread(target=self._consume, args=(files, stop_event))
+            thread.daemon = True
+            thread.start()
+
+    @property
+    def done(self) -> bool:
+        """Whether discovery has finished and every file has been taken."""
+        with self._lock:
+            return self._done and not self._items
+
+    def _consume(self, files, stop_event):
+        """Pull files from the iterable until it is exhausted (background thread)."""
+        try:
+            for input_file in files:
+                with self._lock:
+                    self._items.append(input_file)
+                self._changed.set()
+                if stop_event.is_set():
+                    break
+        except Exception as e:
+            logger.error(f"File discovery failed: {e}")
+            self._error = e
+        finally:
+            with self._lock:
+                self._done = True
+            self._changed.set()
+
+    def take(self) -> list:
+        """
+        Return the files discovered since the last call.
+
+        Raises:
+            Exception: The error that stopped discovery, once all files
+                       found before it have been taken
+        """
+        with self._lock:
+            items, self._items = self._items, []
+            self._changed.clear()
+            if not items and self._done and self._error is not None:
+                error, self._error = self._error, None
+                raise error
+        return items
+
+    def wait(self, timeout: float):
+        """Block until more files are discovered, discovery ends, or timeout."""
+        self._changed.wait(timeout)
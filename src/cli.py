@@ -0,0 +1,561 @@
+"""
+IFC Translate Tool - Command Line Entry Point
+
+Runs transformations without Tkinter, for build agents and scripts. Drives
+IFCTransformModel through BatchRunner and prints one JSON object per line
+on stdout for each progress event (the same dictionaries the GUI receives
+on its result queue). Log output goes to stderr.
+
+Usage (run from project root):
+    python -m src.cli INPUT -o OUTPUT_DIR [--x 100 --y 50 --rotation 30]
+    python -m src.cli INPUT -o OUTPUT_DIR --operations '[{"op": "rotate", "angle": 30, "pivot": [100, 50]}, ...]'
+    python -m src.cli INPUT_DIR -o OUTPUT_DIR --preset "Site grid" --workers 4
+    python -m src.cli SHARE_DIR -o OUTPUT_DIR --recursive --exclude "Archive" --include "*_ARC_*"
+    python -m src.cli SHARE_DIR -o SHARE_OUTPUT_DIR --staging-dir /local/scratch
+    python -m src.cli --resume -o OUTPUT_DIR
+    python -m src.cli INPUT -o OUTPUT_DIR --fan-out "Survey" --fan-out "Site grid"
+    python -m src.cli DROP_DIR -o OUTPUT_DIR --preset "Site grid" --watch
+    python -m src.cli INPUT_DIR -o OUTPUT_DIR --preset "Site grid" --verify
+    python -m src.cli INPUT_DIR -o OUTPUT_DIR --preset "Site grid" --audit
+    python -m src.cli SLOW.ifc -o OUTPUT_DIR --preset "Site grid" --profile
+
+Exit codes:
+    0   All files transformed (or watching stopped, or all outputs passed the audit)
+    1   One or more files failed
+    2   Invalid arguments, inputs or preset
+    130 Interrupted (Ctrl+C)
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import logging
+import queue
+import signal
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path for imports when running directly
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.batch import (
+    BatchRunner,
+    EXECUTION_MODES,
+    MODE_PROCESS,
+    MODE_SERIAL,
+    build_transform_kwargs,
+    default_worker_count
+)
+from src.journal import BatchJournal
+from src.model import (
+    IFCTransformModel,
+    TRANSFORM_STRATEGIES,
+    STRATEGY_GEOREFERENCE,
+    STRATEGY_NATIVE
+)
+from src.scheduler import MemoryScheduler, SCHEDULE_ORDERS, ORDER_LARGEST_FIRST
+from src.utils.validation import (
+    validate_input_file,
+    validate_input_directory,
+    validate_output_directory,
+    validate_output_outside_input,
+    iter_ifc_files,
+    build_fanout_output_paths,
+    build_output_path
+)
+from src.verify import DEFAULT_TOLERANCE, audit_outputs
+from src.watch import FolderWatcher, DEFAULT_SETTLE_SECONDS
+
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+# Transform values used when neither a preset nor an option sets them
+DEFAULT_VALUES = {
+    'x': 0.0,
+    'y': 0.0,
+    'z': 0.0,
+    'rotation': 0.0,
+    'rotate_first': True,
+    'strategy': 'ifcpatch'
+}
+
+# Stream the JSON lines are written to (main sends everything else printed to stderr)
+_json_output = sys.stdout
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description="Apply translation/rotation to IFC files without the GUI."
+    )
+    parser.add_argument('input', nargs='?',
+                        help="Input IFC file or directory of IFC files (omit with --resume)")
+    parser.add_argument('-o', '--output-dir', required=True, help="Output directory (must exist)")
+
+    transform = parser.add_argument_group("transformation (overrides preset values)")
+    transform.add_argument('--preset', help="Name of a saved preset to start from")
+    transform.add_argument('--x', type=float, help="X offset in metres")
+    transform.add_argument('--y', type=float, help="Y offset in metres")
+    transform.add_argument('--z', type=float, help="Z offset in metres")
+    transform.add_argument('--rotation', type=float, help="Rotation around Z in degrees")
+    transform.add_argument('--rotate-first', dest='rotate_first', action='store_true', default=None,
+                           help="Rotate before translating (default)")
+    transform.add_argument('--translate-first', dest='rotate_first', action='store_false',
+                           help="Translate before rotating")
+    transform.add_argument('--strategy', choices=TRANSFORM_STRATEGIES, help="Transform method")
+    transform.add_argument('--operations', metavar='JSON',
+                           help="Operation chain applied in one pass instead of the offsets and "
+                                "rotation, e.g. '[{\"op\": \"rotate\", \"angle\": 30, \"pivot\": "
+                                "[100, 50]}, {\"op\": \"translate\", \"x\": 250}]'")
+    transform.add_argument('--fan-out', action='append', metavar='PRESET',
+                           help="Write one output per preset from a single parse of a file "
+                                "input, named INPUT_<preset>.ifc (repeatable; other "
+                                "transformation options except --strategy are ignored)")
+
+    batch = parser.add_argument_group("batch (directory input)")
+    batch.add_argument('--workers', type=int, help="Number of workers (default: CPU cores)")
+    batch.add_argument('--mode', choices=EXECUTION_MODES, default=MODE_PROCESS,
+                       help="Worker type (default: process)")
+    batch.add_argument('--order', choices=SCHEDULE_ORDERS, default=ORDER_LARGEST_FIRST,
+                       help="Processing order (default: largest)")
+    batch.add_argument('--memory-limit', type=float, metavar='GB',
+                       help="RAM budget for all workers (default: 75%% of physical memory)")
+    batch.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=True,
+                       help="Skip files whose output is already current (default: on)")
+    batch.add_argument('--dedupe', action=argparse.BooleanOptionalAction, default=True,
+                       help="Transform identical inputs once and link or copy the output for the "
+                            "others (default: on)")
+    batch.add_argument('--preflight', action=argparse.BooleanOptionalAction, default=True,
+                       help="Check each file's IFC header before transforming it and report "
+                            "the estimated batch size (default: on)")
+    batch.add_argument('-r', '--recursive', action='store_true',
+                       help="Search subdirectories and mirror them in the output directory")
+    batch.add_argument('--include', action='append', metavar='PATTERN',
+                       help="Only process files matching this glob (relative path or name; repeatable)")
+    batch.add_argument('--exclude', action='append', metavar='PATTERN',
+                       help="Skip files and directories matching this glob (repeatable)")
+    batch.add_argument('--staging-dir', metavar='DIR',
+                       help="Fast local directory to read inputs ahead into and write outputs through, "
+                            "so workers don't wait on slow or network storage")
+    batch.add_argument('--resume', action='store_true',
+                       help="Resume the interrupted batch journaled in the output directory, "
+                            "with its original parameters")
+
+    watch = parser.add_argument_group("watch (directory input)")
+    watch.add_argument('--watch', action='store_true',
+                       help="Keep running and transform IFC files as they are added to or "
+                            "replaced in the input directory, including files already there "
+                            "(stop with Ctrl+C or SIGTERM)")
+    watch.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS, metavar='SECONDS',
+                       help="Seconds a file must be unchanged before it is transformed "
+                            "(default: %(default)s)")
+    watch.add_argument('--poll', action='store_true',
+                       help="Poll for changes instead of using inotify (for network shares "
+                            "written to by other machines)")
+
+    verify = parser.add_argument_group("verification")
+    verify.add_argument('--verify', action='store_true',
+                        help="Check each output's root placements and a sample of its points "
+                             "against the input before publishing it; failing outputs are "
+                             "reported as errors and not written")
+    verify.add_argument('--audit', action='store_true',
+                        help="Instead of transforming, check the outputs already in the output "
+                             "directory against the inputs and transformation options")
+    verify.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, metavar='METRES',
+                        help="Allowed position error (default: %(default)s)")
+
+    diagnostics = parser.add_argument_group("diagnostics")
+    diagnostics.add_argument('--profile', action='store_true',
+                             help="Profile each transformation with cProfile and tracemalloc, writing "
+                                  "NAME.prof and NAME.profile.txt next to each output and listing the "
+                                  "hottest functions in the final message (slower; not used by --fan-out)")
+
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only log warnings and errors")
+    return parser
+
+
+def load_presets(names: list[str]) -> dict:
+    """
+    Load saved presets by name.
+
+    Raises:
+        ValueError: If a named preset does not exist
+    """
+    # Imported lazily: only needed (with platformdirs) when a preset is used
+    from src.presets_model import open_presets_model
+    presets_model = open_presets_model()
+    presets = {}
+    for name in names:
+        presets[name] = presets_model.get_preset(name)
+        if presets[name] is None:
+            raise ValueError(f"Preset not found: {name}")
+    return presets
+
+
+def resolve_values(args) -> dict:
+    """
+    Combine defaults, the optional preset and explicit options.
+
+    Raises:
+        ValueError: If the named preset does not exist or the operation
+                    chain is invalid
+    """
+    values = dict(DEFAULT_VALUES)
+
+    if args.preset:
+        values.update(load_presets([args.preset])[args.preset])
+
+    explicit = any(getattr(args, key) is not None for key in ('x', 'y', 'z', 'rotation', 'rotate_first'))
+    if explicit and args.operations is not None:
+        raise ValueError("--operations cannot be combined with offset, rotation or order options")
+    if explicit:
+        # Explicit values replace a preset's operation chain
+        values.pop('operations', None)
+    if args.operations is not None:
+        try:
+            values['operations'] = json.loads(args.operations)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"--operations is not valid JSON: {e}")
+
+    for key in ('x', 'y', 'z', 'rotation', 'rotate_first', 'strategy'):
+        value = getattr(args, key)
+        if value is not None:
+            values[key] = value
+
+    # Reject an invalid chain before any file is touched
+    build_transform_kwargs(values)
+    return values
+
+
+def create_batch_runner(args, checkpoint: bool = True) -> BatchRunner:
+    """
+    Create a BatchRunner (checkpointing by default) from the batch options.
+
+    Raises:
+        ValueError: If the options are invalid (e.g. a missing staging directory)
+    """
+    return BatchRunner(
+        IFCTransformModel(),
+        workers=args.workers,
+        mode=args.mode,
+        scheduler=MemoryScheduler(
+            budget_bytes=int(args.memory_limit * 1024 ** 3) if args.memory_limit else None,
+            order=args.order
+        ),
+        incremental=args.incremental,
+        checkpoint=checkpoint,
+        preflight=args.preflight,
+        verify_tolerance=args.tolerance if args.verify else None,
+        staging_dir=validate_output_directory(args.staging_dir) if args.staging_dir else None,
+        dedupe=args.dedupe,
+        profile=args.profile
+    )
+
+
+def run_fanout(args) -> int:
+    """
+    Transform one input with several presets from a single parse.
+
+    Reports each output as a batch_progress message, so consumers handle
+    fan-out like a batch. Returns the process exit code.
+    """
+    try:
+        if args.input is None or Path(args.input).is_dir():
+            raise ValueError("--fan-out needs a single input file")
+        if args.strategy == STRATEGY_GEOREFERENCE:
+            raise ValueError("Fan-out is not supported with the georeference strategy")
+        input_path = validate_input_file(args.input)
+        validate_output_directory(args.output_dir)
+        presets = load_presets(args.fan_out)
+        output_paths = build_fanout_output_paths(input_path, args.output_dir, args.fan_out)
+        targets = [
+            (str(path), build_transform_kwargs(presets[name]))
+            for name, path in zip(args.fan_out, output_paths)
+        ]
+    except ValueError as e:
+        emit({'type': 'error', 'message': str(e)})
+        return EXIT_USAGE
+
+    total = len(targets)
+    emit({'type': 'batch_start', 'total': total, 'fan_out': args.fan_out})
+    emitted = []
+
+    def on_result(result):
+        current = len(emitted) + 1
+        emitted.append(result)
+        emit({
+            'type': 'batch_progress',
+            'current': current,
+            'total': total,
+            'filename': Path(result.output_path).name,
+            'result': result.to_dict()
+        })
+
+    try:
+        IFCTransformModel().transform_file_fanout(
+            str(input_path), targets, args.strategy or STRATEGY_NATIVE, on_result=on_result
+        )
+    except KeyboardInterrupt:
+        emit({'type': 'batch_cancelled', 'processed': len(emitted), 'total': total,
+              'skipped': 0, 'timings': None})
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        emit({'type': 'batch_error', 'filename': input_path.name, 'error': str(e),
+              'current': len(emitted) + 1, 'total': total})
+        emit({'type': 'batch_complete', 'total': total, 'errors': 1, 'skipped': 0, 'timings': None})
+        return EXIT_FAILURES
+
+    emit({'type': 'batch_complete', 'total': total, 'errors': 0, 'skipped': 0, 'timings': None})
+    return EXIT_OK
+
+
+def run_watch(args) -> int:
+    """
+    Transform IFC files as they appear in the input directory, until stopped.
+
+    Runs like a directory batch whose file list never ends, so workers
+    stay warm between files. Ctrl+C or SIGTERM stops watching and stops
+    running files (removing their partial outputs). Failed files are
+    reported as batch_error events;
+    the exit code is 0 once watching has stopped.
+    """
+    try:
+        if args.input is None or not Path(args.input).is_dir():
+            raise ValueError("--watch needs an input directory")
+        if args.resume:
+            raise ValueError("--watch cannot be combined with --resume")
+        input_dir = validate_input_directory(args.input).resolve()
+        output_dir = validate_output_directory(args.output_dir).resolve()
+        validate_output_outside_input(input_dir, output_dir, args.recursive)
+        values = resolve_values(args)
+        # A batch journal is pointless for an endless batch; the manifest
+        # still skips files that were already transformed before a restart
+        runner = create_batch_runner(args, checkpoint=False)
+    except ValueError as e:
+        emit({'type': 'error', 'message': str(e)})
+        return EXIT_USAGE
+
+    stop_event = threading.Event()
+    watcher = FolderWatcher(
+        input_dir, args.recursive, args.include, args.exclude,
+        settle_seconds=args.settle, use_inotify=not args.poll
+    )
+
+    # Service managers stop daemons with SIGTERM
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    code = follow_batch(
+        runner, watcher.watch(stop_event), args.output_dir, build_transform_kwargs(values),
+        {'type': 'batch_start', 'total': None, 'values': values, 'watch': str(input_dir)},
+        stop_event, input_root=input_dir if args.recursive else None
+    )
+    return EXIT_OK if code == EXIT_INTERRUPTED else code
+
+
+def run_audit(args) -> int:
+    """
+    Verify the outputs already in the output directory against their inputs.
+
+    Emits an 'audit_result' event per file (carrying its verification
+    result, or an error such as a missing output) and a final
+    'audit_complete' with the number of failed files. Returns the process
+    exit code.
+    """
+    try:
+        if args.input is None:
+            raise ValueError("--audit needs the input file or directory")
+        output_dir = validate_output_directory(args.output_dir)
+        values = resolve_values(args)
+        input_root = None
+        if Path(args.input).is_dir():
+            validate_input_directory(args.input)
+            files = list(iter_ifc_files(args.input, args.recursive, args.include, args.exclude))
+            if not files:
+                raise ValueError("No IFC files found in directory")
+            if args.recursive:
+                input_root = args.input
+        else:
+            files = [validate_input_file(args.input)]
+    except ValueError as e:
+        emit({'type': 'error', 'message': str(e)})
+        return EXIT_USAGE
+
+    total = len(files)
+    output_paths = [build_output_path(f, output_dir, input_root) for f in files]
+    emit({'type': 'audit_start', 'total': total, 'values': values, 'tolerance': args.tolerance})
+
+    failed = 0
+    current = 0
+    try:
+        for input_file, outcome in audit_outputs(
+            files, output_paths, build_transform_kwargs(values), args.tolerance,
+            workers=args.workers or default_worker_count()
+        ):
+            current += 1
+            message = {'type': 'audit_result', 'current': current, 'total': total,
+                       'filename': Path(input_file).name}
+            if isinstance(outcome, Exception):
+                message['error'] = str(outcome)
+                failed += 1
+            else:
+                message['verification'] = outcome.to_dict()
+                failed += not outcome.ok
+            emit(message)
+    except KeyboardInterrupt:
+        emit({'type': 'audit_cancelled', 'processed': current, 'total': total, 'failed': failed})
+        return EXIT_INTERRUPTED
+
+    emit({'type': 'audit_complete', 'total': total, 'failed': failed})
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def follow_batch(
+    runner: BatchRunner,
+    files,
+    output_dir,
+    transform_kwargs: dict,
+    start_message: dict,
+    stop_event,
+    journal: BatchJournal | None = None,
+    input_root=None
+) -> int:
+    """
+    Run a batch in a background thread, emitting its messages until it ends.
+
+    Returns:
+        The process exit code
+    """
+    result_queue = queue.Queue()
+    thread = threading.Thread(
+        target=runner.run,
+        args=(files, output_dir, transform_kwargs, result_queue, stop_event),
+        kwargs={'journal': journal, 'input_root': input_root}
+    )
+    thread.daemon = True
+
+    emit(start_message)
+    thread.start()
+
+    errors = 0
+    try:
+        while True:
+            try:
+                message = result_queue.get(timeout=0.5)
+            except queue.Empty:
+                if not thread.is_alive():
+                    # Runner died without a final message
+                    emit({'type': 'error', 'message': "Batch runner stopped unexpectedly"})
+                    return EXIT_FAILURES
+                continue
+
+            emit(message)
+            if message['type'] == 'batch_error':
+                errors += 1
+            elif message['type'] == 'batch_complete':
+                return EXIT_FAILURES if errors else EXIT_OK
+            elif message['type'] == 'batch_cancelled':
+                return EXIT_INTERRUPTED
+
+    except KeyboardInterrupt:
+        # Let the runner stop running files and report the cancellation
+        stop_event.set()
+        thread.join()
+        while not result_queue.empty():
+            emit(result_queue.get_nowait())
+        return EXIT_INTERRUPTED
+
+
+def emit(message: dict):
+    """Write one JSON progress line to stdout."""
+    _json_output.write(json.dumps(message) + "\n")
+    _json_output.flush()
+
+
+def main(argv=None) -> int:
+    """Command line entry point. Returns the process exit code."""
+    global _json_output
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.input is None and not args.resume:
+        parser.error("the following arguments are required: input")
+
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    # IfcPatch recipes print notes to stdout; only JSON lines may go there
+    _json_output = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        return run_transform(args)
+
+
+def run_transform(args) -> int:
+    """Run the transformation, watch or audit the parsed arguments ask for."""
+    if args.fan_out:
+        return run_fanout(args)
+    if args.watch:
+        return run_watch(args)
+    if args.audit:
+        return run_audit(args)
+
+    journal = None
+    try:
+        validate_output_directory(args.output_dir)
+
+        if args.resume:
+            journal = BatchJournal.load(args.output_dir)
+            if journal is None:
+                raise ValueError("No interrupted batch to resume in output directory")
+            files = journal.remaining_files()
+            transform_kwargs = journal.transform_kwargs
+            input_root = journal.input_root
+            runner = create_batch_runner(args)
+            start_message = {'type': 'batch_start', 'total': len(files), 'resumed': True,
+                             'transform_kwargs': transform_kwargs}
+        else:
+            values = resolve_values(args)
+            transform_kwargs = build_transform_kwargs(values)
+            input_root = None
+            if Path(args.input).is_dir():
+                validate_input_directory(args.input)
+                validate_output_outside_input(args.input, args.output_dir, args.recursive)
+                # Discovered lazily so work starts while large trees are scanned
+                files = iter_ifc_files(args.input, args.recursive, args.include, args.exclude)
+                first = next(files, None)
+                if first is None:
+                    raise ValueError("No IFC files found in directory")
+                files = itertools.chain([first], files)
+                if args.recursive:
+                    input_root = args.input
+                runner = create_batch_runner(args)
+                # The total is reported by progress messages as files are found
+                start_message = {'type': 'batch_start', 'total': None, 'values': values}
+            else:
+                files = [validate_input_file(args.input)]
+                runner = BatchRunner(IFCTransformModel(), workers=1, mode=MODE_SERIAL,
+                                     preflight=args.preflight,
+                                     verify_tolerance=args.tolerance if args.verify else None,
+                                     profile=args.profile)
+                start_message = {'type': 'batch_start', 'total': 1, 'values': values}
+
+    except ValueError as e:
+        emit({'type': 'error', 'message': str(e)})
+        return EXIT_USAGE
+
+    return follow_batch(
+        runner, files, args.output_dir, transform_kwargs, start_message,
+        threading.Event(), journal=journal, input_root=input_root
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,17 +5,50 @@ Provides the TransformController class that wires together the model and view,
 handles user events, manages background processing, and provides user feedback.
 """
 
+import os
 import threading
+import time
 import queue
+from src.batch import BatchRunner, TransformWorker, build_transform_kwargs, resolve_operations
+from src.journal import BatchJournal
+from src.model import TransformCancelled
+from src.preflight import preflight_file
+from src.scheduler import MemoryScheduler
 from src.utils.validation import (
     validate_input_file,
     validate_output_directory,
     validate_input_directory,
-    find_ifc_files,
-    build_output_path
+    validate_output_outside_input,
+    iter_ifc_files,
+    build_output_path,
+    build_fanout_output_paths
 )
 
 
+# Queue polling intervals (ms): fast while messages are arriving, slower when idle
+QUEUE_POLL_BUSY_MS = 50
+QUEUE_POLL_IDLE_MS = 200
+
+# Longest time (seconds) one poll may spend draining the queue, so a flood of
+# messages can't freeze the UI
+QUEUE_DRAIN_BUDGET = 0.05
+
+# Messages whose only UI effect is the progress display (coalesced per poll)
+PROGRESS_MESSAGES = ('batch_progress', 'batch_error', 'batch_file_progress')
+
+# Progress display names of TransformResult stages
+STAGE_LABELS = {
+    'open': "parsing",
+    'unit_scale': "reading units",
+    'patch': "transforming",
+    'scan': "scanning",
+    'write': "writing",
+}
+
+# Most presets listed in the dropdown at once (type to narrow by prefix)
+PRESET_DROPDOWN_LIMIT = 200
+
+
 class TransformController:
     """
     Controller for coordinating IFC transformation workflow.
@@ -42,7 +75,12 @@ class TransformController:
         self.presets_model = presets_model
         self.result_queue = queue.Queue()
         self.stop_event = threading.Event()
+        self._worker_thread = None
+        # Warm worker process for single-file runs and fan-out
+        self.transform_worker = TransformWorker(model)
         self.batch_errors = []
+        self._batch_count = (0, 0)
+        self._on_ready = None
 
         # Wire controller to view
         view.set_controller(self)
@@ -56,61 +94,173 @@ class TransformController:
 
     def _start_queue_polling(self):
         """Start periodic queue polling to check for thread results."""
-        self.view.root.after(100, self._check_queue)
+        self.view.root.after(QUEUE_POLL_IDLE_MS, self._check_queue)
 
     def _check_queue(self):
         """
         Check result queue for background thread results.
 
-        This runs periodically (every 100ms) to process results from
-        the background transformation thread in a thread-safe manner.
+        This runs periodically to process results from the background
+        transformation thread in a thread-safe manner. Every pending message
+        is drained on each poll (within QUEUE_DRAIN_BUDGET), and consecutive
+        progress messages are merged so the progress display is redrawn at
+        most once per poll. Polling is faster while messages are arriving.
         """
-        try:
-            # Non-blocking check for results
-            result = self.result_queue.get_nowait()
-
-            # Handle batch processing messages
-            msg_type = result.get('type')
-
-            if msg_type == 'batch_progress':
-                self.view.update_batch_progress(
-                    result['current'],
-                    result['total'],
-                    result['filename']
-                )
-
-            elif msg_type == 'batch_error':
-                # Update progress even on error (batch continues)
-                self.view.update_batch_progress(
-                    result['current'],
-                    result['total'],
-                    f"ERROR: {result['filename']}"
-                )
-
-            elif msg_type == 'batch_cancelled':
-                self.view.set_processing(False)
-                self.view.end_batch_progress()
-                self.view.show_status(f"Cancelled after {result['processed']}/{result['total']} files")
-
-            elif msg_type == 'batch_complete':
-                self.view.set_processing(False)
-                self.view.end_batch_progress()
-                self._show_batch_summary(result['total'], result['errors'])
-
-            elif result.get('success') is not None:
-                # Existing single-file handling
-                self.view.set_processing(False)
-                if result['success']:
-                    self.view.show_success(result['message'])
-                else:
-                    self.view.show_error(result['message'])
-
-        except queue.Empty:
-            # No results yet, continue polling
-            pass
+        deadline = time.monotonic() + QUEUE_DRAIN_BUDGET
+        latest_progress = None
+        drained = 0
+
+        while time.monotonic() < deadline:
+            try:
+                # Non-blocking check for results
+                result = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            drained += 1
+
+            if result.get('type') in PROGRESS_MESSAGES:
+                if result['type'] == 'batch_error':
+                    self.batch_errors.append((result['filename'], result['error']))
+                if result['type'] != 'batch_file_progress':
+                    self._batch_count = (result['current'], result['total'])
+                latest_progress = result
+                continue
+
+            # Show progress before anything that ends or resets it
+            if latest_progress is not None:
+                self._show_progress(latest_progress)
+                latest_progress = None
+            self._handle_message(result)
+
+        if latest_progress is not None:
+            self._show_progress(latest_progress)
 
         # Schedule next queue check
-        self.view.root.after(100, self._check_queue)
+        interval = QUEUE_POLL_BUSY_MS if drained else QUEUE_POLL_IDLE_MS
+        self.view.root.after(interval, self._check_queue)
+
+    def _show_progress(self, result):
+        """Display a batch_progress, batch_error or batch_file_progress message."""
+        filename = result['filename']
+        if result['type'] == 'batch_error':
+            filename = f"ERROR: {filename}"
+        elif result['type'] == 'batch_file_progress':
+            stage = STAGE_LABELS.get(result['stage'], result['stage'])
+            if result['fraction'] is not None:
+                stage += f" {result['fraction']:.0%}"
+            filename = f"{filename} - {stage}"
+
+        current, total = self._batch_count
+        bytes_total = result.get('bytes_total')
+        self.view.update_batch_progress(
+            current,
+            total,
+            filename,
+            fraction=result['bytes_done'] / bytes_total if bytes_total else None,
+            detail=self._format_throughput(result)
+        )
+
+    @staticmethod
+    def _format_throughput(result) -> str:
+        """Return e.g. '120 of 2,400 MB, 35.2 MB/s, about 1m 05s left' ('' if unknown)."""
+        if not result.get('bytes_total'):
+            return ""
+        text = (f"{result['bytes_done'] / 1024 ** 2:,.0f} of "
+                f"{result['bytes_total'] / 1024 ** 2:,.0f} MB, {result['mb_per_s']:.1f} MB/s")
+        eta = result['eta_seconds']
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            hours, minutes = divmod(minutes, 60)
+            if hours:
+                text += f", about {hours}h {minutes:02d}m left"
+            elif minutes:
+                text += f", about {minutes}m {seconds:02d}s left"
+            else:
+                text += f", about {seconds}s left"
+        return text
+
+    def _handle_message(self, result):
+        """Handle one non-progress message from the result queue."""
+        # Handle batch processing messages
+        msg_type = result.get('type')
+
+        if msg_type == 'libraries_ready':
+            self._handle_libraries_ready(result)
+
+        elif msg_type == 'batch_skipped':
+            # Only the remaining files will report progress
+            self.view.start_batch_progress(result['total'])
+            self.view.show_status(f"Skipping {result['skipped']} unchanged files")
+
+        elif msg_type == 'batch_preflight':
+            rejected = f", {result['rejected']} rejected" if result['rejected'] else ""
+            self.view.show_status(
+                f"Checked {result['checked']} files: "
+                f"{result['estimated_bytes'] / 1024 ** 2:.0f} MB, "
+                f"~{result['estimated_entities']:,} entities{rejected}"
+            )
+
+        elif msg_type == 'transform_cancelled':
+            self.view.show_status("Cancelled; partial output removed")
+
+        elif msg_type == 'batch_cancelled':
+            self.view.set_processing(False)
+            self.view.end_batch_progress()
+            self.view.show_status(f"Cancelled after {result['processed']}/{result['total']} files")
+
+        elif msg_type == 'batch_complete':
+            self.view.set_processing(False)
+            self.view.end_batch_progress()
+            self._show_batch_summary(
+                result['total'], len(self.batch_errors), result['skipped'], result['timings'],
+                result['deduplicated']
+            )
+
+        elif result.get('success') is not None:
+            # Existing single-file handling (also ends fan-out progress)
+            self.view.set_processing(False)
+            self.view.end_batch_progress()
+            if result['success']:
+                self.view.show_success(result['message'])
+            else:
+                self.view.show_error(result['message'])
+
+    def start_warm_up(self, on_ready=None):
+        """
+        Start the worker process, which loads the IFC libraries.
+
+        Transforms run in the worker, so the GUI process never imports
+        ifcopenshell/ifcpatch for them. The Process button stays disabled
+        until the worker reports it has loaded them, so the window can
+        appear before the slow imports.
+
+        Args:
+            on_ready: Optional callback receiving the import time in seconds
+        """
+        self._on_ready = on_ready
+        self.view.set_ready(False)
+
+        thread = threading.Thread(target=self._run_warm_up)
+        thread.daemon = True
+        thread.start()
+
+    def _run_warm_up(self):
+        """Wait for the worker to load the IFC libraries in background thread (no UI calls)."""
+        try:
+            seconds = self.transform_worker.wait_ready()
+            self.result_queue.put({'type': 'libraries_ready', 'seconds': seconds})
+        except Exception as e:
+            self.result_queue.put({'type': 'libraries_ready', 'error': str(e)})
+
+    def _handle_libraries_ready(self, result):
+        """Enable processing once the IFC libraries have loaded."""
+        if 'error' in result:
+            self.view.show_error(f"Failed to load IFC libraries: {result['error']}")
+            return
+
+        self.view.set_ready(True)
+        if self._on_ready is not None:
+            self._on_ready(result['seconds'])
 
     def on_process_clicked(self):
         """
@@ -119,6 +269,9 @@ class TransformController:
         Validates inputs, starts background transformation thread,
         and updates UI state.
         """
+        if self._is_stopping():
+            return
+
         # Check if batch mode is enabled
         if self.view.get_batch_mode():
             self._on_batch_process_clicked()
@@ -133,54 +286,66 @@ class TransformController:
             validate_output_directory(values['output_dir'])
             output_path = build_output_path(values['input_file'], values['output_dir'])
 
+            # Reject non-IFC and truncated files before the slow parse
+            preflight = preflight_file(values['input_file'])
+            if not preflight.ok:
+                raise ValueError(preflight.error)
+
         except ValueError as e:
             # Show validation error to user
             self.view.show_error(str(e))
             return
 
         # Set UI to processing state
+        self.stop_event.clear()
+        self.view.reset_cancel()
         self.view.set_processing(True)
 
         # Start background transformation thread
         thread = threading.Thread(
             target=self._run_transformation,
-            args=(values, output_path)
+            args=(values, output_path, self.view.get_profile())
         )
         thread.daemon = True
         thread.start()
+        self._worker_thread = thread
 
-    def _run_transformation(self, values, output_path):
+    def _run_transformation(self, values, output_path, profile=False):
         """
         Run transformation in background thread.
 
         This method runs in a separate thread and must NOT make direct UI calls.
-        Results are communicated via the result queue.
+        Results are communicated via the result queue. The transformation
+        runs in the warm worker process, which is killed if cancelled.
 
         Args:
             values: Dictionary of form values from view
             output_path: Path object for output file
+            profile: If True, write profile reports next to the output
         """
         try:
-            # Determine rotation value (None if 0)
-            rotation_z = values['rotation'] if values['rotation'] != 0 else None
-
             # Execute transformation
-            self.model.transform_file(
-                input_path=values['input_file'],
-                output_path=str(output_path),
-                x=values['x'],
-                y=values['y'],
-                z=values['z'],
-                should_rotate_first=values['rotate_first'],
-                rotation_z=rotation_z
+            result = self.transform_worker.transform(
+                values['input_file'],
+                str(output_path),
+                build_transform_kwargs(values),
+                self.stop_event,
+                profile=profile
             )
 
             # Put success result in queue
             self.result_queue.put({
                 'success': True,
-                'message': f'Transformation complete!\nOutput: {output_path}'
+                'message': (
+                    f'Transformation complete!\nOutput: {output_path}\n\n{result.summary()}'
+                    f'{self._format_profile(result.profile)}'
+                ),
+                'result': result.to_dict()
             })
 
+        except TransformCancelled:
+            self.result_queue.put({'type': 'transform_cancelled'})
+
         except ValueError as e:
             # Validation error from model
             self.result_queue.put({
@@ -205,25 +370,57 @@ class TransformController:
         try:
             validate_input_directory(input_dir)
             validate_output_directory(values['output_dir'])
+            validate_output_outside_input(input_dir, values['output_dir'], self.view.get_recursive())
         except ValueError as e:
             self.view.show_error(str(e))
             return
 
-        # Find IFC files
-        files = find_ifc_files(input_dir)
+        # Configure worker pool and memory-aware scheduling
+        runner = BatchRunner(
+            self.model,
+            workers=self.view.get_worker_count(),
+            scheduler=MemoryScheduler(
+                budget_bytes=self.view.get_memory_limit_bytes(),
+                order=self.view.get_processing_order()
+            ),
+            incremental=self.view.get_skip_unchanged(),
+            checkpoint=True,
+            preflight=True,
+            dedupe=True,
+            profile=self.view.get_profile()
+        )
 
-        # Check if any files found
-        if len(files) == 0:
-            self.view.show_error("No IFC files found in directory")
-            return
+        # Offer to resume an interrupted batch with its original parameters
+        transform_kwargs = build_transform_kwargs(values)
+        journal = BatchJournal.load(values['output_dir'])
+        if journal is not None:
+            files = journal.remaining_files()
+            if files and self.view.confirm_resume(len(files), len(journal.files), journal.started):
+                transform_kwargs = journal.transform_kwargs
+                input_root = journal.input_root
+            else:
+                journal = None
+
+        if journal is None:
+            # Find IFC files lazily: workers start while a large tree is scanned.
+            # Recursive batches mirror input subfolders in the output folder.
+            recursive = self.view.get_recursive()
+            files = iter_ifc_files(
+                input_dir,
+                recursive=recursive,
+                include=self.view.get_include_patterns(),
+                exclude=self.view.get_exclude_patterns()
+            )
+            input_root = input_dir if recursive else None
 
         # Reset state
         self.stop_event.clear()
         self.batch_errors = []
+        self._batch_count = (0, 0)
         self.view.reset_cancel()
 
-        # Start progress
-        self.view.start_batch_progress(len(files))
+        # Start progress (the total grows as files are discovered)
+        self.view.start_batch_progress()
 
         # Set UI to processing
         self.view.set_processing(True)
@@ -231,71 +428,199 @@ class TransformController:
         # Start thread
         thread = threading.Thread(
             target=self._run_batch_transformation,
-            args=(files, values)
+            args=(runner, files, values['output_dir'], transform_kwargs, journal, input_root)
         )
         thread.daemon = True
         thread.start()
+        self._worker_thread = thread
 
-    def _run_batch_transformation(self, files, values):
-        """Run batch transformation in background thread."""
-        output_dir = values['output_dir']
-        rotation_z = values['rotation'] if values['rotation'] != 0 else None
-
-        for i, input_file in enumerate(files):
-            # Check cancellation before each file
-            if self.stop_event.is_set():
-                self.result_queue.put({
-                    'type': 'batch_cancelled',
-                    'processed': i,
-                    'total': len(files)
-                })
-                return
+    def _run_batch_transformation(self, runner, files, output_dir, transform_kwargs, journal, input_root):
+        """
+        Run batch transformation in background thread.
 
-            output_path = build_output_path(str(input_file), output_dir)
+        Files are fanned out to a pool of worker processes by BatchRunner,
+        which posts per-file results to the result queue as they finish.
 
-            try:
-                self.model.transform_file(
-                    input_path=str(input_file),
-                    output_path=str(output_path),
-                    x=values['x'],
-                    y=values['y'],
-                    z=values['z'],
-                    should_rotate_first=values['rotate_first'],
-                    rotation_z=rotation_z
-                )
-                # Report progress
-                self.result_queue.put({
-                    'type': 'batch_progress',
-                    'current': i + 1,
-                    'total': len(files),
-                    'filename': input_file.name
-                })
-            except Exception as e:
-                # Log error but continue batch
-                self.batch_errors.append((input_file.name, str(e)))
-                self.result_queue.put({
-                    'type': 'batch_error',
-                    'filename': input_file.name,
-                    'error': str(e),
-                    'current': i + 1,
-                    'total': len(files)
-                })
-
-        # Batch complete
-        self.result_queue.put({
-            'type': 'batch_complete',
-            'total': len(files),
-            'errors': len(self.batch_errors)
-        })
-
-    def _show_batch_summary(self, total, error_count):
+        Args:
+            runner: Configured BatchRunner
+            files: Input file Paths (list or discovery generator)
+            output_dir: Directory for output files
+            transform_kwargs: transform_file keyword arguments
+            journal: BatchJournal being resumed, or None for a new batch
+            input_root: Input directory mirrored in output_dir, or None
+        """
+        try:
+            runner.run(
+                files,
+                output_dir,
+                transform_kwargs,
+                self.result_queue,
+                self.stop_event,
+                journal=journal,
+                input_root=input_root
+            )
+        except Exception as e:
+            # Pool failed to start (e.g. process spawn error)
+            self.result_queue.put({
+                'success': False,
+                'message': f'Batch processing failed: {e}'
+            })
+
+    def on_fanout_clicked(self):
+        """
+        Handle Fan out button click.
+
+        Asks which presets to apply, then writes one output per preset from
+        a single parse of the input file, named '<input>_<preset>.ifc'.
+        """
+        if self._is_stopping():
+            return
+
+        if self.view.get_batch_mode():
+            self.view.show_error("Fan-out works on a single input file")
+            return
+
+        values = self.view.get_values()
+        try:
+            validate_input_file(values['input_file'])
+            validate_output_directory(values['output_dir'])
+        except ValueError as e:
+            self.view.show_error(str(e))
+            return
+
+        preset_names = self.view.ask_fanout_presets(self.presets_model.list_presets())
+        if not preset_names:
+            return
+
+        output_paths = build_fanout_output_paths(values['input_file'], values['output_dir'], preset_names)
+        try:
+            targets = []
+            for name, path in zip(preset_names, output_paths):
+                preset = self.presets_model.get_preset(name)
+                if preset is None:
+                    # Deleted or renamed (e.g. by another instance sharing the presets)
+                    raise ValueError(f"Preset not found: {name}")
+                targets.append((str(path), build_transform_kwargs(preset)))
+        except ValueError as e:
+            self.view.show_error(str(e))
+            return
+
+        self.stop_event.clear()
+        self.view.reset_cancel()
+        self._batch_count = (0, len(targets))
+        self.view.start_batch_progress(len(targets))
+        self.view.set_processing(True)
+
+        thread = threading.Thread(
+            target=self._run_fanout,
+            args=(values['input_file'], targets, values['strategy'])
+        )
+        thread.daemon = True
+        thread.start()
+        self._worker_thread = thread
+
+    def _run_fanout(self, input_file, targets, strategy):
+        """
+        Run a fan-out transformation in background thread (no UI calls).
+
+        Posts a batch_progress message per output written, then a
+        single-file style result listing the outputs. The fan-out runs in
+        the warm worker process, which is killed if cancelled (outputs
+        already written are kept).
+
+        Args:
+            input_file: Input IFC file path
+            targets: (output_path, transform kwargs) pairs
+            strategy: Transform strategy from the form
+        """
+        total = len(targets)
+        results = []
+
+        def on_result(result):
+            self.result_queue.put({
+                'type': 'batch_progress',
+                'current': len(results) + 1,
+                'total': total,
+                'filename': os.path.basename(result.output_path),
+                'result': result.to_dict()
+            })
+            results.append(result)
+
+        try:
+            self.transform_worker.fanout(input_file, targets, strategy, self.stop_event, on_result=on_result)
+            outputs = "\n".join(
+                f"  - {os.path.basename(r.output_path)} ({r.seconds:.2f}s)" for r in results
+            )
+            self.result_queue.put({
+                'success': True,
+                'message': f'Fan-out complete!\n\nWrote {total} outputs from one read of the input:\n{outputs}',
+                'results': [r.to_dict() for r in results]
+            })
+
+        except TransformCancelled:
+            self.result_queue.put({'type': 'transform_cancelled'})
+
+        except ValueError as e:
+            self.result_queue.put({
+                'success': False,
+                'message': str(e)
+            })
+
+        except Exception as e:
+            self.result_queue.put({
+                'success': False,
+                'message': f'Fan-out failed after {len(results)} of {total} outputs: {e}'
+            })
+
+    @staticmethod
+    def _format_batch_timings(timings):
+        """Return the stage time totals, slowest file and hottest functions for the batch summary."""
+        if not timings or not timings['stages']:
+            return ""
+        stages = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings['stages'].items())
+        name, seconds = timings['slowest']
+        text = f"\n\nTime by stage (all files): {stages}\nSlowest file: {name} ({seconds:.1f}s)"
+        if timings.get('hotspots'):
+            hotspots = "\n".join(f"  - {function}: {spent:.2f}s" for function, spent in timings['hotspots'][:5])
+            text += f"\nHottest functions (own time, all files; reports next to outputs):\n{hotspots}"
+        return text
+
+    @staticmethod
+    def _format_profile(profile):
+        """Return the hottest functions and report location of a profiled transformation."""
+        if not profile:
+            return ""
+        functions = "\n".join(
+            f"  - {function['function']}: {function['seconds']:.2f}s" for function in profile['functions'][:5]
+        )
+        return (
+            f"\n\nHottest functions (own time):\n{functions}\n"
+            f"Python allocations peaked at {profile['traced_peak_bytes'] / 1024 ** 2:.0f} MB\n"
+            f"Profile: {profile['report_path']}"
+        )
+
+    def _show_batch_summary(self, total, error_count, skipped_count=0, timings=None, deduplicated_count=0):
         """Show batch processing summary dialog."""
+        if total == 0 and skipped_count == 0:
+            self.view.show_error("No IFC files found in directory")
+            return
+
         success_count = total - error_count
+        skipped = (
+            f"\nSkipped {skipped_count} unchanged files (output already current)."
+            if skipped_count else ""
+        )
+        reused = (
+            f"\nReused another input's output for {deduplicated_count} identical files "
+            f"({deduplicated_count} transforms saved)."
+            if deduplicated_count else ""
+        )
+        timings = self._format_batch_timings(timings)
 
         if error_count == 0:
             self.view.show_success(
                 f"Batch complete!\n\n"
-                f"Successfully processed {success_count} files."
+                f"Successfully processed {success_count} files.{skipped}{reused}{timings}"
             )
         else:
             # Build error details
@@ -308,30 +633,66 @@ class TransformController:
             self.view.show_error(
                 f"Batch complete with errors.\n\n"
                 f"Succeeded: {success_count}\n"
-                f"Failed: {error_count}\n\n"
-                f"Errors:\n{error_details}{more}"
+                f"Failed: {error_count}\n"
+                f"Skipped (unchanged): {skipped_count}\n"
+                f"Identical inputs reused: {deduplicated_count}\n\n"
+                f"Errors:\n{error_details}{more}{timings}"
             )
 
     def on_cancel_clicked(self):
-        """Handle cancel button click during batch processing."""
+        """
+        Handle cancel button click during single-file, fan-out or batch processing.
+
+        The window returns to idle straight away; the background thread
+        kills the running worker processes, removes their partial outputs
+        and reports the cancellation.
+        """
         self.stop_event.set()
+        self.view.set_processing(False)
+        self.view.end_batch_progress()
         self.view.show_status("Cancelling...")
 
+    def close(self):
+        """Stop the worker process when the application exits."""
+        self.stop_event.set()
+        self.transform_worker.close()
+
+    def _is_stopping(self) -> bool:
+        """Return whether a cancelled run is still stopping, telling the user if so."""
+        if self._worker_thread is not None and self._worker_thread.is_alive():
+            self.view.show_status("Still stopping the previous run, try again in a moment")
+            return True
+        return False
+
     def _refresh_preset_list(self):
         """Refresh the preset dropdown with current presets."""
-        presets = self.presets_model.list_presets()
+        presets = self.presets_model.search_presets('', limit=PRESET_DROPDOWN_LIMIT)
         self.view.update_preset_list(presets)
 
+    def on_preset_filter_changed(self):
+        """Show only the presets starting with the text typed in the dropdown."""
+        prefix = self.view.get_selected_preset()
+        self.view.set_preset_choices(
+            self.presets_model.search_presets(prefix, limit=PRESET_DROPDOWN_LIMIT)
+        )
+
     def on_preset_selected(self):
         """Handle preset selection from dropdown."""
         preset_name = self.view.get_selected_preset()
         if not preset_name:
             return
 
-        presets = self.presets_model.load_presets()
-        if preset_name in presets:
-            self.view.set_values(presets[preset_name])
+        preset = self.presets_model.get_preset(preset_name)
+        if preset is not None:
+            try:
+                self.view.set_values(resolve_operations(preset))
+            except ValueError as e:
+                self.view.show_error(f"Preset '{preset_name}': {e}")
+                return
             self.presets_model.save_last_used(preset_name)
+            if 'operations' in preset:
+                self.view.show_status(f"Preset '{preset_name}' is a {len(preset['operations'])}-step "
+                                      f"operation chain, shown as the equivalent single rotation and offset")
 
     def on_save_preset(self):
         """Handle save preset button click."""
@@ -341,8 +702,7 @@ class TransformController:
             return
 
         # Check for overwrite
-        existing_presets = self.presets_model.list_presets()
-        if preset_name in existing_presets:
+        if self.presets_model.get_preset(preset_name) is not None:
             if not self.view.confirm_overwrite(preset_name):
                 return
 
@@ -353,7 +713,8 @@ class TransformController:
             'y': values['y'],
             'z': values['z'],
             'rotation': values['rotation'],
-            'rotate_first': values['rotate_first']
+            'rotate_first': values['rotate_first'],
+            'strategy': values['strategy']
         }
 
         # Save preset
@@ -389,7 +750,10 @@ class TransformController:
         if not last_used:
             return
 
-        presets = self.presets_model.load_presets()
-        if last_used in presets:
+        preset = self.presets_model.get_preset(last_used)
+        if preset is not None:
             self.view.set_selected_preset(last_used)
-            self.view.set_values(presets[last_used])
+            try:
+                self.view.set_values(resolve_operations(preset))
+            except ValueError as e:
+                self.view.show_status(f"Could not load preset '{last_used}': {e}")
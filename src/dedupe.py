@@ -0,0 +1,143 @@
+"""
+Duplicate Input Detection
+
+This module provides the DuplicateIndex class that finds batch inputs with
+identical content (the same model copied into several discipline folders,
+or re-issued under a new name), so a BatchRunner transforms each distinct
+content once and gives the other inputs a link or copy of its output.
+Only files sharing their size with another input are hashed, so a batch
+without duplicates costs one stat per file.
+"""
+
+import concurrent.futures
+import logging
+import os
+from collections import Counter
+
+from src.utils.fileio import file_sha256
+
+
+logger = logging.getLogger(__name__)
+
+# Threads hashing inputs (hashlib releases the GIL on large reads)
+HASH_WORKERS = 4
+
+
+class DuplicateIndex:
+    """
+    Groups batch inputs by content, as they are discovered.
+
+    The first input found with some content is its primary; later inputs
+    with the same content are reported as its duplicates.
+    """
+
+    def __init__(self, hash_file=file_sha256, workers: int = HASH_WORKERS):
+        """
+        Initialize an empty index.
+
+        Args:
+            hash_file: Callable returning a file's content hash (e.g. a
+                       BatchManifest's input_hash, to share its hashes)
+            workers: Number of threads hashing files
+        """
+        self._hash_file = hash_file
+        self._workers = workers
+        # size -> primaries of that size
+        self._sizes = {}
+        # primary -> (size, content hash or None until it needs one)
+        self._primaries = {}
+        # content hash -> primary
+        self._by_hash = {}
+
+    def add(self, files) -> tuple[list, list[tuple]]:
+        """
+        Index newly discovered files.
+
+        A file found again (e.g. rewritten in a watched folder) replaces
+        its earlier entry.
+
+        Args:
+            files: Input file Paths
+
+        Returns:
+            (distinct files, (duplicate, primary) pairs), in input order.
+            Unreadable files are returned as distinct so their error is
+            reported when they are transformed.
+        """
+        for input_file in files:
+            self.forget(input_file)
+
+        sizes = {}
+        for input_file in files:
+            try:
+                sizes[input_file] = os.path.getsize(input_file)
+            except OSError:
+                sizes[input_file] = None
+
+        # Only files sharing a size (with each other or an earlier primary) can be duplicates
+        counts = Counter(size for size in sizes.values() if size is not None)
+        candidates = [f for f, size in sizes.items() if size is not None and (counts[size] > 1 or size in self._sizes)]
+        earlier = [
+            primary
+            for size in {sizes[f] for f in candidates}
+            for primary in self._sizes.get(size, [])
+            if self._primaries[primary][1] is None
+        ]
+        hashes = self._hash(earlier + candidates)
+        for primary in earlier:
+            if primary in hashes:
+                self._primaries[primary] = (self._primaries[primary][0], hashes[primary])
+                self._by_hash.setdefault(hashes[primary], primary)
+
+        distinct = []
+        duplicates = []
+        for input_file in files:
+            content_hash = hashes.get(input_file)
+            primary = self._by_hash.get(content_hash) if content_hash is not None else None
+            if primary is not None:
+                duplicates.append((input_file, primary))
+                continue
+
+            distinct.append(input_file)
+            size = sizes[input_file]
+            if size is not None:
+                self._primaries[input_file] = (size, content_hash)
+                self._sizes.setdefault(size, []).append(input_file)
+                if content_hash is not None:
+                    self._by_hash[content_hash] = input_file
+
+        if duplicates:
+            logger.info(f"{len(duplicates)} of {len(files)} new files duplicate another input")
+        return distinct, duplicates
+
+    def forget(self, input_file):
+        """
+        Drop a primary's entry.
+
+        A rewritten file is then indexed by its new content; files found
+        later with a forgotten primary's content are distinct again.
+        """
+        entry = self._primaries.pop(input_file, None)
+        if entry is None:
+            return
+        size, content_hash = entry
+        self._sizes[size].remove(input_file)
+        if not self._sizes[size]:
+            del self._sizes[size]
+        if content_hash is not None and self._by_hash.get(content_hash) == input_file:
+            del self._by_hash[content_hash]
+
+    def _hash(self, files) -> dict:
+        """Hash files in parallel; unreadable files are left out."""
+        if not files:
+            return {}
+
+        hashes = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self._workers, len(files))) as executor:
+            futures = {executor.submit(self._hash_file, f): f for f in files}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    hashes[futures[future]] = future.result()
+                except OSError as e:
+                    logger.warning(f"Could not hash {futures[future]}: {e}")
+        return hashes
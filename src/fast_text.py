@@ -0,0 +1,510 @@
+"""
+Fast Text Transformation Engine
+
+This module provides the FastTextTransformer class, a streaming alternative
+to the ifcopenshell.open / ifcpatch.write round trip. It scans the STEP
+(ISO-10303-21) text of an IFC file, indexes only the root IfcLocalPlacement
+records (those with no PlacementRelTo) and the entities their placements
+reference, then copies the file through line by line, pointing each root
+placement at a new, transformed IfcAxis2Placement3D.
+
+Memory use is proportional to the number of root placements rather than
+the size of the model, and every other record is copied byte for byte.
+"""
+
+import logging
+import os
+import re
+
+from src.utils.transform import axis2placement_matrix, matmul
+
+
+logger = logging.getLogger(__name__)
+
+# Bytes of lines read between progress reports while streaming a file
+PROGRESS_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Matches the start of a data record: #123=IFCENTITYNAME(
+_RECORD_HEAD = re.compile(rb'\s*#(\d+)\s*=\s*([A-Za-z0-9_]+)\s*\(')
+
+# Unit entities needed to reproduce ifcopenshell.util.unit.calculate_unit_scale
+UNIT_ENTITIES = {
+    b'IFCPROJECT',
+    b'IFCUNITASSIGNMENT',
+    b'IFCSIUNIT',
+    b'IFCCONVERSIONBASEDUNIT',
+    b'IFCMEASUREWITHUNIT',
+}
+
+# SI prefix multipliers (IfcSIPrefix)
+_SI_PREFIXES = {
+    b'EXA': 1e18, b'PETA': 1e15, b'TERA': 1e12, b'GIGA': 1e9,
+    b'MEGA': 1e6, b'KILO': 1e3, b'HECTO': 1e2, b'DECA': 1e1,
+    b'DECI': 1e-1, b'CENTI': 1e-2, b'MILLI': 1e-3, b'MICRO': 1e-6,
+    b'NANO': 1e-9, b'PICO': 1e-12, b'FEMTO': 1e-15, b'ATTO': 1e-18,
+}
+
+
+def iter_records(path, progress=None):
+    """
+    Yield (raw_bytes, is_data_record) for each record of a STEP file.
+
+    Records are split at each ';' outside a string literal, so data
+    records spanning several lines are joined into one item and several
+    records on one line are yielded separately (the line ending goes with
+    the last of them). Header lines, section markers and blank lines are
+    yielded unchanged with is_data_record False. Raw bytes include the
+    original line endings so concatenating every item reproduces the file
+    exactly.
+
+    Args:
+        path: Path to the STEP file
+        progress: Optional callback receiving the fraction of the file
+                  read, every PROGRESS_CHUNK_BYTES
+    """
+    with open(path, 'rb') as f:
+        lines = iter(f if progress is None else _reporting_lines(f, progress))
+        while True:
+            # Header (or text between sections), copied through up to DATA;
+            for line in lines:
+                yield line, False
+                if line.lstrip().upper().startswith(b'DATA;'):
+                    break
+            else:
+                return
+
+            for line in lines:
+                # Common case: the line is exactly one record (its only ';'
+                # ends it, so it can't be inside a string literal)
+                if (
+                    line.startswith(b'#')
+                    and line.count(b';') == 1
+                    and line.count(b"'") % 2 == 0
+                    and line.rstrip().endswith(b';')
+                ):
+                    yield line, True
+                    continue
+
+                stripped = line.lstrip()
+                if not stripped.startswith(b'#'):
+                    yield line, False
+                    if stripped.upper().startswith(b'ENDSEC'):
+                        break
+                    continue
+
+                # Otherwise split at each ';' outside string literals, reading
+                # on while the last record continues on the next line
+                records, line = _split_records(line, lines)
+                yield from records
+                if line is not None:
+                    yield line, False
+                    break
+
+
+def _split_records(line: bytes, lines) -> tuple[list[tuple[bytes, bool]], bytes | None]:
+    """
+    Split the records starting on a line, reading further lines for the last one.
+
+    Returns:
+        ((raw_bytes, is_data_record) items, the rest of the line if it
+        ends the data section after a record, else None)
+
+    Raises:
+        ValueError: If the file ends inside a record
+    """
+    records = []
+    pending = []
+    in_string = False
+    while True:
+        ends, in_string = _record_ends(line, in_string)
+        start = 0
+        for end in ends:
+            if end == ends[-1] and not line[end:].strip():
+                end = len(line)  # The line ending goes with the last record
+            pending.append(line[start:end])
+            start = end
+            record = b''.join(pending)
+            pending = []
+            stripped = record.lstrip()
+            if stripped.upper().startswith(b'ENDSEC'):
+                return records, record + line[start:]
+            records.append((record, stripped.startswith(b'#')))
+        if start == len(line):
+            return records, None
+
+        pending.append(line[start:])
+        line = next(lines, None)
+        if line is None:
+            raise ValueError("Invalid IFC file: unterminated record at end of file")
+
+
+def _record_ends(line: bytes, in_string: bool) -> tuple[list[int], bool]:
+    """
+    Find where records end on a line.
+
+    Args:
+        line: Line of a STEP data section
+        in_string: Whether the line starts inside a string literal
+
+    Returns:
+        (offsets just past each ';' outside string literals, whether the
+        line ends inside a string literal). An escaped quote ('') closes
+        and reopens the string, so it needs no special case.
+    """
+    ends = []
+    position = 0
+    while True:
+        quote = line.find(b"'", position)
+        if in_string:
+            if quote < 0:
+                return ends, True
+            position = quote + 1
+            in_string = False
+            continue
+
+        semicolon = line.find(b';', position)
+        if semicolon >= 0 and (quote < 0 or semicolon < quote):
+            ends.append(semicolon + 1)
+            position = semicolon + 1
+        elif quote >= 0:
+            position = quote + 1
+            in_string = True
+        else:
+            return ends, False
+
+
+def _reporting_lines(f, progress):
+    """Yield the lines of a binary file, reporting the fraction read periodically."""
+    size = os.fstat(f.fileno()).st_size or 1
+    # Lines are read in chunks so the reporting costs nothing per line
+    while chunk := f.readlines(PROGRESS_CHUNK_BYTES):
+        yield from chunk
+        progress(f.tell() / size)
+    progress(1.0)
+
+
+def record_id(record: bytes) -> int:
+    """Return the entity id of a data record."""
+    return int(record[record.find(b'#') + 1:record.find(b'=')])
+
+
+def parse_record(record: bytes) -> tuple[int, bytes, list[bytes]]:
+    """
+    Parse a data record into its id, upper-case entity name and arguments.
+
+    Arguments are returned as raw tokens (e.g. b'$', b'#12', b'(1.,0.,0.)').
+
+    Raises:
+        ValueError: If the record is not a well-formed entity instance
+    """
+    match = _RECORD_HEAD.match(record)
+    if not match:
+        raise ValueError(f"Invalid IFC file: malformed record {record[:80]!r}")
+    body = record[match.end():record.rstrip().rfind(b')')]
+    return int(match.group(1)), match.group(2).upper(), split_arguments(body)
+
+
+def split_arguments(body: bytes) -> list[bytes]:
+    """Split a STEP argument list on top-level commas, respecting strings and nesting."""
+    args = []
+    depth = 0
+    in_string = False
+    start = 0
+
+    for i, char in enumerate(body):
+        if char == 0x27:  # '
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char == 0x28:  # (
+            depth += 1
+        elif char == 0x29:  # )
+            depth -= 1
+        elif char == 0x2C and depth == 0:  # ,
+            args.append(body[start:i].strip())
+            start = i + 1
+
+    args.append(body[start:].strip())
+    return args
+
+
+def parse_ref(token: bytes) -> int | None:
+    """Return the entity id of a #ref token, or None for $ / *."""
+    token = token.strip()
+    if token.startswith(b'#'):
+        return int(token[1:])
+    return None
+
+
+def parse_reals(token: bytes) -> list[float]:
+    """Parse a STEP list of reals such as (1.,2.5,-3.E-2)."""
+    inner = token.strip()[1:-1]
+    return [float(value) for value in inner.split(b',') if value.strip()]
+
+
+def format_real(value: float) -> str:
+    """Format a float as a STEP REAL (always contains a decimal point)."""
+    text = repr(float(value))
+    if 'e' in text:
+        mantissa, exponent = text.split('e')
+        if '.' not in mantissa:
+            mantissa += '.'
+        return f"{mantissa}E{exponent}"
+    return text
+
+
+def resolve_unit_scale(unit_records: dict) -> float:
+    """
+    Compute the project length unit scale (project units to metres).
+
+    Follows ifcopenshell.util.unit.calculate_unit_scale: the first
+    LENGTHUNIT of the project's unit assignment, resolving conversion
+    based units (e.g. feet) through their conversion factor.
+
+    Args:
+        unit_records: Records of the UNIT_ENTITIES types: id -> (name, args)
+    """
+    assignment = None
+    for name, args in unit_records.values():
+        if name == b'IFCPROJECT' and len(args) > 8:
+            ref = parse_ref(args[8])
+            if ref in unit_records:
+                assignment = unit_records[ref]
+                break
+    if assignment is None:
+        assignments = [r for r in unit_records.values() if r[0] == b'IFCUNITASSIGNMENT']
+        if not assignments:
+            return 1.0
+        assignment = assignments[0]
+
+    for token in split_arguments(assignment[1][0].strip()[1:-1]):
+        unit = unit_records.get(parse_ref(token))
+        if unit is None or len(unit[1]) < 2 or unit[1][1] != b'.LENGTHUNIT.':
+            continue
+        return length_unit_scale(unit, unit_records)
+
+    return 1.0
+
+
+def length_unit_scale(unit: tuple, unit_records: dict) -> float:
+    """
+    Return the size in metres of one length unit record.
+
+    Args:
+        unit: (name, args) of an IfcSIUnit or IfcConversionBasedUnit
+        unit_records: Records of the UNIT_ENTITIES types: id -> (name, args)
+
+    Raises:
+        ValueError: If a conversion factor cannot be resolved
+    """
+    scale = 1.0
+    while unit is not None and unit[0] == b'IFCCONVERSIONBASEDUNIT':
+        measure = unit_records.get(parse_ref(unit[1][3]))
+        if measure is None:
+            raise ValueError("Invalid IFC file: unresolved unit conversion factor")
+        value = measure[1][0]
+        if b'(' in value:
+            value = value[value.find(b'(') + 1:value.rfind(b')')]
+        scale *= float(value)
+        unit = unit_records.get(parse_ref(measure[1][1]))
+
+    if unit is not None and unit[0] == b'IFCSIUNIT':
+        scale *= _SI_PREFIXES.get(unit[1][2].strip(b'.'), 1.0)
+    return scale
+
+
+class FastTextTransformer:
+    """
+    Streaming STEP transformer for root object placements.
+
+    Usage: call scan() once, read unit_scale to convert offsets into
+    project units, then call write() with the 4x4 transform matrix.
+
+    Root placements are every IfcLocalPlacement without PlacementRelTo.
+    IfcPatch and the native engine only offset roots that an IfcProduct
+    actually uses; moving the others as well changes no product's
+    placement, and exporters rarely emit unused placements anyway.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize transformer for a STEP file.
+
+        Args:
+            path: Path to the input IFC file
+        """
+        self.path = str(path)
+        self.max_id = 0
+        self.entity_count = 0
+        self.unit_scale = 1.0
+        # local placement id -> (PlacementRelTo token, relative placement id)
+        self.root_placements = {}
+        # relative placement id -> 4x4 placement matrix
+        self.placement_matrices = {}
+
+    def scan(self, progress=None):
+        """
+        Index root placements and the project length unit.
+
+        Reads the file in three streaming passes: root placements and
+        units, then their IfcAxis2Placement3D (or 2D) records, then the
+        points and directions those reference.
+
+        Args:
+            progress: Optional callback receiving the fraction of the scan done
+
+        Raises:
+            ValueError: If the file is not STEP or uses unsupported placements
+        """
+        def pass_progress(index):
+            # Each pass reads the whole file: map its fraction into a third
+            if progress is None:
+                return None
+            return lambda fraction: progress((index + fraction) / 3)
+
+        unit_records = self._index_roots_and_units(pass_progress(0))
+        self.unit_scale = resolve_unit_scale(unit_records)
+
+        # Pass 2: relative placements of the roots
+        axis_ids = {axis_id for _, axis_id in self.root_placements.values()}
+        axis_records = self._read_records(axis_ids, pass_progress(1))
+        for axis_id, (name, args) in axis_records.items():
+            if name == b'IFCAXIS2PLACEMENT2D':
+                # (Location, RefDirection): Z is up, as for an unset Axis
+                axis_records[axis_id] = (name, [args[0], b'$', args[1]])
+            elif name != b'IFCAXIS2PLACEMENT3D':
+                raise ValueError(
+                    f"Root placement uses {name.decode()} (#{axis_id}), "
+                    f"which fast text mode does not support"
+                )
+
+        # Pass 3: points and directions of those placements
+        component_ids = set()
+        for _, args in axis_records.values():
+            component_ids.update(ref for ref in map(parse_ref, args[:3]) if ref is not None)
+        components = self._read_records(component_ids, pass_progress(2))
+
+        def coordinates(token):
+            ref = parse_ref(token)
+            if ref is None:
+                return None
+            return parse_reals(components[ref][1][0])
+
+        for axis_id, (_, args) in axis_records.items():
+            self.placement_matrices[axis_id] = axis2placement_matrix(
+                coordinates(args[0]),
+                coordinates(args[1]),
+                coordinates(args[2])
+            )
+
+        logger.info(f"Indexed {len(self.root_placements)} root placements "
+                    f"among {self.entity_count} entities")
+
+    def write(self, output_path: str, matrix: list[list[float]], progress=None) -> int:
+        """
+        Copy the file to output_path with every root placement transformed.
+
+        Each root IfcLocalPlacement gets a new IfcAxis2Placement3D (with
+        its own point and directions) written just before it, so shared
+        placement entities elsewhere in the model are left untouched.
+
+        Args:
+            output_path: Path for the output IFC file
+            matrix: 4x4 transform (project units) applied to each root placement
+            progress: Optional callback receiving the fraction of the input copied
+
+        Returns:
+            Number of root placements rewritten
+        """
+        next_id = self.max_id
+        rewritten = 0
+
+        with open(output_path, 'wb') as out:
+            for record, is_data in iter_records(self.path, progress):
+                if not is_data or b'PLACEMENT' not in record:
+                    out.write(record)
+                    continue
+
+                entity_id = record_id(record)
+                if entity_id not in self.root_placements:
+                    out.write(record)
+                    continue
+
+                relative_to, axis_id = self.root_placements[entity_id]
+                m = matmul(matrix, self.placement_matrices[axis_id])
+                point_id, z_id, x_id, placement_id = range(next_id + 1, next_id + 5)
+                next_id += 4
+
+                newline = b'\r\n' if record.endswith(b'\r\n') else b'\n'
+                lines = [
+                    f"#{point_id}=IFCCARTESIANPOINT(({self._reals(m[0][3], m[1][3], m[2][3])}));",
+                    f"#{z_id}=IFCDIRECTION(({self._reals(m[0][2], m[1][2], m[2][2])}));",
+                    f"#{x_id}=IFCDIRECTION(({self._reals(m[0][0], m[1][0], m[2][0])}));",
+                    f"#{placement_id}=IFCAXIS2PLACEMENT3D(#{point_id},#{z_id},#{x_id});",
+                    f"#{entity_id}=IFCLOCALPLACEMENT({relative_to.decode()},#{placement_id});",
+                ]
+                out.write(newline.join(line.encode('ascii') for line in lines) + newline)
+                rewritten += 1
+
+        return rewritten
+
+    @staticmethod
+    def _reals(*values: float) -> str:
+        """Format values as a comma separated STEP real list body."""
+        return ','.join(format_real(v) for v in values)
+
+    def _index_roots_and_units(self, progress=None) -> dict:
+        """
+        Pass 1: find root placements, unit records and the highest entity id.
+
+        Returns:
+            Dictionary of unit-related records: id -> (name, args)
+        """
+        unit_records = {}
+        saw_data = False
+
+        for record, is_data in iter_records(self.path, progress):
+            if not is_data:
+                if not saw_data and record.strip().upper().startswith(b'DATA;'):
+                    saw_data = True
+                continue
+
+            self.entity_count += 1
+            entity_id = record_id(record)
+            if entity_id > self.max_id:
+                self.max_id = entity_id
+
+            # Cheap substring checks before parsing anything
+            if b'LOCALPLACEMENT' in record:
+                _, name, args = parse_record(record)
+                if name == b'IFCLOCALPLACEMENT' and args[0] in (b'$', b''):
+                    self.root_placements[entity_id] = (args[0] or b'$', parse_ref(args[1]))
+            elif b'UNIT' in record or b'IFCPROJECT' in record:
+                _, name, args = parse_record(record)
+                if name in UNIT_ENTITIES:
+                    unit_records[entity_id] = (name, args)
+
+        if not saw_data:
+            raise ValueError("Invalid IFC file: no DATA section found")
+
+        return unit_records
+
+    def _read_records(self, ids: set[int], progress=None) -> dict:
+        """Stream the file once and parse the records with the given ids."""
+        found = {}
+        if not ids:
+            if progress is not None:
+                progress(1.0)
+            return found
+
+        for record, is_data in iter_records(self.path, progress):
+            if is_data:
+                entity_id = record_id(record)
+                if entity_id in ids:
+                    _, name, args = parse_record(record)
+                    found[entity_id] = (name, args)
+
+        missing = ids - found.keys()
+        if missing:
+            raise ValueError(f"Invalid IFC file: missing referenced entity #{min(missing)}")
+        return found
@@ -0,0 +1,188 @@
+"""
+Batch Checkpoint Journal
+
+This module provides the BatchJournal class that records the progress of a
+batch in its output directory: the transform parameters when the batch
+starts, each input file as it is discovered, then each file as it
+completes or fails. The journal is a JSON Lines file: a header line
+written when the batch starts, then one line appended (and flushed to
+disk) per update, so each checkpoint costs a short write however large
+the batch. After a crash or cancellation the journal describes every
+update that finished, and the batch can be resumed with only the
+remaining files; a last line cut short by the crash is ignored.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = ".ifc_translate_journal.jsonl"
+JOURNAL_VERSION = 2
+
+
+class BatchJournal:
+    """
+    Crash-safe record of a batch's inputs, parameters and completed files.
+
+    Completed and failed files are stored as indices into the file list to
+    keep each appended line small. Failed files are not completed:
+    resuming the batch tries them again.
+    """
+
+    def __init__(self, output_dir):
+        """
+        Create an empty journal for an output directory.
+
+        Args:
+            output_dir: Batch output directory (where the journal is stored)
+        """
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / JOURNAL_NAME
+        self.files = []
+        self.transform_kwargs = {}
+        self.input_root = None
+        self.started = None
+        self.completed = set()
+        # file index -> error message
+        self.failed = {}
+        self._index = {}
+        # Length of the complete lines, if a truncated last line follows them
+        self._truncate_to = None
+
+    @classmethod
+    def load(cls, output_dir) -> 'BatchJournal | None':
+        """
+        Load the journal of an interrupted batch.
+
+        Args:
+            output_dir: Batch output directory
+
+        Returns:
+            BatchJournal, or None if there is no readable journal
+        """
+        journal = cls(output_dir)
+        if not journal.path.exists():
+            return None
+
+        try:
+            with journal.path.open('rb') as f:
+                lines = f.read().split(b'\n')
+        except OSError:
+            logger.warning(f"Ignoring unreadable batch journal: {journal.path}")
+            return None
+
+        # Everything after the last newline is a line that was being written
+        if lines[-1]:
+            journal._truncate_to = journal.path.stat().st_size - len(lines[-1])
+            logger.warning(f"Ignoring incomplete last line of batch journal: {journal.path}")
+        try:
+            records = [json.loads(line) for line in lines[:-1]]
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning(f"Ignoring unreadable batch journal: {journal.path}")
+            return None
+
+        if not records or records[0].get('version') != JOURNAL_VERSION:
+            return None
+
+        header = records[0]
+        journal.transform_kwargs = header['transform_kwargs']
+        journal.input_root = header.get('input_root')
+        journal.started = header.get('started')
+        for record in records[1:]:
+            journal._apply(record)
+        journal._index = {f: i for i, f in enumerate(journal.files)}
+        return journal
+
+    def start(self, transform_kwargs: dict, input_root=None):
+        """
+        Begin journaling a new batch, replacing any previous journal.
+
+        Args:
+            transform_kwargs: Transform parameters of the batch
+            input_root: Input directory mirrored in the output directory, if any
+        """
+        self.files = []
+        self.transform_kwargs = dict(transform_kwargs)
+        self.input_root = os.path.abspath(input_root) if input_root is not None else None
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.completed = set()
+        self.failed = {}
+        self._index = {}
+        self._truncate_to = None
+        # Written under a temporary name so a crash can't leave a partial header
+        temp_file = self.path.with_suffix('.tmp')
+        with temp_file.open('w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'version': JOURNAL_VERSION,
+                'started': self.started,
+                'transform_kwargs': self.transform_kwargs,
+                'input_root': self.input_root,
+            }) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        temp_file.replace(self.path)
+
+    def add_files(self, files):
+        """Record newly discovered input files (already known files are ignored)."""
+        added = []
+        for input_file in files:
+            path = Path(os.path.abspath(input_file))
+            if path not in self._index:
+                self._index[path] = len(self.files)
+                self.files.append(path)
+                added.append(str(path))
+        if added:
+            self._append({'files': added})
+
+    def mark_completed(self, *input_files):
+        """Record finished files."""
+        indices = []
+        for input_file in input_files:
+            index = self._index.get(Path(os.path.abspath(input_file)))
+            if index is not None:
+                indices.append(index)
+        if indices:
+            self._append({'completed': indices})
+            self._apply({'completed': indices})
+
+    def mark_failed(self, input_file, error):
+        """Record a file that failed (it stays among the remaining files)."""
+        index = self._index.get(Path(os.path.abspath(input_file)))
+        if index is None:
+            return
+        self._append({'failed': index, 'error': str(error)})
+        self._apply({'failed': index, 'error': str(error)})
+
+    def remaining_files(self) -> list[Path]:
+        """Return the input files not yet completed, in original order."""
+        return [f for i, f in enumerate(self.files) if i not in self.completed]
+
+    def finish(self):
+        """Delete the journal once the batch has completed."""
+        self.path.unlink(missing_ok=True)
+
+    def _apply(self, record: dict):
+        """Update the in-memory state with one journal line."""
+        if 'files' in record:
+            self.files.extend(Path(f) for f in record['files'])
+        for index in record.get('completed', []):
+            self.completed.add(index)
+            self.failed.pop(index, None)
+        if 'failed' in record:
+            self.failed[record['failed']] = record['error']
+
+    def _append(self, record: dict):
+        """Append one line to the journal and flush it to disk."""
+        if self._truncate_to is not None:
+            # Drop the incomplete line a crash left, so this one starts on its own line
+            os.truncate(self.path, self._truncate_to)
+            self._truncate_to = None
+        with self.path.open('a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
@@ -2,10 +2,15 @@
 IFC Translate Tool - Application Entry Point
 
 Creates and wires together the MVC components (Model, View, Controller)
-and launches the Tkinter application.
+and launches the Tkinter application. The window is shown first; the IFC
+libraries load in the background and startup latencies are recorded.
 """
 
+import time
+_start_time = time.perf_counter()  # Before any other import, for startup timing
+
 import sys
+import multiprocessing
 from pathlib import Path
 
 # Add project root to path for imports when running directly
@@ -17,18 +22,22 @@ import tkinter as tk
 from src.model import IFCTransformModel
 from src.view import TransformView
 from src.controller import TransformController
-from src.presets_model import PresetsModel
+from src.presets_model import open_presets_model
+from src.utils.timing import StartupTimer, STARTUP_LOG_NAME
 
 
 def main():
     """Application entry point."""
+    timer = StartupTimer(_start_time)
+    timer.mark('imports')
+
     # Create root window
     root = tk.Tk()
 
     # Create MVC components
     model = IFCTransformModel()
     view = TransformView(root)
-    presets_model = PresetsModel()
+    presets_model = open_presets_model()
 
     # Create controller (wires everything together)
     controller = TransformController(model, view, presets_model)
@@ -39,9 +48,22 @@ def main():
     root.after(100, lambda: root.attributes('-topmost', False))
     root.focus_force()
 
+    # Record first paint, then load IFC libraries in the worker process
+    root.after_idle(lambda: timer.mark('first_paint'))
+
+    def on_ready(import_seconds):
+        timer.record('ifc_import', import_seconds)
+        timer.mark('ready')
+        timer.save(presets_model.data_dir / STARTUP_LOG_NAME)
+
+    controller.start_warm_up(on_ready=on_ready)
+
     # Start the application
     root.mainloop()
+    controller.close()
 
 
 if __name__ == "__main__":
+    # Required for batch worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
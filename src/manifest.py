@@ -0,0 +1,221 @@
+"""
+Incremental Batch Manifest
+
+This module provides the BatchManifest class that remembers, per output
+file, the content hash of the input it was produced from and the transform
+parameters used. A batch can then skip inputs whose output is already
+current. The manifest is stored as JSON in the output directory.
+"""
+
+import concurrent.futures
+import json
+import logging
+import os
+from pathlib import Path
+
+from src.utils.fileio import atomic_write_json, file_sha256
+from src.utils.validation import build_output_path
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".ifc_translate_manifest.json"
+MANIFEST_VERSION = 1
+
+# Threads used to hash inputs (hashlib releases the GIL on large reads)
+HASH_WORKERS = 4
+
+
+def normalize_params(transform_kwargs: dict) -> dict:
+    """Return transform parameters in the form they are stored in JSON."""
+    return json.loads(json.dumps(transform_kwargs, sort_keys=True))
+
+
+class BatchManifest:
+    """
+    Tracks which outputs in a directory are current for their inputs.
+
+    An output is current when it exists with the recorded size, its input
+    has the recorded SHA-256, and the transform parameters are identical.
+    Inputs whose size and modification time are unchanged since they were
+    recorded are not re-hashed, and inputs that need a transform whatever
+    their content are only hashed once it is done. The size and
+    modification time recorded are those read just before the input was
+    hashed, so an input modified after it is hashed is hashed again by the
+    next batch; one modified while it is transformed is not recorded.
+    """
+
+    def __init__(self, output_dir, input_root=None):
+        """
+        Load the manifest for an output directory (empty if absent or corrupt).
+
+        Args:
+            output_dir: Batch output directory
+            input_root: Input directory whose subdirectories are mirrored in
+                        the output directory (None for flat output)
+        """
+        self.output_dir = Path(output_dir)
+        self.input_root = input_root
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries = self._load()
+        # input path -> content hash computed during this run
+        self._hashes = {}
+        # input path -> os.stat_result taken before the hash was read or computed
+        self._stats = {}
+
+    def _load(self) -> dict:
+        """Read manifest entries, returning {} if missing, corrupt or outdated."""
+        if not self.path.exists():
+            return {}
+
+        try:
+            with self.path.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            logger.warning(f"Ignoring unreadable manifest: {self.path}")
+            return {}
+
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('files', {})
+
+    def _key(self, output_path: Path) -> str:
+        """Return the manifest key of an output file (path relative to output dir)."""
+        return Path(output_path).relative_to(self.output_dir).as_posix()
+
+    def partition(self, files, transform_kwargs: dict) -> tuple[list, list]:
+        """
+        Split files into those needing a transform and those already current.
+
+        Only inputs that may be current (recorded with the same parameters,
+        but with a changed size or modification time) are hashed here, in
+        parallel. New inputs and inputs recorded with other parameters
+        need a transform whatever their content, so they are hashed when
+        their result is recorded and work on them starts at once.
+
+        Args:
+            files: Input file Paths
+            transform_kwargs: Transform parameters for this batch
+
+        Returns:
+            (files_to_process, files_up_to_date), each in the original order
+        """
+        params = normalize_params(transform_kwargs)
+        candidates = {}
+        to_hash = []
+
+        for input_file in files:
+            # A hash from earlier in the run may be stale (the file was rewritten)
+            self._hashes.pop(input_file, None)
+            self._stats.pop(input_file, None)
+
+            try:
+                stat = os.stat(input_file)
+            except OSError:
+                continue  # Processed anyway so the failure gets reported
+            self._stats[input_file] = stat
+
+            key = self._key(build_output_path(input_file, self.output_dir, self.input_root))
+            entry = self.entries.get(key)
+            if entry is None or entry.get('params') != params:
+                continue
+            candidates[input_file] = entry
+
+            # Unchanged size and mtime: trust the recorded hash
+            if stat.st_size == entry['input_size'] and stat.st_mtime_ns == entry['input_mtime_ns']:
+                self._hashes[input_file] = entry['input_hash']
+            else:
+                to_hash.append(input_file)
+
+        self._hash_files(to_hash)
+
+        to_process = []
+        up_to_date = []
+        for input_file in files:
+            entry = candidates.get(input_file)
+            if entry is not None and self._is_current(input_file, entry):
+                up_to_date.append(input_file)
+                # Touched but unchanged: trust the hash again from now on
+                stat = self._stats[input_file]
+                entry['input_size'] = stat.st_size
+                entry['input_mtime_ns'] = stat.st_mtime_ns
+            else:
+                to_process.append(input_file)
+
+        logger.info(f"Manifest: {len(up_to_date)} of {len(files)} outputs already current")
+        return to_process, up_to_date
+
+    def _hash_files(self, files):
+        """Hash files in parallel into self._hashes (unreadable files are skipped)."""
+        if not files:
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            futures = {executor.submit(file_sha256, f): f for f in files}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    self._hashes[futures[future]] = future.result()
+                except OSError:
+                    pass
+
+    def _is_current(self, input_file, entry: dict) -> bool:
+        """Check hash and output of a candidate whose parameters already match."""
+        if self._hashes.get(input_file) != entry['input_hash']:
+            return False
+
+        output_path = build_output_path(input_file, self.output_dir, self.input_root)
+        try:
+            return output_path.stat().st_size == entry['output_size']
+        except OSError:
+            return False
+
+    def input_hash(self, input_file) -> str:
+        """
+        Return an input's SHA-256, reusing one found or computed earlier in the run.
+
+        Raises:
+            OSError: If the input has to be hashed and cannot be read
+        """
+        input_hash = self._hashes.get(input_file)
+        if input_hash is None:
+            stat = os.stat(input_file)
+            input_hash = self._hashes[input_file] = file_sha256(input_file)
+            self._stats[input_file] = stat
+        return input_hash
+
+    def record(self, input_file, transform_kwargs: dict):
+        """
+        Record a successfully transformed file.
+
+        Args:
+            input_file: Input file Path
+            transform_kwargs: Transform parameters used
+        """
+        output_path = build_output_path(input_file, self.output_dir, self.input_root)
+        before = self._stats.get(input_file)
+        input_hash = self.input_hash(input_file)
+        # The stat the hash was read under, not one taken after the transform
+        stat = self._stats[input_file]
+        if before is not None and (before.st_size, before.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            # Hashed after the transform, and changed since it started: the
+            # output may be of other content, so it is never taken as current
+            logger.warning(f"Input changed while it was transformed: {input_file}")
+            self.forget(input_file)
+            return
+
+        self.entries[self._key(output_path)] = {
+            'input_hash': input_hash,
+            'input_size': stat.st_size,
+            'input_mtime_ns': stat.st_mtime_ns,
+            'params': normalize_params(transform_kwargs),
+            'output_size': output_path.stat().st_size,
+        }
+
+    def forget(self, input_file):
+        """Drop a file's entry after a failed transform, so it is never taken as current."""
+        output_path = build_output_path(input_file, self.output_dir, self.input_root)
+        self.entries.pop(self._key(output_path), None)
+
+    def save(self):
+        """Write the manifest atomically to the output directory."""
+        atomic_write_json(self.path, {'version': MANIFEST_VERSION, 'files': self.entries})
@@ -3,13 +3,32 @@ IFC Transformation Model Layer
 
 This module provides the IFCTransformModel class that wraps IfcPatch's
 OffsetObjectPlacements recipe for applying geometric transformations
-to IFC files.
+to IFC files, with a native mode that rewrites root placements directly
+through the ifcopenshell API, an optional streaming fast text mode and a
+georeference-only mode that records the shift in an IfcMapConversion.
+
+ifcopenshell and ifcpatch take seconds to import, so they are imported on
+first use rather than at module load; call IFCTransformModel.warm_up from
+a background thread to load them ahead of the first transformation.
+
+transform_file returns a TransformResult with the wall time and peak
+memory of each stage (open, unit scale, patch, write), so slow files can
+be attributed to a stage. transform_file_fanout writes several
+transformations of one input from a single parse. A progress callback can
+stop a transformation between stages (and while fast text streams) by
+raising TransformCancelled.
 """
 
 import logging
-import ifcopenshell
-import ifcopenshell.util.unit
-import ifcpatch
+import math
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+from src.fast_text import FastTextTransformer
+from src.utils.timing import StageTimer
+from src.utils.transform import axis2placement_matrix, chain_parameters, matmul, offset_matrix
 
 
 # Configure logging for debug output
@@ -19,6 +38,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Transform strategies
+STRATEGY_IFCPATCH = 'ifcpatch'
+STRATEGY_FAST_TEXT = 'fast_text'
+STRATEGY_GEOREFERENCE = 'georeference'
+STRATEGY_NATIVE = 'native'
+TRANSFORM_STRATEGIES = (
+    STRATEGY_IFCPATCH,
+    STRATEGY_NATIVE,
+    STRATEGY_FAST_TEXT,
+    STRATEGY_GEOREFERENCE
+)
+
+# Share of a fast text transformation spent scanning (three read passes,
+# against one read and write pass), for progress reporting
+FAST_TEXT_SCAN_SHARE = 0.6
+
+
+class TransformCancelled(Exception):
+    """Raised (by a progress callback) to stop a transformation that was cancelled."""
+
+
+@dataclass
+class TransformResult:
+    """
+    Outcome and measurements of one transform_file call.
+
+    stages maps each stage name, in execution order, to a dictionary with
+    'seconds' and 'peak_rss_bytes' (process peak RSS at the end of the
+    stage, since the start of the transformation where the peak can be
+    reset, None if unknown). Stages are 'open', 'unit_scale', 'patch' and
+    'write', or 'scan' and 'write' for the fast text strategy, followed by
+    'verify' when the output was checked (verification then holds the
+    src.verify.VerificationResult as a dictionary) and 'publish' when a
+    staged batch output was moved into the output directory. A batch
+    input with the same content as another one gets that file's output
+    without a transform: its result has the single stage 'link' and
+    duplicate_of names the input that was transformed. A profiled
+    transformation's profile holds the summary from
+    src.profiling.TransformProfiler.save.
+    """
+
+    input_path: str
+    output_path: str
+    strategy: str
+    input_bytes: int = 0
+    output_bytes: int = 0
+    entity_count: int | None = None
+    placements: int | None = None  # Root placements rewritten, if counted
+    stages: dict = field(default_factory=dict)
+    seconds: float = 0.0
+    memory_bytes: int | None = None  # Peak memory above the starting RSS, if known
+    verification: dict | None = None
+    duplicate_of: str | None = None
+    profile: dict | None = None
+
+    @property
+    def peak_rss_bytes(self) -> int | None:
+        """Process peak RSS at the end of the transformation."""
+        if not self.stages:
+            return None
+        return list(self.stages.values())[-1]['peak_rss_bytes']
+
+    def to_dict(self) -> dict:
+        """Return the result as a JSON-serialisable dictionary."""
+        return dict(asdict(self), peak_rss_bytes=self.peak_rss_bytes)
+
+    def summary(self) -> str:
+        """Return a one-line summary, e.g. 'open 1.20s, write 0.80s; 2.00s total'."""
+        text = ", ".join(f"{name} {stage['seconds']:.2f}s" for name, stage in self.stages.items())
+        text += f"; {self.seconds:.2f}s total"
+        if self.peak_rss_bytes is not None:
+            text += f", peak {self.peak_rss_bytes / 1024 ** 2:.0f} MB"
+        return text
+
 
 class IFCTransformModel:
     """
@@ -26,18 +119,27 @@ class IFCTransformModel:
 
     Wraps IfcPatch's OffsetObjectPlacements recipe to provide
     coordinate transformations (translation and rotation) on IFC files.
+    The native strategy applies the same transformation to the root
+    placements directly, without the recipe machinery. The fast text
+    strategy applies the same transformation by rewriting root placement
+    records in the STEP text without a full parse. The
+    georeference strategy (IFC4 only) leaves placements alone and instead
+    writes the transformation into the model context's IfcMapConversion.
     """
 
     def transform_file(
         self,
         input_path: str,
         output_path: str,
-        x: float,
-        y: float,
-        z: float,
-        should_rotate_first: bool,
-        rotation_z: float | None = None
-    ) -> bool:
+        x: float = 0.0,
+        y: float = 0.0,
+        z: float = 0.0,
+        should_rotate_first: bool = True,
+        rotation_z: float | None = None,
+        strategy: str = STRATEGY_IFCPATCH,
+        progress=None,
+        operations: list[dict] | None = None
+    ) -> TransformResult:
         """
         Apply geometric transformation to an IFC file.
 
@@ -53,6 +155,10 @@ class IFCTransformModel:
         - should_rotate_first=False: Apply translation first, then rotate
           (object is moved first, then rotated around origin 0,0,0)
 
+        Longer sequences (e.g. rotate about a pivot, translate, rotate
+        again) are given as an operation chain instead; it is composed
+        into a single matrix and applied in the same one pass.
+
         Args:
             input_path: Path to input IFC file (string)
             output_path: Path for output IFC file (string)
@@ -63,64 +169,245 @@ class IFCTransformModel:
             rotation_z: Optional rotation angle around Z axis in decimal degrees.
                        Positive values rotate counter-clockwise when viewed from above.
                        If None, no rotation is applied.
+            strategy: 'ifcpatch' (default) parses the file with ifcopenshell and
+                      runs the IfcPatch recipe; 'native' parses the file but
+                      rewrites only the root placements itself (same
+                      result, less overhead); 'fast_text' streams the STEP text
+                      and rewrites only root placements (much faster and lower
+                      memory on large files, same resulting placements);
+                      'georeference' (IFC4 only) writes or updates a single
+                      IfcMapConversion instead of touching any placement
+            progress: Optional callback progress(stage, fraction), called as
+                      each stage starts (fraction None) and, for the fast
+                      text stages, with the estimated fraction of the
+                      whole transformation done. It may raise
+                      TransformCancelled to stop the transformation; the
+                      partial output is left for the caller to remove.
+            operations: Optional operation chain (see src.utils.transform)
+                        applied instead of x, y, z, should_rotate_first
+                        and rotation_z
 
         Returns:
-            True if transformation succeeded
+            TransformResult with file sizes, entity count and per-stage
+            wall time and peak memory
 
         Raises:
-            ValueError: If input file is not a valid IFC file
+            ValueError: If input file is not a valid IFC file or the
+                        operation chain is invalid
+            TransformCancelled: If progress cancelled the transformation
             Exception: If transformation fails for other reasons
 
         Example:
             >>> model = IFCTransformModel()
             >>> # Translate 100m east, 50m north, no rotation
-            >>> model.transform_file("input.ifc", "output.ifc", 100.0, 50.0, 0.0, True)
-            True
+            >>> model.transform_file("input.ifc", "output.ifc", 100.0, 50.0, 0.0, True).strategy
+            'ifcpatch'
             >>> # Rotate 90 degrees, then translate
-            >>> model.transform_file("input.ifc", "output.ifc", 10.0, 10.0, 0.0, True, 90.0)
-            True
+            >>> result = model.transform_file("input.ifc", "output.ifc", 10.0, 10.0, 0.0, True, 90.0)
+            >>> list(result.stages)
+            ['open', 'unit_scale', 'patch', 'write']
         """
-        try:
-            logger.info(f"Opening IFC file: {input_path}")
-            # Open IFC file with path string to capture C++ parse errors
+        if strategy not in TRANSFORM_STRATEGIES:
+            raise ValueError(f"Unknown transform strategy: {strategy}")
+        if operations is not None:
+            x, y, z, rotation_z = chain_parameters(operations)
+            should_rotate_first = True
+            logger.info(f"Operation chain of {len(operations)} steps reduced to rotation_z={rotation_z}, "
+                        f"then offset ({x}, {y}, {z})")
+
+        timer = StageTimer(on_start=(lambda name: progress(name, None)) if progress else None)
+        result = TransformResult(
+            input_path=str(input_path),
+            output_path=str(output_path),
+            strategy=strategy
+        )
+
+        with self._user_errors():
+            result.input_bytes = os.path.getsize(input_path)
+
+            if strategy == STRATEGY_FAST_TEXT:
+                self._transform_fast_text(
+                    input_path, output_path, x, y, z, should_rotate_first, rotation_z,
+                    timer, result, progress
+                )
+            else:
+                self._transform_parsed(
+                    input_path, output_path, x, y, z, should_rotate_first, rotation_z,
+                    strategy, timer, result
+                )
+
+            result.output_bytes = os.path.getsize(output_path)
+
+        result.stages = timer.stages
+        result.seconds = round(timer.elapsed(), 4)
+        result.memory_bytes = timer.peak_increase()
+        logger.info(f"Transformation completed successfully: {result.summary()}")
+        return result
+
+    def transform_file_fanout(
+        self,
+        input_path: str,
+        targets: list[tuple],
+        strategy: str = STRATEGY_NATIVE,
+        on_result=None
+    ) -> list[TransformResult]:
+        """
+        Write several transformations of one IFC file from a single parse.
+
+        The input is opened (or, for fast text, scanned) once; each target
+        is then written in turn. With a parsed model, the root placements
+        are rewritten for a target, the file is written and the original
+        placements are put back before the next target, so every output is
+        transformed from the source coordinates.
+
+        Fan-out only rewrites root placements: 'ifcpatch' and 'native' both
+        use the native engine (the same placements as OffsetObjectPlacements)
+        and 'fast_text' streams one output per target. 'georeference' is
+        not supported.
+
+        Args:
+            input_path: Path to input IFC file
+            targets: (output_path, kwargs) pairs, where kwargs holds x, y, z,
+                     should_rotate_first and rotation_z as for transform_file
+                     (a 'strategy' key is ignored)
+            strategy: Transform strategy used for every target
+            on_result: Optional callback receiving each TransformResult as
+                       its output is written
+
+        Returns:
+            One TransformResult per target, in order. The shared open and
+            unit scale (or scan) stages are reported on the first result.
+
+        Raises:
+            ValueError: If the strategy is not supported or input file is not a valid IFC file
+            Exception: If transformation fails for other reasons
+        """
+        if strategy not in TRANSFORM_STRATEGIES:
+            raise ValueError(f"Unknown transform strategy: {strategy}")
+        if strategy == STRATEGY_GEOREFERENCE:
+            raise ValueError("Fan-out is not supported with the georeference strategy")
+
+        shared = StageTimer()
+        results = []
+        with self._user_errors():
+            input_bytes = os.path.getsize(input_path)
+            if strategy == STRATEGY_FAST_TEXT:
+                write_target = self._fanout_fast_text(input_path, shared)
+            else:
+                strategy = STRATEGY_NATIVE
+                write_target = self._fanout_parsed(input_path, shared)
+
+            for output_path, kwargs in targets:
+                timer = StageTimer()
+                result = TransformResult(
+                    input_path=str(input_path),
+                    output_path=str(output_path),
+                    strategy=strategy,
+                    input_bytes=input_bytes
+                )
+                result.entity_count, result.placements = write_target(
+                    str(output_path), timer,
+                    kwargs['x'], kwargs['y'], kwargs['z'],
+                    kwargs['should_rotate_first'], kwargs.get('rotation_z')
+                )
+                result.output_bytes = os.path.getsize(output_path)
+
+                result.stages = timer.stages
+                result.seconds = round(timer.elapsed(), 4)
+                result.memory_bytes = timer.peak_increase()
+                if not results:
+                    result.stages = {**shared.stages, **timer.stages}
+                    result.seconds = round(result.seconds + sum(
+                        stage['seconds'] for stage in shared.stages.values()
+                    ), 4)
+                logger.info(f"Fan-out output written: {output_path} ({result.summary()})")
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+
+        return results
+
+    def _fanout_parsed(self, input_path: str, timer: StageTimer):
+        """
+        Open a model once for fan-out and return a function writing one target.
+
+        The returned function applies a transformation to the root
+        placements, writes the model, then restores the original placements
+        and deletes the entities it created.
+        """
+        import ifcopenshell
+        import ifcopenshell.util.unit
+        import ifcpatch
+
+        logger.info(f"Opening IFC file for fan-out: {input_path}")
+        with timer.stage('open'):
             ifc_file = ifcopenshell.open(input_path)
+        entity_count = self._count_entities(ifc_file)
 
-            # Convert metre offsets to project units
-            # unit_scale maps: ifc_project_length * unit_scale = si_metres
-            # So: si_metres / unit_scale = ifc_project_length
+        with timer.stage('unit_scale'):
             unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
-            x_proj = x / unit_scale
-            y_proj = y / unit_scale
-            z_proj = z / unit_scale
-            logger.info(f"Project unit scale: {unit_scale} (1 project unit = {unit_scale}m)")
-            logger.info(f"Converted offsets from metres ({x}, {y}, {z}) "
-                       f"to project units ({x_proj}, {y_proj}, {z_proj})")
-
-            # Build arguments list for OffsetObjectPlacements
-            # Format: [x, y, z, should_rotate_first, rotation_angle (optional)]
-            arguments = [x_proj, y_proj, z_proj, should_rotate_first]
-            if rotation_z is not None:
-                arguments.append(rotation_z)
-                logger.info(f"Applying transformation: offset=({x_proj}, {y_proj}, {z_proj}), "
-                          f"rotate_first={should_rotate_first}, rotation_z={rotation_z}°")
-            else:
-                logger.info(f"Applying transformation: offset=({x_proj}, {y_proj}, {z_proj}), "
-                          f"rotate_first={should_rotate_first}, no rotation")
-
-            # Execute transformation using IfcPatch
-            output = ifcpatch.execute({
-                "input": str(input_path),
-                "file": ifc_file,
-                "recipe": "OffsetObjectPlacements",
-                "arguments": arguments,
-            })
-
-            # Write transformed model to output file
+
+        originals = [
+            (placement, placement.RelativePlacement)
+            for placement in self._product_root_placements(ifc_file)
+        ]
+
+        def write_target(output_path, target_timer, x, y, z, should_rotate_first, rotation_z):
+            created = []
+            with target_timer.stage('patch'):
+                x_proj, y_proj, z_proj = self._to_project_units(x, y, z, unit_scale)
+                placements = self._offset_root_placements(
+                    ifc_file, x_proj, y_proj, z_proj, should_rotate_first, rotation_z, created
+                )
+            try:
+                logger.info(f"Writing output to: {output_path}")
+                with target_timer.stage('write'):
+                    ifcpatch.write(ifc_file, output_path)
+            finally:
+                self._restore_root_placements(ifc_file, originals, created)
+            return entity_count, placements
+
+        return write_target
+
+    def _fanout_fast_text(self, input_path: str, timer: StageTimer):
+        """Scan a file once for fan-out and return a function writing one target."""
+        logger.info(f"Scanning IFC file for fan-out (fast text mode): {input_path}")
+        transformer = FastTextTransformer(input_path)
+        with timer.stage('scan'):
+            transformer.scan()
+
+        def write_target(output_path, target_timer, x, y, z, should_rotate_first, rotation_z):
+            x_proj, y_proj, z_proj = self._to_project_units(x, y, z, transformer.unit_scale)
+            matrix = offset_matrix(x_proj, y_proj, z_proj, should_rotate_first, rotation_z)
             logger.info(f"Writing output to: {output_path}")
-            ifcpatch.write(output, str(output_path))
+            with target_timer.stage('write'):
+                placements = transformer.write(output_path, matrix)
+            return transformer.entity_count, placements
+
+        return write_target
 
-            logger.info("Transformation completed successfully")
-            return True
+    @staticmethod
+    def _restore_root_placements(ifc_file, originals: list[tuple], created: list):
+        """Put back the original root placements and delete the replacements."""
+        for placement, relative in originals:
+            placement.RelativePlacement = relative
+        for relative in created:
+            parts = [relative.Location, relative.Axis, relative.RefDirection]
+            ifc_file.remove(relative)
+            for part in parts:
+                if part is not None:
+                    ifc_file.remove(part)
+
+    @staticmethod
+    @contextmanager
+    def _user_errors():
+        """Convert exceptions raised while transforming into user-facing errors."""
+        try:
+            yield
+
+        except TransformCancelled:
+            logger.info("Transformation cancelled")
+            raise
 
         except RuntimeError as e:
             # IfcOpenShell raises RuntimeError for invalid IFC files
@@ -129,8 +416,381 @@ class IFCTransformModel:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+        except ValueError as e:
+            # Already user-friendly (e.g. from the fast text parser)
+            logger.error(str(e))
+            raise
+
         except Exception as e:
             # Catch all other exceptions and provide context
             error_msg = f"Transformation failed: {e}"
             logger.error(error_msg)
             raise Exception(error_msg)
+
+    def _transform_parsed(
+        self,
+        input_path: str,
+        output_path: str,
+        x: float,
+        y: float,
+        z: float,
+        should_rotate_first: bool,
+        rotation_z: float | None,
+        strategy: str,
+        timer: StageTimer,
+        result: TransformResult
+    ):
+        """Run a strategy that opens the model with ifcopenshell, timing each stage."""
+        import ifcopenshell
+        import ifcopenshell.util.unit
+        import ifcpatch
+
+        logger.info(f"Opening IFC file: {input_path}")
+        with timer.stage('open'):
+            # Open IFC file with path string to capture C++ parse errors
+            ifc_file = ifcopenshell.open(input_path)
+        result.entity_count = self._count_entities(ifc_file)
+
+        with timer.stage('unit_scale'):
+            unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+
+        with timer.stage('patch'):
+            if strategy == STRATEGY_GEOREFERENCE:
+                self._apply_map_conversion(
+                    ifc_file, x, y, z, should_rotate_first, rotation_z, unit_scale
+                )
+                output = ifc_file
+            elif strategy == STRATEGY_NATIVE:
+                x_proj, y_proj, z_proj = self._to_project_units(x, y, z, unit_scale)
+                result.placements = self._offset_root_placements(
+                    ifc_file, x_proj, y_proj, z_proj, should_rotate_first, rotation_z
+                )
+                output = ifc_file
+            else:
+                x_proj, y_proj, z_proj = self._to_project_units(x, y, z, unit_scale)
+                output = self._run_offset_recipe(
+                    input_path, ifc_file, x_proj, y_proj, z_proj, should_rotate_first, rotation_z
+                )
+
+        # Write transformed model to output file
+        logger.info(f"Writing output to: {output_path}")
+        with timer.stage('write'):
+            ifcpatch.write(output, str(output_path))
+
+    def _run_offset_recipe(
+        self,
+        input_path: str,
+        ifc_file,
+        x: float,
+        y: float,
+        z: float,
+        should_rotate_first: bool,
+        rotation_z: float | None
+    ):
+        """Run IfcPatch's OffsetObjectPlacements (offsets in project units) and return its output."""
+        import ifcpatch
+
+        # Build arguments list for OffsetObjectPlacements
+        # Format: [x, y, z, should_rotate_first, rotation_angle (optional)]
+        arguments = [x, y, z, should_rotate_first]
+        if rotation_z is not None:
+            arguments.append(rotation_z)
+            logger.info(f"Applying transformation: offset=({x}, {y}, {z}), "
+                      f"rotate_first={should_rotate_first}, rotation_z={rotation_z}°")
+        else:
+            logger.info(f"Applying transformation: offset=({x}, {y}, {z}), "
+                      f"rotate_first={should_rotate_first}, no rotation")
+
+        # Execute transformation using IfcPatch
+        return ifcpatch.execute({
+            "input": str(input_path),
+            "file": ifc_file,
+            "recipe": "OffsetObjectPlacements",
+            "arguments": arguments,
+        })
+
+    @staticmethod
+    def _count_entities(ifc_file) -> int:
+        """Return the number of entity instances in an open model."""
+        # entity_names moved from the wrapped C++ file onto the file in ifcopenshell 0.8
+        wrapped = getattr(ifc_file, 'wrapped_data', ifc_file)
+        return len(wrapped.entity_names())
+
+    def warm_up(self) -> float:
+        """
+        Import ifcopenshell, ifcpatch and the OffsetObjectPlacements recipe.
+
+        Safe to call from a background thread; later imports inside
+        transform_file then cost nothing.
+
+        Returns:
+            Seconds spent importing
+        """
+        start = time.perf_counter()
+        import ifcopenshell
+        import ifcopenshell.util.unit
+        import ifcopenshell.util.placement
+        import ifcpatch
+        # ifcpatch.execute imports recipes on demand
+        import ifcpatch.recipes.OffsetObjectPlacements
+        elapsed = time.perf_counter() - start
+        logger.info(f"IFC libraries loaded in {elapsed:.2f}s")
+        return elapsed
+
+    def _to_project_units(self, x: float, y: float, z: float, unit_scale: float) -> tuple:
+        """
+        Convert metre offsets to project units.
+
+        unit_scale maps: ifc_project_length * unit_scale = si_metres
+        So: si_metres / unit_scale = ifc_project_length
+        """
+        x_proj = x / unit_scale
+        y_proj = y / unit_scale
+        z_proj = z / unit_scale
+        logger.info(f"Project unit scale: {unit_scale} (1 project unit = {unit_scale}m)")
+        logger.info(f"Converted offsets from metres ({x}, {y}, {z}) "
+                   f"to project units ({x_proj}, {y_proj}, {z_proj})")
+        return x_proj, y_proj, z_proj
+
+    def _transform_fast_text(
+        self,
+        input_path: str,
+        output_path: str,
+        x: float,
+        y: float,
+        z: float,
+        should_rotate_first: bool,
+        rotation_z: float | None,
+        timer: StageTimer,
+        result: TransformResult,
+        progress=None
+    ):
+        """
+        Apply the transformation by streaming the STEP text.
+
+        Produces the same root placements as OffsetObjectPlacements without
+        loading the model into memory. See FastTextTransformer.
+        """
+        logger.info(f"Scanning IFC file (fast text mode): {input_path}")
+        transformer = FastTextTransformer(input_path)
+        with timer.stage('scan'):
+            transformer.scan(progress=(
+                lambda f: progress('scan', f * FAST_TEXT_SCAN_SHARE)
+            ) if progress else None)
+        result.entity_count = transformer.entity_count
+
+        x_proj, y_proj, z_proj = self._to_project_units(x, y, z, transformer.unit_scale)
+        matrix = offset_matrix(x_proj, y_proj, z_proj, should_rotate_first, rotation_z)
+        logger.info(f"Applying transformation: offset=({x_proj}, {y_proj}, {z_proj}), "
+                    f"rotate_first={should_rotate_first}, rotation_z={rotation_z}")
+
+        logger.info(f"Writing output to: {output_path}")
+        with timer.stage('write'):
+            result.placements = transformer.write(
+                str(output_path), matrix,
+                progress=(
+                    lambda f: progress('write', FAST_TEXT_SCAN_SHARE + f * (1 - FAST_TEXT_SCAN_SHARE))
+                ) if progress else None
+            )
+
+    def _offset_root_placements(
+        self,
+        ifc_file,
+        x: float,
+        y: float,
+        z: float,
+        should_rotate_first: bool,
+        rotation_z: float | None,
+        created: list | None = None
+    ) -> int:
+        """
+        Apply the transformation to the root placements of an open model.
+
+        Does what OffsetObjectPlacements does without going through
+        ifcpatch.execute: only the root IfcLocalPlacements that products
+        are placed by (directly or through PlacementRelTo chains) are
+        visited, and each gets a new IfcAxis2Placement3D (shared placement
+        entities elsewhere in the model are left untouched; an
+        IfcAxis2Placement2D becomes 3D as with IfcPatch). Uses the same
+        matrix code as the fast text engine. Offsets must already be in
+        project units.
+
+        Args:
+            created: Optional list the new IfcAxis2Placement3D entities are
+                     appended to (fan-out removes them again)
+
+        Returns:
+            Number of root placements rewritten
+
+        Raises:
+            ValueError: If a root placement is neither an IfcAxis2Placement3D
+                        nor an IfcAxis2Placement2D
+        """
+        matrix = offset_matrix(x, y, z, should_rotate_first, rotation_z)
+        logger.info(f"Applying transformation (native): offset=({x}, {y}, {z}), "
+                    f"rotate_first={should_rotate_first}, rotation_z={rotation_z}")
+
+        rewritten = 0
+        for placement in self._product_root_placements(ifc_file):
+            relative = placement.RelativePlacement
+            if relative.is_a("IfcAxis2Placement3D"):
+                axis = relative.Axis.DirectionRatios if relative.Axis else None
+            elif relative.is_a("IfcAxis2Placement2D"):
+                axis = None
+            else:
+                raise ValueError(
+                    f"Invalid IFC file: root placement #{placement.id()} "
+                    f"uses {relative.is_a()}, expected IfcAxis2Placement3D or IfcAxis2Placement2D"
+                )
+
+            m = matmul(matrix, axis2placement_matrix(
+                relative.Location.Coordinates,
+                axis,
+                relative.RefDirection.DirectionRatios if relative.RefDirection else None
+            ))
+            placement.RelativePlacement = ifc_file.createIfcAxis2Placement3D(
+                ifc_file.createIfcCartesianPoint((m[0][3], m[1][3], m[2][3])),
+                ifc_file.createIfcDirection((m[0][2], m[1][2], m[2][2])),
+                ifc_file.createIfcDirection((m[0][0], m[1][0], m[2][0]))
+            )
+            if created is not None:
+                created.append(placement.RelativePlacement)
+            rewritten += 1
+
+        return rewritten
+
+    @staticmethod
+    def _product_root_placements(ifc_file) -> list:
+        """
+        Return the root IfcLocalPlacements that products are placed by.
+
+        These are the placements OffsetObjectPlacements rewrites: the top
+        of each product's ObjectPlacement chain, in order of first use.
+        Roots no product uses are left out.
+        """
+        # placement id -> root of its chain
+        roots = {}
+        found = {}
+        for product in ifc_file.by_type("IfcProduct"):
+            placement = product.ObjectPlacement
+            if placement is None:
+                continue
+
+            chain = []
+            while placement.id() not in roots:
+                parent = placement.PlacementRelTo if placement.is_a("IfcLocalPlacement") else None
+                if parent is None:
+                    roots[placement.id()] = placement
+                    break
+                chain.append(placement.id())
+                placement = parent
+            root = roots[placement.id()]
+            for placement_id in chain:
+                roots[placement_id] = root
+
+            if root.is_a("IfcLocalPlacement"):
+                found.setdefault(root.id(), root)
+        return list(found.values())
+
+    def _apply_map_conversion(
+        self,
+        ifc_file,
+        x: float,
+        y: float,
+        z: float,
+        should_rotate_first: bool,
+        rotation_z: float | None,
+        unit_scale: float
+    ):
+        """
+        Apply the transformation by writing an IfcMapConversion.
+
+        The model context's existing map conversion (if any) is composed
+        with the requested transformation, so repeated shifts accumulate
+        just like repeated placement offsets. Otherwise a new
+        IfcMapConversion and IfcProjectedCRS are created. Offsets are
+        converted from metres to the map unit, which defaults to the
+        project length unit (unit_scale).
+
+        Raises:
+            ValueError: If the file is not IFC4 or has no model context
+        """
+        if ifc_file.schema == 'IFC2X3':
+            raise ValueError("Georeference mode requires an IFC4 file (got IFC2X3)")
+
+        context = self._get_model_context(ifc_file)
+        conversion = next(
+            (op for op in context.HasCoordinateOperation if op.is_a("IfcMapConversion")),
+            None
+        )
+
+        # Offsets in the map unit (the project unit unless the CRS sets MapUnit)
+        if conversion is not None and conversion.TargetCRS.MapUnit:
+            unit_scale = self._get_unit_scale(conversion.TargetCRS.MapUnit)
+        x_map, y_map, z_map = self._to_project_units(x, y, z, unit_scale)
+        matrix = offset_matrix(x_map, y_map, z_map, should_rotate_first, rotation_z)
+
+        if conversion is None:
+            logger.info("Creating IfcMapConversion on model context")
+            crs = ifc_file.createIfcProjectedCRS(
+                Name="Unknown",
+                Description="Created by IFC Translate Tool"
+            )
+            conversion = ifc_file.createIfcMapConversion(
+                SourceCRS=context,
+                TargetCRS=crs,
+                Eastings=0.0,
+                Northings=0.0,
+                OrthogonalHeight=0.0
+            )
+        else:
+            logger.info(f"Updating existing IfcMapConversion #{conversion.id()}")
+
+        # Current conversion as a matrix: map = Scale * R * local + (E, N, H)
+        scale = conversion.Scale or 1.0
+        angle = math.atan2(conversion.XAxisOrdinate or 0.0, conversion.XAxisAbscissa or 1.0)
+        cos_a = math.cos(angle) * scale
+        sin_a = math.sin(angle) * scale
+        current = [
+            [cos_a, -sin_a, 0.0, conversion.Eastings],
+            [sin_a, cos_a, 0.0, conversion.Northings],
+            [0.0, 0.0, scale, conversion.OrthogonalHeight],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+        new = matmul(matrix, current)
+
+        conversion.Eastings = new[0][3]
+        conversion.Northings = new[1][3]
+        conversion.OrthogonalHeight = new[2][3]
+        conversion.XAxisAbscissa = new[0][0] / scale
+        conversion.XAxisOrdinate = new[1][0] / scale
+        logger.info(f"Map conversion: eastings={conversion.Eastings}, "
+                    f"northings={conversion.Northings}, height={conversion.OrthogonalHeight}, "
+                    f"x_axis=({conversion.XAxisAbscissa}, {conversion.XAxisOrdinate})")
+
+    def _get_model_context(self, ifc_file):
+        """
+        Return the 3D 'Model' geometric representation context.
+
+        Raises:
+            ValueError: If the file has no geometric representation context
+        """
+        contexts = [
+            c for c in ifc_file.by_type("IfcGeometricRepresentationContext")
+            if not c.is_a("IfcGeometricRepresentationSubContext")
+        ]
+        if not contexts:
+            raise ValueError("Invalid IFC file: no geometric representation context")
+        return next((c for c in contexts if c.ContextType == "Model"), contexts[0])
+
+    def _get_unit_scale(self, unit) -> float:
+        """Return the size of a length unit entity in metres."""
+        import ifcopenshell.util.unit
+
+        scale = 1.0
+        while unit.is_a("IfcConversionBasedUnit"):
+            scale *= unit.ConversionFactor.ValueComponent.wrappedValue
+            unit = unit.ConversionFactor.UnitComponent
+        if unit.is_a("IfcSIUnit"):
+            scale *= ifcopenshell.util.unit.get_prefix_multiplier(unit.Prefix)
+        return scale
@@ -0,0 +1,227 @@
+"""
+Input Preflight Checks
+
+This module provides preflight_file and preflight_files, which check IFC
+inputs without parsing them: only the first HEADER_READ_BYTES and the last
+TAIL_READ_BYTES of each file are read. A file passes if it starts with an
+ISO-10303-21 header declaring an IFC FILE_SCHEMA and ends with the
+END-ISO-10303-21 terminator (so truncated copies are caught). The schema,
+originating application and an entity count estimate (from the file size
+and the record length in the sampled DATA section) are reported so batch
+cost can be judged before any file is opened with ifcopenshell.
+"""
+
+import concurrent.futures
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.fast_text import split_arguments
+
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the start of each file (the header section must end within it)
+HEADER_READ_BYTES = 64 * 1024
+
+# Bytes read from the end of each file to find the terminator
+TAIL_READ_BYTES = 1024
+
+# Threads checking files concurrently (the work is I/O bound)
+PREFLIGHT_WORKERS = 8
+
+# Average bytes per DATA record assumed when the sample is too small to measure
+DEFAULT_BYTES_PER_ENTITY = 80
+
+# Fewest sampled records needed to measure the average record length
+MIN_SAMPLE_RECORDS = 20
+
+_FILE_SCHEMA = re.compile(rb'FILE_SCHEMA\s*\(', re.IGNORECASE)
+_FILE_NAME = re.compile(rb'FILE_NAME\s*\(', re.IGNORECASE)
+_DATA_SECTION = re.compile(rb'^\s*DATA\s*;', re.IGNORECASE | re.MULTILINE)
+_END_SECTION = re.compile(rb'^\s*ENDSEC\s*;', re.IGNORECASE | re.MULTILINE)
+_TERMINATOR = b'END-ISO-10303-21;'
+
+
+@dataclass
+class PreflightResult:
+    """
+    Outcome of the preflight check of one input file.
+
+    error is None when the file passed; schema, application and
+    estimated_entities are filled in as far as the header allowed.
+    """
+
+    path: Path
+    size: int = 0
+    schema: str | None = None
+    application: str | None = None
+    estimated_entities: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file passed the preflight check."""
+        return self.error is None
+
+
+def preflight_file(path) -> PreflightResult:
+    """
+    Check that a file looks like a complete IFC STEP file.
+
+    Never raises: problems are reported in the result's error.
+
+    Args:
+        path: Path to the input file
+
+    Returns:
+        PreflightResult for the file
+    """
+    result = PreflightResult(path=Path(path))
+    try:
+        result.size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_READ_BYTES)
+            f.seek(max(0, result.size - TAIL_READ_BYTES))
+            tail = f.read(TAIL_READ_BYTES)
+    except OSError as e:
+        result.error = f"Cannot read file: {e}"
+        return result
+
+    try:
+        _check_header(head, tail, result)
+    except ValueError as e:
+        result.error = str(e)
+    return result
+
+
+def is_complete(path) -> bool:
+    """
+    Check whether a file ends with the STEP terminator.
+
+    A file without it is truncated or still being written. Only the last
+    TAIL_READ_BYTES are read.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        True if the file ends with END-ISO-10303-21; (False if unreadable)
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(max(0, os.fstat(f.fileno()).st_size - TAIL_READ_BYTES))
+            return _ends_with_terminator(f.read(TAIL_READ_BYTES))
+    except OSError:
+        return False
+
+
+def preflight_files(files, workers: int = PREFLIGHT_WORKERS) -> list[PreflightResult]:
+    """
+    Check several files concurrently.
+
+    Args:
+        files: Input file paths
+        workers: Number of threads reading headers
+
+    Returns:
+        One PreflightResult per file, in input order
+    """
+    files = list(files)
+    if len(files) <= 1:
+        return [preflight_file(f) for f in files]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+        results = list(executor.map(preflight_file, files))
+
+    rejected = sum(not r.ok for r in results)
+    if rejected:
+        logger.warning(f"Preflight rejected {rejected} of {len(results)} files")
+    return results
+
+
+def _check_header(head: bytes, tail: bytes, result: PreflightResult):
+    """
+    Validate the sampled head and tail of a file, filling in result.
+
+    Raises:
+        ValueError: If the file is not a complete IFC STEP file
+    """
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n')  # Tolerate a UTF-8 BOM
+    if not text.upper().startswith(b'ISO-10303-21;'):
+        raise ValueError("Not an IFC file: missing ISO-10303-21 header")
+
+    end = _END_SECTION.search(text)
+    if end is None:
+        raise ValueError(f"Invalid IFC file: header section not closed "
+                         f"within the first {HEADER_READ_BYTES // 1024} KB")
+    header = text[:end.start()]
+
+    schema_args = _header_arguments(header, _FILE_SCHEMA)
+    schemas = re.findall(rb"'([^']*)'", schema_args[0]) if schema_args else []
+    if not schemas:
+        raise ValueError("Invalid IFC file: no FILE_SCHEMA in header")
+    result.schema = schemas[0].decode('latin-1')
+    if not result.schema.upper().startswith('IFC'):
+        raise ValueError(f"Not an IFC file: schema is {result.schema}")
+
+    name_args = _header_arguments(header, _FILE_NAME)
+    if name_args and len(name_args) >= 6:
+        # FILE_NAME(name, time_stamp, author, organization,
+        #           preprocessor_version, originating_system, authorization)
+        result.application = _step_string(name_args[5]) or _step_string(name_args[4])
+
+    result.estimated_entities = _estimate_entities(text, result.size - (len(head) - len(text)))
+
+    if not _ends_with_terminator(tail):
+        raise ValueError("Invalid IFC file: truncated (no END-ISO-10303-21 at end of file)")
+
+
+def _ends_with_terminator(tail: bytes) -> bool:
+    """Return whether the end of a file is the END-ISO-10303-21 terminator."""
+    return tail.rstrip().upper().endswith(_TERMINATOR)
+
+
+def _header_arguments(header: bytes, pattern: re.Pattern) -> list[bytes] | None:
+    """Return the argument tokens of a header entry, or None if it is missing."""
+    match = pattern.search(header)
+    if match is None:
+        return None
+
+    depth = 1
+    in_string = False
+    for i in range(match.end(), len(header)):
+        char = header[i]
+        if char == 0x27:  # '
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char == 0x28:  # (
+            depth += 1
+        elif char == 0x29:  # )
+            depth -= 1
+            if depth == 0:
+                return split_arguments(header[match.end():i])
+    return None
+
+
+def _step_string(token: bytes) -> str | None:
+    """Decode a STEP string token ('...' with '' escapes); None for $ or ''."""
+    token = token.strip()
+    if len(token) < 2 or not token.startswith(b"'") or not token.endswith(b"'"):
+        return None
+    return token[1:-1].replace(b"''", b"'").decode('latin-1') or None
+
+
+def _estimate_entities(text: bytes, size: int) -> int:
+    """Estimate the number of DATA records from the sampled record length."""
+    data = _DATA_SECTION.search(text)
+    if data is None:
+        return 0
+
+    sample = text[data.end():]
+    records = sample.count(b'\n#')
+    bytes_per_entity = len(sample) / records if records >= MIN_SAMPLE_RECORDS else DEFAULT_BYTES_PER_ENTITY
+    return int((size - data.end()) / bytes_per_entity)
@@ -3,12 +3,35 @@ Preset Persistence Model
 
 This module provides the PresetsModel class for managing transformation
 preset storage. Presets are stored as JSON files in the platform-appropriate
-user data directory.
+user data directory and cached in memory; the file is only re-read when its
+modification time or size changes (e.g. another app instance saved a
+preset).
+
+SQLitePresetsModel stores presets in an SQLite database instead, for large
+shared preset libraries: lookups and prefix searches use an index rather
+than loading every preset, and several app instances can read and write
+the same database. open_presets_model picks the backend.
 """
 
+from bisect import bisect_left
+from contextlib import closing
 from pathlib import Path
 from platformdirs import user_data_dir
 import json
+import logging
+import os
+import sqlite3
+
+from src.utils.fileio import atomic_write_json
+
+
+logger = logging.getLogger(__name__)
+
+# Environment variable naming an SQLite preset database (selects SQLitePresetsModel)
+PRESETS_DB_ENV = "IFC_TRANSLATE_PRESETS_DB"
+
+# Seconds an SQLite operation waits for another instance's write lock
+SQLITE_BUSY_TIMEOUT = 10.0
 
 
 class PresetsModel:
@@ -18,6 +41,9 @@ class PresetsModel:
     Manages saving, loading, and deleting transformation presets using
     JSON storage in cross-platform user data directory. Follows MVC
     pattern established in Phase 1.
+
+    The parsed presets, sorted names and search index are cached and
+    rebuilt only when presets.json changes on disk.
     """
 
     def __init__(self, app_name="IFCTranslateTool", app_author="IFCTranslateTool"):
@@ -36,6 +62,12 @@ class PresetsModel:
         self.presets_file = self.data_dir / "presets.json"
         self.config_file = self.data_dir / "config.json"
 
+        # Cache of presets.json, valid while the file signature is unchanged
+        self._signature = None
+        self._presets = {}
+        self._names = []
+        self._search_keys = []
+
     def load_presets(self) -> dict:
         """
         Load all presets from JSON file.
@@ -47,18 +79,19 @@ class PresetsModel:
             Dictionary mapping preset names to preset data dicts.
             Empty dict if no presets or file corrupted.
         """
-        if not self.presets_file.exists():
-            return {}
+        return dict(self._cached_presets())
 
-        try:
-            with self.presets_file.open('r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            # Return empty dict rather than crashing on corrupted file
-            return {}
-        except Exception:
-            # Handle other errors gracefully
-            return {}
+    def get_preset(self, name: str) -> dict | None:
+        """
+        Return one preset's data.
+
+        Args:
+            name: Preset name
+
+        Returns:
+            Preset data dictionary, or None if there is no such preset
+        """
+        return self._cached_presets().get(name)
 
     def save_preset(self, name: str, preset_data: dict):
         """
@@ -73,7 +106,11 @@ class PresetsModel:
             "y": float,
             "z": float,
             "rotation": float,
-            "rotate_first": bool
+            "rotate_first": bool,
+            "strategy": str  (optional, defaults to "ifcpatch"),
+            "operations": list  (optional operation chain, see
+                                 src.utils.transform; replaces x, y, z,
+                                 rotation and rotate_first)
         }
 
         Args:
@@ -82,7 +119,7 @@ class PresetsModel:
         """
         presets = self.load_presets()
         presets[name] = preset_data
-        self._atomic_write_json(self.presets_file, presets)
+        self._write_presets(presets)
 
     def delete_preset(self, name: str):
         """
@@ -97,7 +134,7 @@ class PresetsModel:
         presets = self.load_presets()
         if name in presets:
             del presets[name]
-            self._atomic_write_json(self.presets_file, presets)
+            self._write_presets(presets)
 
     def list_presets(self) -> list[str]:
         """
@@ -106,8 +143,29 @@ class PresetsModel:
         Returns:
             Sorted list of preset names. Empty list if no presets.
         """
-        presets = self.load_presets()
-        return sorted(presets.keys())
+        self._cached_presets()
+        return list(self._names)
+
+    def search_presets(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        Return preset names starting with prefix, ignoring case.
+
+        Args:
+            prefix: Text the names must start with ('' matches every preset)
+            limit: Optional maximum number of names to return
+
+        Returns:
+            Matching names in case-insensitive order
+        """
+        self._cached_presets()
+        key = prefix.casefold()
+        matches = []
+        for i in range(bisect_left(self._search_keys, (key,)), len(self._search_keys)):
+            folded, name = self._search_keys[i]
+            if not folded.startswith(key) or (limit is not None and len(matches) >= limit):
+                break
+            matches.append(name)
+        return matches
 
     def save_last_used(self, preset_name: str):
         """
@@ -138,29 +196,166 @@ class PresetsModel:
         except (json.JSONDecodeError, Exception):
             return None
 
+    def _cached_presets(self) -> dict:
+        """
+        Return the cached presets, re-reading presets.json if it changed.
+
+        The file is identified by its modification time and size, so a
+        save from another app instance invalidates the cache.
+        """
+        try:
+            stat = self.presets_file.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        if signature != self._signature:
+            self._set_cache(self._read_presets_file() if signature else {}, signature)
+        return self._presets
+
+    def _read_presets_file(self) -> dict:
+        """Parse presets.json; empty dict if it is corrupted or unreadable."""
+        try:
+            with self.presets_file.open('r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            # Return empty dict rather than crashing on corrupted file
+            return {}
+        except Exception:
+            # Handle other errors gracefully
+            return {}
+
+    def _set_cache(self, presets: dict, signature):
+        """Replace the cached presets and rebuild the name indexes."""
+        self._presets = presets
+        self._signature = signature
+        self._names = sorted(presets)
+        self._search_keys = sorted((name.casefold(), name) for name in presets)
+
+    def _write_presets(self, presets: dict):
+        """Write all presets atomically and cache what was written."""
+        self._atomic_write_json(self.presets_file, presets)
+        stat = self.presets_file.stat()
+        self._set_cache(presets, (stat.st_mtime_ns, stat.st_size))
+
     def _atomic_write_json(self, filepath: Path, data: dict):
         """
         Write JSON file atomically to prevent corruption.
 
-        Uses temp file + rename pattern (atomic on POSIX). Writes to
-        .tmp file first, then uses Path.replace() for atomic rename.
+        See src.utils.fileio.atomic_write_json (temp file + rename).
 
         Args:
             filepath: Target file path
             data: Dictionary to serialize as JSON
         """
-        temp_file = filepath.with_suffix('.tmp')
+        atomic_write_json(filepath, data)
+
+
+class SQLitePresetsModel(PresetsModel):
+    """
+    Preset persistence in an SQLite database.
+
+    Same interface as PresetsModel; the last used preset is still kept in
+    the per-user config.json. Each operation opens its own short
+    connection, so several app instances can share one database (writers
+    wait up to SQLITE_BUSY_TIMEOUT for each other). The default rollback
+    journal is used rather than WAL, which does not work on network
+    filesystems.
+
+    A new database is seeded with the presets in presets.json.
+    """
+
+    def __init__(self, db_path=None, app_name="IFCTranslateTool", app_author="IFCTranslateTool"):
+        """
+        Open (creating if needed) a preset database.
+
+        Args:
+            db_path: Database file (default: presets.db in the user data directory)
+            app_name: Application name for directory naming
+            app_author: Application author for directory naming (Windows)
+        """
+        super().__init__(app_name, app_author)
+        self.db_path = Path(db_path) if db_path else self.data_dir / "presets.db"
+        created = not self.db_path.exists()
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS presets (name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS presets_name_nocase ON presets (name COLLATE NOCASE)")
+            if created and self.presets_file.exists():
+                presets = self._read_presets_file()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO presets (name, data) VALUES (?, ?)",
+                    [(name, json.dumps(data)) for name, data in presets.items()]
+                )
+                logger.info(f"Imported {len(presets)} presets into {self.db_path}")
+
+    def load_presets(self) -> dict:
+        """Load all presets (empty dict if the database can't be read)."""
+        rows = self._query("SELECT name, data FROM presets")
+        return {name: json.loads(data) for name, data in rows}
+
+    def get_preset(self, name: str) -> dict | None:
+        """Return one preset's data, or None if there is no such preset."""
+        rows = self._query("SELECT data FROM presets WHERE name = ?", (name,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_preset(self, name: str, preset_data: dict):
+        """Insert or replace a single preset."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO presets (name, data) VALUES (?, ?)",
+                (name, json.dumps(preset_data))
+            )
+
+    def delete_preset(self, name: str):
+        """Delete a preset by name (does nothing if it doesn't exist)."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM presets WHERE name = ?", (name,))
+
+    def list_presets(self) -> list[str]:
+        """Return sorted list of preset names."""
+        return [name for name, in self._query("SELECT name FROM presets ORDER BY name")]
+
+    def search_presets(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        Return preset names starting with prefix, ignoring (ASCII) case.
 
+        Uses the case-insensitive name index as a range scan, so only the
+        matching names are read.
+        """
+        # Everything that starts with prefix sorts between prefix and prefix + U+10FFFF
+        rows = self._query(
+            "SELECT name FROM presets "
+            "WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE "
+            "ORDER BY name COLLATE NOCASE LIMIT ?",
+            (prefix, prefix + "\U0010ffff", -1 if limit is None else limit)
+        )
+        return [name for name, in rows]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection that waits for other instances' locks."""
+        return sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT)
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """Run a read query; an unreadable database reads as empty."""
         try:
-            # Write to temp file with UTF-8 encoding
-            with temp_file.open('w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with closing(self._connect()) as conn:
+                return conn.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read presets from {self.db_path}: {e}")
+            return []
 
-            # Atomic rename (POSIX guarantee)
-            temp_file.replace(filepath)
 
-        except Exception:
-            # Clean up temp file if write failed
-            if temp_file.exists():
-                temp_file.unlink()
-            raise
+def open_presets_model() -> PresetsModel:
+    """
+    Create the presets model for this session.
+
+    Returns:
+        SQLitePresetsModel on the database named by the
+        IFC_TRANSLATE_PRESETS_DB environment variable if it is set,
+        otherwise the JSON-backed PresetsModel
+    """
+    db_path = os.environ.get(PRESETS_DB_ENV)
+    if db_path:
+        return SQLitePresetsModel(db_path)
+    return PresetsModel()
@@ -0,0 +1,218 @@
+"""
+Transform Profiling
+
+This module provides the TransformProfiler class that runs a transformation
+under cProfile and tracemalloc, so a pathologically slow or memory-hungry
+customer file can be diagnosed from a production run instead of being
+reproduced by hand. For each file it writes the cProfile statistics (a
+.prof file for pstats, snakeviz or gprof2dot) and a text report of the
+hottest functions and largest allocations next to the output, and returns
+a summary of both for the batch report.
+
+tracemalloc only sees memory allocated through Python: ifcopenshell's C++
+model shows up in the peak RSS of each stage, not in the allocation
+report. tracemalloc is process-wide, so in thread mode the allocations of
+files profiled at the same time are mixed.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# Suffixes of the report files written next to the output
+PROFILE_SUFFIX = '.prof'
+REPORT_SUFFIX = '.profile.txt'
+
+# Functions and allocation sites listed in the text report
+REPORT_FUNCTIONS = 30
+REPORT_ALLOCATIONS = 25
+
+# Functions and allocation sites kept in the result summary
+SUMMARY_FUNCTIONS = 10
+SUMMARY_ALLOCATIONS = 5
+
+# Stack frames recorded per allocation (more is slower)
+TRACEMALLOC_FRAMES = 1
+
+# Profilers sharing the process-wide tracemalloc
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+class TransformProfiler:
+    """
+    Profiles one transformation and writes its reports.
+
+    Wrap the transformation in run(), call stage_started as each stage
+    starts (the allocation snapshot is the largest taken at a stage start,
+    since the parsed model is freed before transform_file returns), then
+    call save().
+    """
+
+    def __init__(self, output_path):
+        """
+        Initialize profiler.
+
+        Args:
+            output_path: Output file the reports are written next to
+        """
+        output_path = Path(output_path)
+        self.profile_path = output_path.with_name(output_path.stem + PROFILE_SUFFIX)
+        self.report_path = output_path.with_name(output_path.stem + REPORT_SUFFIX)
+        self._profile = cProfile.Profile()
+        self._snapshot = None
+        self._snapshot_moment = None
+        self._snapshot_bytes = -1
+        self._traced_peak = 0
+        self._profiling = False
+
+    @contextmanager
+    def run(self):
+        """Profile and trace allocations for the duration of the block."""
+        _start_tracing()
+        try:
+            self._take_snapshot("the start of the transformation")
+            self._profile.enable()
+            self._profiling = True
+            try:
+                yield self
+            finally:
+                self._profile.disable()
+                self._profiling = False
+                self._take_snapshot("the end of the transformation")
+                self._traced_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            _stop_tracing()
+
+    def stage_started(self, stage: str):
+        """Keep an allocation snapshot if more memory is traced now than at earlier stages."""
+        self._take_snapshot(f"the start of the '{stage}' stage")
+
+    def _take_snapshot(self, moment: str):
+        """Replace the kept snapshot if more memory is traced now."""
+        if not tracemalloc.is_tracing():
+            return
+        traced = tracemalloc.get_traced_memory()[0]
+        if traced <= self._snapshot_bytes:
+            return
+
+        # Taking the snapshot is not part of the transformation's time
+        if self._profiling:
+            self._profile.disable()
+        try:
+            self._snapshot = tracemalloc.take_snapshot()
+        finally:
+            if self._profiling:
+                self._profile.enable()
+        self._snapshot_moment = moment
+        self._snapshot_bytes = traced
+
+    def save(self, title: str) -> dict:
+        """
+        Write the .prof file and text report.
+
+        Args:
+            title: First line of the report (e.g. the input file name)
+
+        Returns:
+            Summary with the report paths, the hottest functions (by time
+            spent in the function itself), the traced peak and the largest
+            allocation sites
+
+        Raises:
+            OSError: If a report cannot be written
+        """
+        self._profile.dump_stats(self.profile_path)
+        stats = pstats.Stats(self._profile)
+        functions = _hottest_functions(stats)
+        allocations = _largest_allocations(self._snapshot)
+
+        text = io.StringIO()
+        text.write(f"{title}\n\n")
+        text.write(f"Traced Python memory: peak {self._traced_peak / 1024 ** 2:.1f} MB\n")
+        text.write(f"Largest allocation sites at {self._snapshot_moment} "
+                   f"({max(self._snapshot_bytes, 0) / 1024 ** 2:.1f} MB traced):\n")
+        for site in allocations[:REPORT_ALLOCATIONS]:
+            text.write(f"  {site['bytes'] / 1024:>12,.0f} KB {site['count']:>10,} blocks  {site['location']}\n")
+        text.write("\nHottest functions (own time):\n")
+        stats.stream = text
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(REPORT_FUNCTIONS)
+        text.write("Slowest call paths (cumulative time):\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_FUNCTIONS)
+        self.report_path.write_text(text.getvalue(), encoding='utf-8')
+        logger.info(f"Profile written to {self.profile_path} and {self.report_path}")
+
+        return {
+            'profile_path': str(self.profile_path),
+            'report_path': str(self.report_path),
+            'functions': functions[:SUMMARY_FUNCTIONS],
+            'traced_peak_bytes': self._traced_peak,
+            'allocations': allocations[:SUMMARY_ALLOCATIONS]
+        }
+
+
+def function_label(key: tuple) -> str:
+    """Return a pstats function key (file, line, name) as 'name (file:line)'."""
+    filename, line, name = key
+    if filename == '~':
+        # Built-in function, e.g. "<method 'write' of '_io.BufferedWriter' objects>"
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def _hottest_functions(stats: pstats.Stats) -> list[dict]:
+    """Return every profiled function with its call count and times, by own time."""
+    functions = [
+        {
+            'function': function_label(key),
+            'calls': calls,
+            'seconds': round(own_time, 4),
+            'cumulative_seconds': round(cumulative, 4)
+        }
+        for key, (_, calls, own_time, cumulative, _) in stats.stats.items()
+    ]
+    functions.sort(key=lambda f: f['seconds'], reverse=True)
+    return functions
+
+
+def _largest_allocations(snapshot) -> list[dict]:
+    """Return the allocation sites of a snapshot, largest first."""
+    if snapshot is None:
+        return []
+    # Leave out the profilers' own bookkeeping (other threads' included)
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, module.__file__) for module in (tracemalloc, cProfile, pstats)
+    ] + [tracemalloc.Filter(False, __file__)])
+    return [
+        {'location': f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}",
+         'bytes': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:REPORT_ALLOCATIONS]
+    ]
+
+
+def _start_tracing():
+    """Start tracemalloc unless another profiler in this process already did."""
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        else:
+            tracemalloc.reset_peak()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    """Stop tracemalloc once the last profiler in this process is done."""
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
@@ -0,0 +1,160 @@
+"""
+Memory-Aware Batch Scheduler
+
+This module provides the MemoryScheduler class that decides the order in
+which batch files are processed and when a file may be handed to a worker.
+Each file's peak memory is estimated from its size; a file is admitted only
+while the estimates of all running files fit within the memory budget. The
+bytes-per-byte ratio behind the estimate is learned from peaks observed by
+the workers.
+"""
+
+import logging
+from pathlib import Path
+
+from src.utils.resources import total_memory_bytes
+
+
+logger = logging.getLogger(__name__)
+
+# Processing orders
+ORDER_LARGEST_FIRST = 'largest'
+ORDER_SMALLEST_FIRST = 'smallest'
+ORDER_NAME = 'name'
+SCHEDULE_ORDERS = (ORDER_LARGEST_FIRST, ORDER_SMALLEST_FIRST, ORDER_NAME)
+
+# Initial estimate of peak memory per byte of IFC file. ifcopenshell
+# typically needs several times the file size once a model is parsed.
+DEFAULT_MEMORY_RATIO = 10.0
+
+# Fraction of physical memory used as the default budget
+DEFAULT_BUDGET_FRACTION = 0.75
+
+# Files smaller than this are dominated by fixed interpreter overhead and
+# would skew the learned ratio
+MIN_LEARNING_SIZE = 1024 * 1024
+
+# Weight of each new observation in the learned ratio
+LEARNING_RATE = 0.5
+
+
+def default_memory_budget() -> int | None:
+    """Return the default memory budget in bytes (None if RAM size is unknown)."""
+    total = total_memory_bytes()
+    if total is None:
+        return None
+    return int(total * DEFAULT_BUDGET_FRACTION)
+
+
+class MemoryScheduler:
+    """
+    Orders batch files and admits them to workers within a memory budget.
+
+    Not thread-safe: the batch loop calls it from a single thread.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int | None = None,
+        order: str = ORDER_LARGEST_FIRST,
+        ratio: float = DEFAULT_MEMORY_RATIO
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            budget_bytes: Memory budget for all running files in bytes
+                          (default: 75% of physical memory; unlimited if unknown)
+            order: 'largest' (best overall throughput), 'smallest' (fastest
+                   first results) or 'name' (alphabetical)
+            ratio: Initial estimate of peak memory per byte of input file
+
+        Raises:
+            ValueError: If order is unknown
+        """
+        if order not in SCHEDULE_ORDERS:
+            raise ValueError(f"Unknown processing order: {order}")
+
+        self.budget_bytes = budget_bytes if budget_bytes is not None else default_memory_budget()
+        self.order = order
+        self.ratio = ratio
+        self._reserved = {}
+        self._sizes = {}
+
+    @property
+    def reserved_bytes(self) -> int:
+        """Total estimated memory of currently admitted files."""
+        return sum(self._reserved.values())
+
+    def order_files(self, files) -> list[Path]:
+        """Return files sorted into processing order."""
+        if self.order == ORDER_NAME:
+            return sorted(files)
+        return sorted(files, key=self.file_size, reverse=self.order == ORDER_LARGEST_FIRST)
+
+    def estimate(self, size: int) -> int:
+        """Return the estimated peak memory in bytes for a file of the given size."""
+        return int(size * self.ratio)
+
+    def try_admit(self, input_file) -> bool:
+        """
+        Reserve memory for a file if the budget allows it.
+
+        A file is always admitted when nothing else is running, so files
+        larger than the whole budget still run (on their own).
+
+        Args:
+            input_file: Path of the file about to be submitted
+
+        Returns:
+            True if the file was admitted and may be submitted now
+        """
+        estimate = self.estimate(self.file_size(input_file))
+        if (
+            self._reserved
+            and self.budget_bytes is not None
+            and self.reserved_bytes + estimate > self.budget_bytes
+        ):
+            return False
+
+        self._reserved[input_file] = estimate
+        return True
+
+    def release(self, input_file, observed_peak: int | None = None):
+        """
+        Release a finished file's reservation and learn from its memory use.
+
+        Args:
+            input_file: Path previously admitted with try_admit
+            observed_peak: Peak memory in bytes the worker used for this
+                           file, or None if it could not be measured
+        """
+        self._reserved.pop(input_file, None)
+
+        size = self.file_size(input_file)
+        if observed_peak is None or size < MIN_LEARNING_SIZE:
+            return
+
+        observed_ratio = observed_peak / size
+        self.ratio = (1 - LEARNING_RATE) * self.ratio + LEARNING_RATE * observed_ratio
+        logger.info(f"Memory estimate updated: {observed_ratio:.1f}x observed, "
+                    f"now {self.ratio:.1f}x file size")
+
+    def forget(self, input_file):
+        """Drop a finished file's cached size (it is re-read if the file is queued again)."""
+        self._sizes.pop(Path(input_file), None)
+
+    def file_size(self, input_file) -> int:
+        """Return a file's size in bytes (cached; 0 if it cannot be read)."""
+        # Cached by Path, so str and Path names of a file share one entry
+        key = Path(input_file)
+        if key not in self._sizes:
+            try:
+                self._sizes[key] = key.stat().st_size
+            except OSError:
+                self._sizes[key] = 0
+        return self._sizes[key]
+
+    def cached_size(self, input_file) -> int | None:
+        """Return a file's cached size, or None if it isn't cached (e.g. it was forgotten)."""
+        return self._sizes.get(Path(input_file))
@@ -0,0 +1,838 @@
+"""
+Transform Job Service
+
+This module provides TransformService, a local HTTP service through which
+other tools submit transform jobs to one shared pool of warm workers,
+instead of each paying the ifcopenshell import (and process start) cost.
+Jobs are queued in submission order and dispatched to the pool within the
+MemoryScheduler's memory budget; clients poll each job's status, progress
+and per-stage timings, and can cancel jobs. Cancelling a running job
+kills its worker process (thread workers stop as the next stage starts)
+and removes its partial output. If a worker process dies (it crashed or
+was killed, e.g. by the out-of-memory killer), its job fails and the pool
+is replaced; jobs the pool stopped along with it are queued again, ahead
+of the others. /health reports 503 if the dispatcher itself has stopped.
+
+The service only listens on localhost: anyone who can reach it can read
+and write files with the service's permissions. Requests must name a
+localhost (or the --host) address in their Host header, so a web page
+can't reach the service through DNS rebinding, and job submissions must be
+sent as application/json, which browsers won't send cross-site without a
+CORS preflight the service never grants. With a token (--token or the
+IFC_TRANSLATE_TOKEN environment variable) every request must also carry
+"Authorization: Bearer <token>". Outputs must be .ifc files and can't be
+the input of a queued or running job.
+
+API (JSON request and response bodies):
+    POST   /jobs        Submit {"input": path, "output_dir": path (or "output":
+                        file path), "preset": name, "x", "y", "z", "rotation",
+                        "rotate_first", "strategy"}; returns 202 and the job
+    GET    /jobs        List jobs, oldest first
+    GET    /jobs/<id>   One job's status, progress, timings and error
+    DELETE /jobs/<id>   Cancel a job (409 if it already finished); a running
+                        job shows cancel_requested until its worker is stopped
+    GET    /health      Worker, queued and running counts (503 if jobs can't run)
+
+Usage (run from project root):
+    python -m src.service [--port 8765] [--workers 4] [--mode process] [--token SECRET]
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import hmac
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Add project root to path for imports when running directly
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.batch import (
+    MODE_PROCESS,
+    MODE_THREAD,
+    POLL_INTERVAL,
+    TERMINATE_TIMEOUT,
+    build_transform_kwargs,
+    default_worker_count,
+    init_worker,
+    transform_one
+)
+from src.cli import DEFAULT_VALUES
+from src.model import IFCTransformModel, TRANSFORM_STRATEGIES, TransformCancelled
+from src.scheduler import MemoryScheduler
+from src.utils.fileio import remove_partial_outputs
+from src.utils.validation import build_output_path, validate_input_file, validate_output_directory
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Host header names always accepted (the --host address is accepted too)
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+# Environment variable holding the shared token (instead of --token)
+TOKEN_ENV = 'IFC_TRANSLATE_TOKEN'
+
+# Worker types the service can run (a serial worker would block the dispatcher)
+SERVICE_MODES = (MODE_THREAD, MODE_PROCESS)
+
+# Job states
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# Finished jobs kept for status queries; older ones are forgotten
+MAX_FINISHED_JOBS = 1000
+
+# Largest accepted request body
+MAX_REQUEST_BYTES = 1024 * 1024
+
+# Queue on which process workers announce the job they start (set by _init_service_worker)
+_worker_starts = None
+
+
+def _init_service_worker(log_level: int, progress_queue, model, starts_queue):
+    """Process pool initializer: set up the worker (see init_worker) and keep the starts queue."""
+    global _worker_starts
+    _worker_starts = starts_queue
+    init_worker(log_level, progress_queue, model)
+
+
+def run_job(model, job_id: str, input_path: str, output_path: str, transform_kwargs: dict):
+    """
+    Process worker entry point: announce which process runs the job, then transform it.
+
+    The service needs the process to kill it when the job is cancelled.
+    """
+    _worker_starts.put((job_id, os.getpid()))
+    return transform_one(model, input_path, output_path, transform_kwargs, progress_key=job_id)
+
+
+@dataclass
+class Job:
+    """A submitted transform and its outcome."""
+
+    id: str
+    input_path: str
+    output_path: str
+    values: dict
+    transform_kwargs: dict
+    status: str = JOB_QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    stage: str | None = None
+    fraction: float | None = None
+    result: dict | None = None
+    error: str | None = None
+    # Set to cancel the job (thread workers check it as each stage starts)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    def to_dict(self) -> dict:
+        """Return the job as a JSON-serialisable dictionary."""
+        def timestamp(seconds):
+            if seconds is None:
+                return None
+            return datetime.fromtimestamp(seconds).isoformat(timespec='milliseconds')
+
+        return {
+            'id': self.id,
+            'status': self.status,
+            'input': self.input_path,
+            'output': self.output_path,
+            'values': self.values,
+            'submitted': timestamp(self.submitted),
+            'started': timestamp(self.started),
+            'finished': timestamp(self.finished),
+            'queued_seconds': round((self.started or self.finished or time.time()) - self.submitted, 3),
+            'run_seconds': round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            'stage': self.stage,
+            'fraction': self.fraction,
+            'result': self.result,
+            'error': self.error,
+            'cancel_requested': self.status == JOB_RUNNING and self.cancel_event.is_set()
+        }
+
+
+class TransformService:
+    """
+    Queue of transform jobs served by a persistent worker pool.
+
+    Thread-safe: HTTP handler threads submit and query jobs while a
+    dispatcher thread feeds the pool.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        mode: str = MODE_PROCESS,
+        scheduler: MemoryScheduler | None = None,
+        presets_model=None
+    ):
+        """
+        Initialize service (call start() to launch the workers).
+
+        Args:
+            workers: Number of concurrent workers (default: CPU core count)
+            mode: 'process' or 'thread'
+            scheduler: MemoryScheduler for admission (default: 75% of physical memory)
+            presets_model: Presets model for jobs naming a preset
+                           (default: open_presets_model() on first use)
+
+        Raises:
+            ValueError: If mode is unknown or workers is less than 1
+        """
+        if mode not in SERVICE_MODES:
+            raise ValueError(f"Unknown service mode: {mode}")
+        if workers is None:
+            workers = default_worker_count()
+        if workers < 1:
+            raise ValueError(f"Worker count must be at least 1, got: {workers}")
+
+        self.model = IFCTransformModel()
+        self.workers = workers
+        self.mode = mode
+        self.scheduler = scheduler if scheduler is not None else MemoryScheduler()
+        self.presets_model = presets_model
+        self._jobs = {}
+        self._queue = collections.deque()
+        self._finished = collections.deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._executor = None
+        self._progress_queue = None
+        self._starts_queue = None
+        # job id -> worker process running it (process mode)
+        self._job_workers = {}
+        self._dispatcher = None
+        self._dispatcher_error = None
+        self._pool_restarts = 0
+
+    def start(self):
+        """Start the worker pool (importing the IFC libraries in every worker) and the dispatcher."""
+        if self.mode == MODE_THREAD:
+            self.model.warm_up()
+        self._start_pool()
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info(f"Job service started with {self.workers} {self.mode} workers")
+
+    def shutdown(self):
+        """Cancel queued jobs, wait for running ones and stop the workers."""
+        with self._lock:
+            for job in self._queue:
+                self._finish(job, JOB_CANCELLED)
+            self._queue.clear()
+        self._stopping.set()
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._progress_queue is not None:
+            self._progress_queue.close()
+
+    def submit(self, request: dict) -> Job:
+        """
+        Validate and queue a job.
+
+        Args:
+            request: Dictionary with 'input', 'output_dir' or 'output', and
+                     optionally 'preset' and any of x, y, z, rotation,
+                     rotate_first and strategy (which override the preset)
+
+        Returns:
+            The queued Job
+
+        Raises:
+            ValueError: If the request is invalid, a file or directory is
+                        unusable, the output is not an .ifc file or would
+                        overwrite an input, the preset doesn't exist, or
+                        the service is shutting down
+        """
+        if self._stopping.is_set():
+            raise ValueError("Service is shutting down")
+        if not isinstance(request, dict) or not request.get('input'):
+            raise ValueError("Job needs an 'input' file")
+
+        input_path = validate_input_file(request['input'])
+        if request.get('output'):
+            output_path = Path(request['output'])
+            validate_output_directory(output_path.parent)
+        elif request.get('output_dir'):
+            output_path = build_output_path(input_path, validate_output_directory(request['output_dir']))
+        else:
+            raise ValueError("Job needs an 'output_dir' or 'output'")
+        if output_path.suffix.lower() != '.ifc':
+            raise ValueError(f"Output must be an .ifc file: {output_path}")
+        if output_path.resolve() == input_path.resolve():
+            raise ValueError("Output would overwrite the input file")
+
+        values = self._resolve_values(request)
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            input_path=str(input_path),
+            output_path=str(output_path),
+            values=values,
+            transform_kwargs=build_transform_kwargs(values)
+        )
+        with self._lock:
+            self._check_conflicts(input_path.resolve(), output_path.resolve())
+            self._jobs[job.id] = job
+            self._queue.append(job)
+        self._wakeup.set()
+        logger.info(f"Job {job.id} queued: {input_path}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Return a job by id, or None if it is unknown (or was forgotten)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        """Return all known jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Cancel a job.
+
+        A queued job is cancelled straight away. A running job is stopped
+        by the dispatcher within POLL_INTERVAL (process workers are killed,
+        thread workers stop as the next stage starts) and its partial
+        output removed; until then it stays 'running' with cancel_requested.
+
+        Returns:
+            The job, or None if the job is unknown
+
+        Raises:
+            ValueError: If the job has already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == JOB_QUEUED:
+                self._queue.remove(job)
+                self._finish(job, JOB_CANCELLED)
+                logger.info(f"Job {job_id} cancelled")
+            elif job.status == JOB_RUNNING:
+                job.cancel_event.set()
+                logger.info(f"Job {job_id} cancelling")
+            else:
+                raise ValueError(f"Job {job_id} is {job.status} and can't be cancelled")
+        self._wakeup.set()
+        return job
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the dispatcher is running, so queued jobs will be started."""
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    def stats(self) -> dict:
+        """Return worker and job counts, and whether jobs can run."""
+        with self._lock:
+            counts = collections.Counter(job.status for job in self._jobs.values())
+        return {
+            'healthy': self.healthy,
+            'dispatcher_error': self._dispatcher_error,
+            'pool_restarts': self._pool_restarts,
+            'workers': self.workers,
+            'mode': self.mode,
+            'queued': counts[JOB_QUEUED],
+            'running': counts[JOB_RUNNING],
+            'done': counts[JOB_DONE],
+            'failed': counts[JOB_FAILED],
+            'cancelled': counts[JOB_CANCELLED]
+        }
+
+    def _check_conflicts(self, input_path: Path, output_path: Path):
+        """
+        Refuse a job whose output is another active job's input, or the other way round (lock held).
+
+        Raises:
+            ValueError: If the job would overwrite a file a queued or running job reads or writes
+        """
+        for other in self._jobs.values():
+            if other.status not in (JOB_QUEUED, JOB_RUNNING):
+                continue
+            if output_path == Path(other.input_path).resolve():
+                raise ValueError(f"Output would overwrite the input of job {other.id}")
+            if output_path == Path(other.output_path).resolve():
+                raise ValueError(f"Output is already being written by job {other.id}")
+            if input_path == Path(other.output_path).resolve():
+                raise ValueError(f"Input is the output of job {other.id}, which hasn't finished")
+
+    def _resolve_values(self, request: dict) -> dict:
+        """
+        Combine defaults, the optional preset and the request's own values.
+
+        Raises:
+            ValueError: If the preset doesn't exist or a value is invalid
+        """
+        values = dict(DEFAULT_VALUES)
+        preset_name = request.get('preset')
+        if preset_name:
+            if self.presets_model is None:
+                # Imported lazily: only needed (with platformdirs) when a preset is used
+                from src.presets_model import open_presets_model
+                self.presets_model = open_presets_model()
+            preset = self.presets_model.get_preset(preset_name)
+            if preset is None:
+                raise ValueError(f"Preset not found: {preset_name}")
+            values.update(preset)
+
+        if any(request.get(key) is not None for key in ('x', 'y', 'z', 'rotation', 'rotate_first')):
+            # Explicit values replace a preset's operation chain
+            values.pop('operations', None)
+        if request.get('operations') is not None:
+            values['operations'] = request['operations']
+
+        for key in ('x', 'y', 'z', 'rotation'):
+            if request.get(key) is not None:
+                try:
+                    values[key] = float(request[key])
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid number for {key}: {request[key]!r}")
+        if request.get('rotate_first') is not None:
+            values['rotate_first'] = bool(request['rotate_first'])
+        if request.get('strategy') is not None:
+            values['strategy'] = request['strategy']
+        if values['strategy'] not in TRANSFORM_STRATEGIES:
+            raise ValueError(f"Unknown strategy: {values['strategy']}")
+        return values
+
+    def _start_pool(self):
+        """Create the worker pool; process workers are started (and warmed up) straight away."""
+        if self.mode == MODE_THREAD:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+            return
+
+        # Fresh queues each time: a killed worker may have left the old ones' locks held
+        context = multiprocessing.get_context('spawn')
+        self._progress_queue = context.Queue()
+        self._starts_queue = context.Queue()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_service_worker,
+            initargs=(logging.getLogger().level, self._progress_queue, self.model, self._starts_queue)
+        )
+        # Each submission starts a worker while none is idle, so this
+        # launches (and warms up) the whole pool now
+        for _ in range(self.workers):
+            self._executor.submit(os.getpid)
+
+    def _restart_pool(self, jobs):
+        """
+        Settle the jobs of a pool a worker process died in, and replace the pool.
+
+        ProcessPoolExecutor can't be used once one of its processes has
+        died, and it terminates the others. Cancelled jobs are reported as
+        cancelled, the job whose worker died fails, and jobs whose worker
+        the pool terminated (or that hadn't started) are queued again.
+        """
+        logger.warning("A worker process died; restarting the worker pool")
+        self._drain_starts()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for pool_queue in (self._progress_queue, self._starts_queue):
+            pool_queue.close()
+
+        requeued = []
+        for job in jobs:
+            remove_partial_outputs(job.output_path)
+            self.scheduler.release(job.input_path)
+            self.scheduler.forget(job.input_path)
+            process = self._job_workers.pop(job.id, None)
+            if process is not None:
+                process.join(TERMINATE_TIMEOUT)
+            with self._lock:
+                if job.cancel_event.is_set():
+                    self._finish(job, JOB_CANCELLED)
+                    logger.info(f"Job {job.id} cancelled")
+                elif process is None or process.exitcode == -signal.SIGTERM:
+                    job.status = JOB_QUEUED
+                    job.started = job.stage = job.fraction = None
+                    requeued.append(job)
+                else:
+                    job.error = (f"Worker process died with exit code {process.exitcode} "
+                                 f"(it crashed or was killed, e.g. for running out of memory)")
+                    self._finish(job, JOB_FAILED)
+                    logger.error(f"Job {job.id} failed: {job.error}")
+        with self._lock:
+            self._queue.extendleft(reversed(requeued))
+        if requeued:
+            logger.info(f"Requeued {len(requeued)} jobs stopped with the worker pool")
+
+        self._pool_restarts += 1
+        self._start_pool()
+
+    def _cancel_running(self, in_flight: dict):
+        """Stop running jobs whose cancellation was requested."""
+        for future, job in list(in_flight.items()):
+            if not job.cancel_event.is_set():
+                continue
+            if future.cancel():
+                # Hadn't reached a worker
+                del in_flight[future]
+                self.scheduler.release(job.input_path)
+                self.scheduler.forget(job.input_path)
+                with self._lock:
+                    self._finish(job, JOB_CANCELLED)
+                logger.info(f"Job {job.id} cancelled")
+                continue
+
+            # Thread workers stop themselves; a process worker is killed
+            # once it has announced itself, which breaks the pool
+            process = self._job_workers.get(job.id)
+            if process is not None and process.is_alive():
+                process.kill()
+
+    def _dispatch(self):
+        """Run the dispatch loop, recording why it stopped if it fails (dispatcher thread)."""
+        try:
+            self._dispatch_loop()
+        except Exception as e:
+            # Reported by /health; jobs are no longer started
+            self._dispatcher_error = f"{type(e).__name__}: {e}"
+            logger.exception("Job dispatcher stopped")
+
+    def _dispatch_loop(self):
+        """Feed queued jobs to the pool and collect their results."""
+        in_flight = {}
+        progress = self._record_progress if self.mode == MODE_THREAD else None
+
+        while not (self._stopping.is_set() and not in_flight):
+            self._wakeup.clear()
+            broken = False
+            with self._lock:
+                while (
+                    self._queue
+                    and len(in_flight) < self.workers
+                    and self.scheduler.try_admit(self._queue[0].input_path)
+                ):
+                    job = self._queue[0]
+                    try:
+                        if self.mode == MODE_PROCESS:
+                            future = self._executor.submit(
+                                run_job, self.model, job.id, job.input_path, job.output_path,
+                                job.transform_kwargs
+                            )
+                        else:
+                            future = self._executor.submit(
+                                transform_one, self.model, job.input_path, job.output_path,
+                                job.transform_kwargs, progress, job.id, stop_event=job.cancel_event
+                            )
+                    except BrokenProcessPool:
+                        # The job stays queued for the new pool
+                        self.scheduler.release(job.input_path)
+                        broken = True
+                        break
+                    self._queue.popleft()
+                    job.status = JOB_RUNNING
+                    job.started = time.time()
+                    in_flight[future] = job
+
+            if broken:
+                self._restart_pool(list(in_flight.values()))
+                in_flight.clear()
+                continue
+
+            if not in_flight:
+                self._wakeup.wait(POLL_INTERVAL)
+                continue
+
+            done, _ = concurrent.futures.wait(
+                in_flight,
+                timeout=POLL_INTERVAL,
+                return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            self._drain_progress()
+            self._drain_starts()
+            self._cancel_running(in_flight)
+
+            for future in done:
+                if future not in in_flight:
+                    # Settled with the pool below, or cancelled above
+                    continue
+                job = in_flight.pop(future)
+                try:
+                    result = future.result()
+                    self.scheduler.release(
+                        job.input_path, result.memory_bytes if self.mode == MODE_PROCESS else None
+                    )
+                    self.scheduler.forget(job.input_path)
+                    with self._lock:
+                        job.result = result.to_dict()
+                        self._finish(job, JOB_DONE)
+                    logger.info(f"Job {job.id} done: {result.summary()}")
+                except BrokenProcessPool:
+                    self._restart_pool([job, *in_flight.values()])
+                    in_flight.clear()
+                except TransformCancelled:
+                    # A thread worker stopped at its cancellation check
+                    self.scheduler.release(job.input_path)
+                    self.scheduler.forget(job.input_path)
+                    with self._lock:
+                        self._finish(job, JOB_CANCELLED)
+                    logger.info(f"Job {job.id} cancelled")
+                except Exception as e:
+                    self.scheduler.release(job.input_path)
+                    self.scheduler.forget(job.input_path)
+                    with self._lock:
+                        job.error = str(e)
+                        self._finish(job, JOB_FAILED)
+                    logger.error(f"Job {job.id} failed: {e}")
+
+    def _record_progress(self, item: tuple):
+        """Update a running job's stage and fraction from a (job id, stage, fraction) report."""
+        job_id, stage, fraction = item
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == JOB_RUNNING:
+                job.stage = stage
+                if fraction is not None:
+                    job.fraction = round(fraction, 3)
+
+    def _drain_progress(self):
+        """Handle the progress reports process workers have queued."""
+        if self._progress_queue is None:
+            return
+        while True:
+            try:
+                item = self._progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._record_progress(item)
+
+    def _drain_starts(self):
+        """Record which worker process each newly started job runs in."""
+        if self._starts_queue is None:
+            return
+        while True:
+            try:
+                job_id, pid = self._starts_queue.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != JOB_RUNNING:
+                    continue
+            # ProcessPoolExecutor has no public way to reach its processes
+            process = self._executor._processes.get(pid)
+            if process is not None:
+                self._job_workers[job_id] = process
+
+    def _finish(self, job: Job, status: str):
+        """Mark a job finished and forget the oldest finished jobs (lock held)."""
+        job.status = status
+        job.finished = time.time()
+        self._job_workers.pop(job.id, None)
+        if status == JOB_DONE:
+            job.fraction = 1.0
+        self._finished.append(job.id)
+        while len(self._finished) > MAX_FINISHED_JOBS:
+            self._jobs.pop(self._finished.popleft(), None)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Maps the HTTP API onto a TransformService (set on the server)."""
+
+    server_version = "IFCTranslateService/1"
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts = self._path_parts()
+        if parts == ['health']:
+            stats = self.server.service.stats()
+            self._send(200 if stats['healthy'] else 503, stats)
+        elif parts == ['jobs']:
+            self._send(200, {'jobs': [job.to_dict() for job in self.server.service.list_jobs()]})
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self.server.service.get(parts[1])
+            if job is None:
+                self._send(404, {'error': f"Unknown job: {parts[1]}"})
+            else:
+                self._send(200, job.to_dict())
+        else:
+            self._send(404, {'error': "Not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self._path_parts() != ['jobs']:
+            self._send(404, {'error': "Not found"})
+            return
+        if self.headers.get_content_type() != 'application/json':
+            self._send(415, {'error': "Jobs must be submitted as application/json"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_REQUEST_BYTES:
+                raise ValueError("Request body too large")
+            request = json.loads(self.rfile.read(length) or b'null')
+            job = self.server.service.submit(request)
+        except (ValueError, UnicodeDecodeError) as e:
+            # json.JSONDecodeError is a ValueError
+            self._send(400, {'error': str(e)})
+            return
+
+        self._send(202, job.to_dict(), location=f"/jobs/{job.id}")
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self._send(404, {'error': "Not found"})
+            return
+
+        try:
+            job = self.server.service.cancel(parts[1])
+        except ValueError as e:
+            self._send(409, {'error': str(e)})
+            return
+
+        if job is None:
+            self._send(404, {'error': f"Unknown job: {parts[1]}"})
+        else:
+            self._send(200, job.to_dict())
+
+    def log_message(self, format, *args):
+        # Route request logging through the logging module instead of stderr
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _authorized(self) -> bool:
+        """Check the Host header and token, sending an error response if they are wrong."""
+        host = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        if host not in self.server.allowed_hosts:
+            self._send(403, {'error': "Host not allowed"})
+            return False
+
+        token = self.server.token
+        if token is not None:
+            supplied = self.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+                self._send(401, {'error': "Missing or wrong token"})
+                return False
+        return True
+
+    def _path_parts(self) -> list[str]:
+        """Return the request path's segments, e.g. ['jobs', 'abc123']."""
+        return [part for part in urlsplit(self.path).path.split('/') if part]
+
+    def _send(self, status: int, body: dict, location: str | None = None):
+        """Send a JSON response."""
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if location is not None:
+            self.send_header('Location', location)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def create_server(
+    service: TransformService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    token: str | None = None
+) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server for a service (call serve_forever() to run it).
+
+    Args:
+        service: Started TransformService
+        host: Interface to listen on (also accepted in Host headers)
+        port: TCP port (0 picks a free port)
+        token: If set, requests must carry "Authorization: Bearer <token>"
+
+    Returns:
+        ThreadingHTTPServer handling each request in its own thread
+    """
+    server = ThreadingHTTPServer((host, port), _RequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.allowed_hosts = {*LOCAL_HOSTS, host.lower()}
+    server.token = token or None
+    return server
+
+
+def main(argv=None) -> int:
+    """Service entry point. Returns the process exit code."""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.service',
+        description="Serve IFC transform jobs over a local HTTP API."
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port (default: %(default)s)")
+    parser.add_argument('--workers', type=int, help="Number of workers (default: CPU cores)")
+    parser.add_argument('--mode', choices=SERVICE_MODES, default=MODE_PROCESS,
+                        help="Worker type (default: process)")
+    parser.add_argument('--memory-limit', type=float, metavar='GB',
+                        help="RAM budget for all workers (default: 75%% of physical memory)")
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f"Shared token clients must send as 'Authorization: Bearer TOKEN' "
+                             f"(default: the {TOKEN_ENV} environment variable; prefer it, since "
+                             f"command lines are visible to other users)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only log warnings and errors")
+    args = parser.parse_args(argv)
+
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        service = TransformService(
+            workers=args.workers,
+            mode=args.mode,
+            scheduler=MemoryScheduler(
+                budget_bytes=int(args.memory_limit * 1024 ** 3) if args.memory_limit else None
+            )
+        )
+        server = create_server(service, args.host, args.port, args.token)
+    except (ValueError, OSError) as e:
+        logger.error(f"Cannot start service: {e}")
+        return 2
+
+    service.start()
+    # Service managers stop daemons with SIGTERM
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    logger.info(f"Listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
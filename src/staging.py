@@ -0,0 +1,258 @@
+"""
+Staged Batch I/O
+
+This module provides the StagingPipeline class that lets a BatchRunner
+overlap file I/O with transformation when inputs and outputs live on slow
+storage such as a network share. A reader thread copies the next inputs
+into a local staging directory while the workers are busy, workers read
+those copies and write their outputs to the staging directory, and a
+writer thread publishes each finished output to the output directory
+(under a temporary name, renamed into place) while the workers move on to
+the next file. Both queues are bounded: at most `depth` inputs are read
+ahead and at most `depth` outputs wait to be published, after which the
+runner stops admitting files, so memory stays that of the workers and the
+staging directory never holds more than a few files.
+"""
+
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.model import TransformCancelled
+from src.utils.fileio import atomic_output
+
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied between cancellation checks
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Read-ahead states of a staged input
+_COPYING = 'copying'
+_READY = 'ready'
+_CLAIMED = 'claimed'
+
+
+class StagingPipeline:
+    """
+    Reads batch inputs ahead and publishes outputs on background I/O threads.
+
+    The runner calls read_ahead with the files it will run next, takes each
+    file's input path from claim_input and its output path from
+    output_path, then hands the finished output to publish; completed
+    publishes are collected with take_published. close must be called
+    when the batch ends.
+    """
+
+    def __init__(self, directory=None, depth: int = 2):
+        """
+        Create a private staging directory and start the I/O threads.
+
+        Args:
+            directory: Fast local directory to stage files in (default:
+                       the system temporary directory)
+            depth: Inputs read ahead, and outputs queued for publishing,
+                   at most
+
+        Raises:
+            OSError: If the staging directory cannot be created
+        """
+        self.depth = depth
+        self.root = Path(tempfile.mkdtemp(prefix='ifc-staging-', dir=directory))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._published_event = threading.Event()
+        self._counter = 0
+        # input path -> [state, staged path]
+        self._inputs = {}
+        self._reads = queue.Queue()
+        self._writes = queue.Queue()
+        self._unpublished = 0
+        self._published = []
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._reader.start()
+        self._writer.start()
+        logger.info(f"Staging batch I/O in {self.root}")
+
+    def read_ahead(self, files):
+        """
+        Start copying the next files to run into the staging directory.
+
+        Files already staged or being copied are skipped; no more than
+        depth unclaimed copies exist at once.
+
+        Args:
+            files: Input Paths in the order they will run
+        """
+        with self._lock:
+            waiting = sum(state != _CLAIMED for state, _ in self._inputs.values())
+            for input_file in files:
+                if waiting >= self.depth:
+                    break
+                if input_file in self._inputs:
+                    continue
+                staged = self._staged_path('in', input_file)
+                self._inputs[input_file] = [_COPYING, staged]
+                self._reads.put((input_file, staged))
+                waiting += 1
+
+    def claim_input(self, input_file) -> Path:
+        """
+        Return the path a worker should read an input from.
+
+        The staged copy is used if it is complete; otherwise the original
+        is read (and a copy still in progress is discarded when done).
+        """
+        with self._lock:
+            entry = self._inputs.get(input_file)
+            if entry is None:
+                self._inputs[input_file] = [_CLAIMED, None]
+                return input_file
+            state, staged = entry
+            if state == _READY and staged is not None:
+                entry[0] = _CLAIMED
+                return staged
+            entry[:] = [_CLAIMED, None]
+            return input_file
+
+    def release_input(self, input_file):
+        """Delete an input's staged copy once its worker has finished with it."""
+        with self._lock:
+            entry = self._inputs.pop(input_file, None)
+        if entry is not None and entry[1] is not None:
+            entry[1].unlink(missing_ok=True)
+
+    def output_path(self, output_path) -> Path:
+        """Return the staging path a worker should write an output to."""
+        with self._lock:
+            return self._staged_path('out', Path(output_path))
+
+    @property
+    def unpublished(self) -> int:
+        """Number of outputs handed to publish that are not yet in place."""
+        with self._lock:
+            return self._unpublished
+
+    def has_room(self) -> bool:
+        """Whether fewer than depth outputs are waiting to be published."""
+        return self.unpublished < self.depth
+
+    def publish(self, key, staged_output, output_path):
+        """
+        Queue a finished output to be moved into the output directory.
+
+        Args:
+            key: Identifies the file in take_published (e.g. its input Path)
+            staged_output: Path returned by output_path, now written
+            output_path: Final output path
+        """
+        with self._lock:
+            self._unpublished += 1
+        self._writes.put((key, Path(staged_output), Path(output_path)))
+
+    def take_published(self) -> list[tuple]:
+        """
+        Return and clear the outputs published since the last call.
+
+        Returns:
+            (key, seconds, error) per output; error is None on success
+        """
+        with self._lock:
+            published, self._published = self._published, []
+            self._published_event.clear()
+        return published
+
+    def wait(self, timeout: float):
+        """Wait up to timeout seconds for an output to be published."""
+        self._published_event.wait(timeout)
+
+    def close(self, cancel: bool = False):
+        """
+        Stop the I/O threads and delete the staging directory.
+
+        Args:
+            cancel: If True, abandon queued outputs and interrupt the
+                    current copy instead of publishing everything first
+        """
+        if cancel:
+            self._stop_event.set()
+        self._reads.put(None)
+        self._writes.put(None)
+        self._writer.join()
+        self._stop_event.set()
+        self._reader.join()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _staged_path(self, kind: str, path: Path) -> Path:
+        """Return a unique staging path keeping the file's name (call with the lock held)."""
+        self._counter += 1
+        return self.root / f"{kind}-{self._counter}-{path.name}"
+
+    def _read_loop(self):
+        """Copy requested inputs into the staging directory (reader thread)."""
+        while (item := self._reads.get()) is not None:
+            input_file, staged = item
+            if self._stop_event.is_set():
+                continue
+            try:
+                _copy(input_file, staged, self._stop_event)
+            except (OSError, TransformCancelled) as e:
+                # The worker reads the original instead
+                logger.warning(f"Could not stage {input_file}: {e}")
+                staged.unlink(missing_ok=True)
+                staged = None
+
+            with self._lock:
+                entry = self._inputs.get(input_file)
+                waiting = entry is not None and entry[0] == _COPYING
+                if waiting:
+                    entry[:] = [_READY, staged]
+            if not waiting and staged is not None:
+                # Claimed (or released) while copying
+                staged.unlink(missing_ok=True)
+
+    def _write_loop(self):
+        """Move finished outputs into the output directory (writer thread)."""
+        while (item := self._writes.get()) is not None:
+            key, staged_output, output_path = item
+            start = time.perf_counter()
+            error = None
+            try:
+                if self._stop_event.is_set():
+                    raise TransformCancelled("Cancelled before the output was published")
+                with atomic_output(output_path) as temp_path:
+                    if os.stat(staged_output).st_dev == os.stat(output_path.parent).st_dev:
+                        os.replace(staged_output, temp_path)
+                    else:
+                        _copy(staged_output, temp_path, self._stop_event)
+            except (OSError, TransformCancelled) as e:
+                error = e
+            finally:
+                staged_output.unlink(missing_ok=True)
+
+            with self._lock:
+                self._unpublished -= 1
+                self._published.append((key, time.perf_counter() - start, error))
+            self._published_event.set()
+
+
+def _copy(source: Path, target: Path, stop_event):
+    """
+    Copy a file in chunks, checking stop_event between them.
+
+    Raises:
+        OSError: If either file cannot be read or written
+        TransformCancelled: If stop_event was set before the copy finished
+    """
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        while chunk := src.read(COPY_CHUNK_BYTES):
+            if stop_event.is_set():
+                raise TransformCancelled(f"Cancelled while copying {source.name}")
+            dst.write(chunk)
@@ -0,0 +1,184 @@
+"""
+File I/O utilities.
+
+Provides atomic JSON writing (shared by presets, the batch manifest and
+other state files), atomic output file writing (and clean-up of what a
+killed writer left behind), cheap copies of finished outputs and streamed
+content hashing of input files.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Read size for hashing (large reads let hashlib release the GIL)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# ioctl request cloning a whole file copy-on-write (FICLONE in linux/fs.h)
+FICLONE = 0x40049409
+
+
+def atomic_write_json(filepath: Path, data: dict):
+    """
+    Write JSON file atomically to prevent corruption.
+
+    Uses temp file + rename pattern (atomic on POSIX). Writes to
+    .tmp file first, then uses Path.replace() for atomic rename.
+
+    Args:
+        filepath: Target file path
+        data: Dictionary to serialize as JSON
+    """
+    filepath = Path(filepath)
+    temp_file = filepath.with_suffix('.tmp')
+
+    try:
+        # Write to temp file with UTF-8 encoding
+        with temp_file.open('w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        # Atomic rename (POSIX guarantee)
+        temp_file.replace(filepath)
+
+    except Exception:
+        # Clean up temp file if write failed
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+
+
+@contextmanager
+def atomic_output(filepath):
+    """
+    Write a file under a temporary name and rename it into place on success.
+
+    The temporary file is hidden (dot-prefixed) in the target's directory
+    and keeps its extension, so writers that pick a format from the
+    extension still work. Readers watching the directory never see a
+    partially written target; if the block raises, the temporary file is
+    removed and any existing target is left untouched.
+
+    Args:
+        filepath: Target file path
+
+    Yields:
+        Path to write the file to
+    """
+    temp_file = partial_output_path(filepath)
+
+    try:
+        yield temp_file
+        temp_file.replace(filepath)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
+
+
+def partial_output_path(filepath) -> Path:
+    """
+    Return a new temporary path for writing a target (as used by atomic_output).
+
+    The name is hidden (dot-prefixed), unique, and keeps the target's
+    extension; remove_partial_outputs finds it from the target path.
+    """
+    filepath = Path(filepath)
+    return filepath.with_name(f".{filepath.stem}.{uuid.uuid4().hex[:8]}.partial{filepath.suffix}")
+
+
+def remove_partial_outputs(filepath) -> int:
+    """
+    Remove the temporary files atomic_output left for a target.
+
+    A process killed while writing inside atomic_output can't remove its
+    temporary file (nor the temporary files ifcopenshell writes next to
+    it, such as '.name.1a2b3c4d.partial.ifc.123.tmp'); call this once the
+    writer is known to be dead.
+
+    Args:
+        filepath: Target file path passed to atomic_output
+
+    Returns:
+        Number of temporary files removed
+    """
+    filepath = Path(filepath)
+    pattern = f".{glob.escape(filepath.stem)}.*.partial{glob.escape(filepath.suffix)}*"
+    removed = 0
+    for temp_file in filepath.parent.glob(pattern):
+        try:
+            temp_file.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def link_or_copy(source, target) -> str:
+    """
+    Give target the contents of source as cheaply as the filesystem allows.
+
+    Tries a reflink (copy-on-write clone, e.g. on btrfs or XFS), then a
+    hard link, then a plain copy. target is replaced atomically (see
+    atomic_output). Hard links are safe for outputs because every writer
+    here replaces files by renaming rather than rewriting them in place.
+
+    Args:
+        source: Existing file
+        target: File to create or replace
+
+    Returns:
+        How target was made: 'reflink', 'hardlink' or 'copy'
+
+    Raises:
+        OSError: If source cannot be read or target cannot be written
+    """
+    with atomic_output(target) as temp_file:
+        if _reflink(source, temp_file):
+            return 'reflink'
+        try:
+            os.link(source, temp_file)
+            return 'hardlink'
+        except OSError:
+            # Other filesystem, or links unsupported (e.g. FAT, some shares)
+            pass
+        shutil.copyfile(source, temp_file)
+        return 'copy'
+
+
+def _reflink(source, target: Path) -> bool:
+    """Clone source to a new file at target; return False (creating nothing) if unsupported."""
+    if not sys.platform.startswith('linux'):
+        return False
+
+    import fcntl
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            pass
+    target.unlink()
+    return False
+
+
+def file_sha256(path) -> str:
+    """
+    Return the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path: Path to the file
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,123 @@
+"""
+Process and system memory utilities.
+
+Provides cross-platform helpers for reading the current process's resident
+and peak memory and the machine's physical memory, using the resource
+module and /proc on POSIX and the Win32 API on Windows. Each helper returns
+None when the value cannot be determined. On Linux the peak can be reset,
+so a long-lived worker can measure the peak of each file it processes.
+"""
+
+import os
+import re
+import sys
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    class _MemoryStatusEx(ctypes.Structure):
+        _fields_ = [
+            ('dwLength', wintypes.DWORD),
+            ('dwMemoryLoad', wintypes.DWORD),
+            ('ullTotalPhys', ctypes.c_ulonglong),
+            ('ullAvailPhys', ctypes.c_ulonglong),
+            ('ullTotalPageFile', ctypes.c_ulonglong),
+            ('ullAvailPageFile', ctypes.c_ulonglong),
+            ('ullTotalVirtual', ctypes.c_ulonglong),
+            ('ullAvailVirtual', ctypes.c_ulonglong),
+            ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+        ]
+
+    def _process_memory_counters():
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(
+            handle, ctypes.byref(counters), counters.cb
+        ):
+            return None
+        return counters
+else:
+    import resource
+
+
+def current_rss_bytes() -> int | None:
+    """Return the current resident set size of this process in bytes."""
+    if sys.platform == 'win32':
+        counters = _process_memory_counters()
+        return counters.WorkingSetSize if counters else None
+
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of this process (since the last reset) in bytes."""
+    if sys.platform == 'win32':
+        counters = _process_memory_counters()
+        return counters.PeakWorkingSetSize if counters else None
+
+    # VmHWM follows reset_peak_rss; ru_maxrss never goes down
+    try:
+        with open('/proc/self/status', 'rb') as f:
+            match = re.search(rb'^VmHWM:\s+(\d+) kB', f.read(), re.MULTILINE)
+        if match:
+            return int(match.group(1)) * 1024
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's peak resident set size to its current size.
+
+    Only possible on Linux (through /proc/self/clear_refs).
+
+    Returns:
+        True if the peak was reset
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'wb') as f:
+            f.write(b'5')
+        return True
+    except OSError:
+        return False
+
+
+def total_memory_bytes() -> int | None:
+    """Return the machine's total physical memory in bytes."""
+    if sys.platform == 'win32':
+        status = _MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(status)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+        return status.ullTotalPhys
+
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,234 @@
+"""
+Timing utilities.
+
+Provides the StartupTimer class that records how long application startup
+phases take (module imports, first window paint, IFC library loading) and
+appends each run's measurements to a JSON Lines history file so startup
+regressions are visible across releases, the StageTimer class that
+records wall time and peak memory of each stage of a file transformation,
+and the ThroughputTracker class that turns a batch's byte counts into
+MB/s and an ETA weighted by file size.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from src.utils.resources import current_rss_bytes, peak_rss_bytes, reset_peak_rss
+
+
+logger = logging.getLogger(__name__)
+
+# History file name (stored in the user data directory)
+STARTUP_LOG_NAME = "startup_times.jsonl"
+
+# Seconds between RSS samples where the peak can't be reset
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+class StartupTimer:
+    """Collects startup phase latencies relative to a start time."""
+
+    def __init__(self, start: float):
+        """
+        Initialize timer.
+
+        Args:
+            start: time.perf_counter() value taken as early as possible
+        """
+        self.start = start
+        self.timings = {}
+
+    def mark(self, name: str):
+        """Record the time elapsed since start under the given name."""
+        self.timings[name] = round(time.perf_counter() - self.start, 4)
+
+    def record(self, name: str, seconds: float):
+        """Record an independently measured duration."""
+        self.timings[name] = round(seconds, 4)
+
+    def save(self, log_file: Path):
+        """
+        Log the timings and append them to a JSON Lines history file.
+
+        Failures to write the history are logged, never raised, so timing
+        can't break startup.
+
+        Args:
+            log_file: History file path
+        """
+        logger.info("Startup timings: " + ", ".join(
+            f"{name}={seconds:.3f}s" for name, seconds in self.timings.items()
+        ))
+
+        entry = {'timestamp': datetime.now().isoformat(timespec='seconds'), **self.timings}
+        try:
+            with Path(log_file).open('a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write startup timings: {e}")
+
+
+class StageTimer:
+    """
+    Measures wall time and memory of the consecutive stages of one operation.
+
+    The peak memory of the operation is measured on its own even in a
+    process that has handled larger files before: the process peak is
+    reset when the timer starts where the platform allows it (Linux), and
+    otherwise RSS is sampled every RSS_SAMPLE_INTERVAL in a background
+    thread until peak_increase is called. The peak_rss_bytes of each stage
+    is the process peak, since the reset if there was one.
+    """
+
+    def __init__(self, on_start=None):
+        """
+        Start timing and take the memory baseline.
+
+        Args:
+            on_start: Optional callback receiving each stage name as it starts
+        """
+        self.on_start = on_start
+        self.stages = {}
+        self._start = time.perf_counter()
+        self._peak_reset = reset_peak_rss()
+        self._rss_before = current_rss_bytes()
+        self._peak_before = peak_rss_bytes()
+        self._sampler = None
+        if not self._peak_reset and self._rss_before is not None:
+            self._sampler = _RssSampler(self._rss_before)
+
+    def __del__(self):
+        # Stop sampling if the operation failed before peak_increase was called
+        sampler = getattr(self, '_sampler', None)
+        if sampler is not None:
+            sampler.cancel()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager recording the duration and peak RSS of a stage."""
+        if self.on_start is not None:
+            self.on_start(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = {
+                'seconds': round(time.perf_counter() - start, 4),
+                'peak_rss_bytes': peak_rss_bytes()
+            }
+
+    def elapsed(self) -> float:
+        """Return seconds since the timer was created."""
+        return time.perf_counter() - self._start
+
+    def peak_increase(self) -> int | None:
+        """
+        Return how far memory rose above the starting RSS, and stop sampling.
+
+        None if unknown: no RSS could be read, or (without a reset peak or
+        samples) this operation did not set a new process high-water mark.
+        """
+        if self._sampler is not None:
+            peak_after = self._sampler.stop()
+        else:
+            peak_after = peak_rss_bytes()
+            if not self._peak_reset and None not in (self._peak_before, peak_after) and peak_after <= self._peak_before:
+                peak_after = None
+
+        if None in (self._rss_before, peak_after):
+            logger.info("Peak memory of this file could not be measured")
+            return None
+        return max(peak_after - self._rss_before, 0)
+
+
+class _RssSampler:
+    """Background thread recording the highest RSS seen until stopped."""
+
+    def __init__(self, rss: int):
+        """Start sampling, with rss as the highest value so far."""
+        self.peak = rss
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(RSS_SAMPLE_INTERVAL):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def cancel(self):
+        """Stop sampling without waiting for the thread."""
+        self._stopped.set()
+
+    def stop(self) -> int:
+        """Stop sampling (once) and return the highest RSS seen."""
+        if self._thread.is_alive():
+            self._stopped.set()
+            self._thread.join()
+            self._sample()
+        return self.peak
+
+
+class ThroughputTracker:
+    """
+    Byte-weighted progress, throughput and ETA of a batch.
+
+    Files are weighted by size, so one 2 GB file counts for as much as
+    four hundred 5 MB files. Files still running count with the fraction
+    reported for them so far. Safe to update from several threads.
+    """
+
+    def __init__(self):
+        """Start the clock with nothing to do."""
+        self.bytes_total = 0
+        self._bytes_finished = 0
+        self._partial = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, size: int):
+        """Add a file of the given size to the work to do."""
+        with self._lock:
+            self.bytes_total += size
+
+    def update(self, key, size: int, fraction: float):
+        """Record that a running file is a fraction of the way through."""
+        with self._lock:
+            self._partial[key] = size * min(max(fraction, 0.0), 1.0)
+
+    def finish(self, key, size: int):
+        """Record that a file has finished (successfully or not)."""
+        with self._lock:
+            self._partial.pop(key, None)
+            self._bytes_finished += size
+
+    def snapshot(self) -> dict:
+        """
+        Return the current progress.
+
+        Returns:
+            Dictionary with bytes_done, bytes_total, mb_per_s (MiB per
+            second since the tracker started) and eta_seconds (None until
+            a rate is known)
+        """
+        with self._lock:
+            done = self._bytes_finished + sum(self._partial.values())
+            total = self.bytes_total
+        elapsed = time.perf_counter() - self._start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = max(total - done, 0) / rate if rate > 0 else None
+        return {
+            'bytes_done': int(done),
+            'bytes_total': total,
+            'mb_per_s': round(rate / 1024 ** 2, 2),
+            'eta_seconds': round(eta, 1) if eta is not None else None
+        }
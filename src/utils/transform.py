@@ -0,0 +1,221 @@
+"""
+Transformation matrix utilities.
+
+Provides plain-Python 4x4 homogeneous matrix helpers used to build the
+placement transform applied by the transformation engines. Matrices are
+row-major lists of lists so they can be used without numpy.
+
+An operation chain is an ordered list of operation dictionaries, e.g.
+
+    [{"op": "rotate", "angle": 30, "pivot": [100, 50]},
+     {"op": "translate", "x": 250, "y": -40, "z": 2},
+     {"op": "rotate", "angle": -12}]
+
+Lengths are in metres and rotations are around the Z axis in degrees
+(about the origin unless a pivot [x, y] is given). compose_operations
+multiplies a chain into one matrix, and since every such chain is a
+rotation about Z followed by a translation, chain_parameters reduces it to
+the x, y, z and rotation_z of a single rotate-first transformation, which
+every transform strategy applies in one pass.
+"""
+
+import math
+
+
+# Operation chain step types
+OPERATION_TRANSLATE = 'translate'
+OPERATION_ROTATE = 'rotate'
+OPERATION_TYPES = (OPERATION_TRANSLATE, OPERATION_ROTATE)
+
+# Rotation angles (degrees) this close to zero are treated as no rotation
+ANGLE_EPSILON = 1e-12
+
+
+def identity_matrix() -> list[list[float]]:
+    """Return a 4x4 identity matrix."""
+    return [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+
+
+def translation_matrix(x: float, y: float, z: float) -> list[list[float]]:
+    """Return a 4x4 matrix translating by (x, y, z)."""
+    matrix = identity_matrix()
+    matrix[0][3] = float(x)
+    matrix[1][3] = float(y)
+    matrix[2][3] = float(z)
+    return matrix
+
+
+def rotation_z_matrix(degrees: float) -> list[list[float]]:
+    """
+    Return a 4x4 matrix rotating around the Z axis.
+
+    Args:
+        degrees: Rotation angle in decimal degrees (counter-clockwise
+                 when viewed from above)
+    """
+    angle = math.radians(degrees)
+    cos_a = math.cos(angle)
+    sin_a = math.sin(angle)
+    matrix = identity_matrix()
+    matrix[0][0] = cos_a
+    matrix[0][1] = -sin_a
+    matrix[1][0] = sin_a
+    matrix[1][1] = cos_a
+    return matrix
+
+
+def matmul(a: list[list[float]], b: list[list[float]]) -> list[list[float]]:
+    """Return the product a @ b of two 4x4 matrices."""
+    return [
+        [sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)]
+        for i in range(4)
+    ]
+
+
+def offset_matrix(
+    x: float,
+    y: float,
+    z: float,
+    should_rotate_first: bool,
+    rotation_z: float | None = None
+) -> list[list[float]]:
+    """
+    Build the matrix applied to root placements by OffsetObjectPlacements.
+
+    Offsets must already be in project units.
+
+    Args:
+        x: Translation offset in X direction
+        y: Translation offset in Y direction
+        z: Translation offset in Z direction
+        should_rotate_first: If True, rotate then translate; if False, translate then rotate
+        rotation_z: Optional rotation angle around Z axis in decimal degrees
+
+    Returns:
+        4x4 matrix to left-multiply onto each root placement matrix
+    """
+    translation = translation_matrix(x, y, z)
+    if rotation_z is None:
+        return translation
+
+    rotation = rotation_z_matrix(rotation_z)
+    if should_rotate_first:
+        return matmul(translation, rotation)
+    return matmul(rotation, translation)
+
+
+def axis2placement_matrix(
+    location: list[float],
+    axis: list[float] | None = None,
+    ref_direction: list[float] | None = None
+) -> list[list[float]]:
+    """
+    Build the matrix of an IfcAxis2Placement3D (or IfcAxis2Placement2D).
+
+    Mirrors ifcopenshell.util.placement.get_axis2placement so results
+    match the IfcPatch path exactly.
+
+    Args:
+        location: Location coordinates (2D locations get z=0)
+        axis: Z axis direction, defaults to (0, 0, 1)
+        ref_direction: X axis direction, defaults to (1, 0, 0) (2D
+                       directions get z=0, as for IfcAxis2Placement2D)
+
+    Returns:
+        4x4 placement matrix
+    """
+    z_axis = list(axis) if axis else [0.0, 0.0, 1.0]
+    x_axis = list(ref_direction) + [0.0] * (3 - len(ref_direction)) if ref_direction else [1.0, 0.0, 0.0]
+    origin = list(location) + [0.0] * (3 - len(location))
+    y_axis = [
+        z_axis[1] * x_axis[2] - z_axis[2] * x_axis[1],
+        z_axis[2] * x_axis[0] - z_axis[0] * x_axis[2],
+        z_axis[0] * x_axis[1] - z_axis[1] * x_axis[0],
+    ]
+    return [
+        [x_axis[0], y_axis[0], z_axis[0], origin[0]],
+        [x_axis[1], y_axis[1], z_axis[1], origin[1]],
+        [x_axis[2], y_axis[2], z_axis[2], origin[2]],
+        [0.0, 0.0, 0.0, 1.0],
+    ]
+
+
+def operation_matrix(operation: dict) -> list[list[float]]:
+    """
+    Return the matrix (in metres) of one operation chain step.
+
+    Args:
+        operation: {"op": "translate", "x", "y", "z"} (missing offsets are
+                   0) or {"op": "rotate", "angle", "pivot": [x, y]}
+                   (pivot optional)
+
+    Raises:
+        ValueError: If the operation is unknown or its values are not numbers
+    """
+    if not isinstance(operation, dict):
+        raise ValueError(f"Invalid operation (expected an object): {operation!r}")
+    kind = operation.get('op')
+
+    try:
+        if kind == OPERATION_TRANSLATE:
+            return translation_matrix(
+                float(operation.get('x', 0.0)),
+                float(operation.get('y', 0.0)),
+                float(operation.get('z', 0.0))
+            )
+        if kind == OPERATION_ROTATE:
+            rotation = rotation_z_matrix(float(operation['angle']))
+            pivot = operation.get('pivot')
+            if pivot is None:
+                return rotation
+            px, py = (float(value) for value in pivot)
+            return matmul(translation_matrix(px, py, 0.0), matmul(rotation, translation_matrix(-px, -py, 0.0)))
+    except KeyError as e:
+        raise ValueError(f"Operation '{kind}' is missing {e.args[0]!r}") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid values in operation: {operation!r}") from None
+
+    raise ValueError(f"Unknown operation '{kind}' (supported: {', '.join(OPERATION_TYPES)})")
+
+
+def compose_operations(operations: list[dict]) -> list[list[float]]:
+    """
+    Multiply an operation chain into a single matrix (in metres).
+
+    Args:
+        operations: Steps in the order they are applied
+
+    Returns:
+        4x4 matrix applying every step in order
+
+    Raises:
+        ValueError: If the chain is empty or a step is invalid
+    """
+    if not operations:
+        raise ValueError("Operation chain is empty")
+
+    matrix = identity_matrix()
+    for operation in operations:
+        # Later steps apply to the result of earlier ones
+        matrix = matmul(operation_matrix(operation), matrix)
+    return matrix
+
+
+def chain_parameters(operations: list[dict]) -> tuple[float, float, float, float | None]:
+    """
+    Reduce an operation chain to a single rotate-first transformation.
+
+    offset_matrix(x, y, z, True, rotation_z) equals compose_operations(operations)
+    (to rounding), so the chain can be applied in one pass by any strategy.
+
+    Returns:
+        (x, y, z, rotation_z): offsets in metres and the rotation in
+        degrees, None when the chain does not rotate
+
+    Raises:
+        ValueError: If the chain is empty or a step is invalid
+    """
+    matrix = compose_operations(operations)
+    angle = math.degrees(math.atan2(matrix[1][0], matrix[0][0]))
+    rotation_z = angle if abs(angle) > ANGLE_EPSILON else None
+    return matrix[0][3], matrix[1][3], matrix[2][3], rotation_z
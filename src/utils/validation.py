@@ -1,11 +1,21 @@
 """
 Validation utilities for file path and directory handling.
 
-Provides functions to validate input IFC files, output directories, and build output paths.
+Provides functions to validate input IFC files, output directories, discover
+IFC files in (nested) directories, and build output paths.
 """
 
+from fnmatch import fnmatch
 from pathlib import Path
+import logging
 import os
+import re
+
+
+logger = logging.getLogger(__name__)
+
+# Name prefixes of hidden and temporary files (skipped when searching directories)
+HIDDEN_PREFIXES = ('.', '~')
 
 
 def validate_input_file(file_path: str) -> Path:
@@ -104,38 +114,142 @@ def validate_input_directory(dir_path: str) -> Path:
     return path
 
 
-def find_ifc_files(directory_path: str) -> list[Path]:
+def validate_output_outside_input(input_dir, output_dir, recursive: bool = False):
+    """
+    Check that a batch's outputs can't be found again as inputs.
+
+    Args:
+        input_dir: Input directory searched for IFC files
+        output_dir: Output directory
+        recursive: Whether subdirectories of input_dir are searched
+
+    Raises:
+        ValueError: If output_dir is input_dir or, for a recursive search,
+                   is inside it
+    """
+    input_dir = Path(input_dir).resolve()
+    output_dir = Path(output_dir).resolve()
+    if output_dir == input_dir:
+        raise ValueError("Output directory must be different from the input directory")
+    if recursive and input_dir in output_dir.parents:
+        raise ValueError(
+            "Output directory must not be inside the input directory when searching subfolders"
+        )
+
+
+def matches_patterns(relative_path: str, patterns) -> bool:
+    """Return whether a relative path or its file name matches any glob pattern."""
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch(relative_path, p) or fnmatch(name, p) for p in patterns)
+
+
+def iter_ifc_files(
+    directory_path: str | Path,
+    recursive: bool = False,
+    include=None,
+    exclude=None
+):
+    """
+    Yield IFC files in a directory as they are found (case-insensitive).
+
+    Uses a single os.scandir pass per directory without stat calls, so
+    callers can start work on the first files while a large tree is still
+    being scanned. Entries are yielded in name order within each directory,
+    files before subdirectories. Unreadable subdirectories are logged and
+    skipped. Hidden and temporary entries (names starting with '.' or '~',
+    such as the '.name.1a2b3c4d.partial.ifc' files of outputs being
+    written) are skipped, and symbolic links to directories are not
+    followed, so a link back up the tree can't make the scan loop.
+
+    Patterns are shell-style globs matched against the path relative to
+    directory_path (with '/' separators) and against the bare name, e.g.
+    'Structural/*' or '*_old.ifc'.
+
+    Args:
+        directory_path: Path to the directory to search
+        recursive: If True, also search subdirectories
+        include: Optional patterns; only matching files are yielded
+        exclude: Optional patterns; matching files are skipped and matching
+                 subdirectories are not searched
+
+    Yields:
+        Path objects for .ifc files
+
+    Raises:
+        OSError: If directory_path itself cannot be read
+    """
+    root = Path(directory_path)
+    include = list(include or [])
+    exclude = list(exclude or [])
+    directories = [(root, '')]
+
+    while directories:
+        directory, prefix = directories.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            if directory == root:
+                raise
+            logger.warning(f"Skipping unreadable directory {directory}: {e}")
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative = prefix + entry.name
+            if entry.name.startswith(HIDDEN_PREFIXES) or (exclude and matches_patterns(relative, exclude)):
+                continue
+
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    subdirectories.append((Path(entry.path), relative + '/'))
+            elif (
+                entry.name.lower().endswith('.ifc')
+                and entry.is_file()
+                and (not include or matches_patterns(relative, include))
+            ):
+                yield Path(entry.path)
+
+        # Reversed so pop() visits subdirectories in name order
+        directories.extend(reversed(subdirectories))
+
+
+def find_ifc_files(
+    directory_path: str | Path,
+    recursive: bool = False,
+    include=None,
+    exclude=None
+) -> list[Path]:
     """
     Find all IFC files in a directory (case-insensitive).
 
     Args:
         directory_path: Path to the directory to search
+        recursive: If True, also search subdirectories
+        include: Optional glob patterns files must match (see iter_ifc_files)
+        exclude: Optional glob patterns for files and directories to skip
 
     Returns:
         Sorted list of Path objects for .ifc files found in the directory.
         Returns empty list if no IFC files found.
     """
-    path = Path(directory_path)
-
-    # Find both .ifc and .IFC files (case-insensitive handling)
-    ifc_files_lower = list(path.glob('*.ifc'))
-    ifc_files_upper = list(path.glob('*.IFC'))
-
-    # Combine and filter to only actual files (not directories)
-    all_files = ifc_files_lower + ifc_files_upper
-    ifc_files = [f for f in all_files if f.is_file()]
-
     # Sort for consistent ordering across platforms
-    return sorted(ifc_files)
+    return sorted(iter_ifc_files(directory_path, recursive, include, exclude))
 
 
-def build_output_path(input_path: str | Path, output_dir: str | Path) -> Path:
+def build_output_path(
+    input_path: str | Path,
+    output_dir: str | Path,
+    input_root: str | Path | None = None
+) -> Path:
     """
     Build the output file path by preserving the original filename.
 
     Args:
         input_path: Path to the input file
         output_dir: Path to the output directory
+        input_root: Optional input directory the file was found under; its
+                    subdirectories are mirrored below output_dir
 
     Returns:
         Path object representing the full output file path
@@ -143,4 +257,46 @@ def build_output_path(input_path: str | Path, output_dir: str | Path) -> Path:
     input_path = Path(input_path)
     output_dir = Path(output_dir)
 
+    if input_root is not None:
+        return output_dir / input_path.relative_to(input_root)
     return output_dir / input_path.name
+
+
+def build_fanout_output_paths(
+    input_path: str | Path,
+    output_dir: str | Path,
+    preset_names: list[str]
+) -> list[Path]:
+    """
+    Build one output path per preset for a fan-out transformation.
+
+    Outputs are named '<stem>_<preset>.ifc', with the preset name reduced
+    to lowercase letters, digits and dashes; names that reduce to the same
+    text get a numeric suffix so every output is distinct.
+
+    Args:
+        input_path: Path to the input file
+        output_dir: Path to the output directory
+        preset_names: Preset names, in output order
+
+    Returns:
+        List of output paths, one per preset name
+
+    Example:
+        >>> build_fanout_output_paths("model.ifc", "out", ["Site grid", "MGA 56"])
+        [PosixPath('out/model_site-grid.ifc'), PosixPath('out/model_mga-56.ifc')]
+    """
+    input_path = Path(input_path)
+    output_dir = Path(output_dir)
+
+    paths = []
+    used = set()
+    for name in preset_names:
+        slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'preset'
+        candidate, counter = slug, 1
+        while candidate in used:
+            counter += 1
+            candidate = f"{slug}-{counter}"
+        used.add(candidate)
+        paths.append(output_dir / f"{input_path.stem}_{candidate}{input_path.suffix}")
+    return paths
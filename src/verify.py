@@ -0,0 +1,584 @@
+"""
+Post-Transform Verification
+
+This module provides verify_transform, which checks that an output file
+really is its input moved by the requested transformation, and
+audit_outputs, which runs that check over a whole batch of existing
+outputs. Neither opens the files with ifcopenshell: each file is
+memory-mapped and scanned with regular expressions for its root
+IfcLocalPlacement records, their IfcAxis2Placement3D (or 2D) records, the
+points and directions those reference, the unit records and any
+IfcMapConversion, plus a systematic sample of up to SAMPLE_POINTS other
+IfcCartesianPoints.
+
+The placements are stacked into N x 4 x 4 NumPy arrays, so the expected
+output (the transform matrix times every input placement) is compared with
+the actual output in one vectorised pass. Root placements must match
+within the tolerance (in metres) and the sampled points must be unchanged,
+since every strategy leaves geometry alone. A root placement nothing in
+the input refers to may also be left as it was, as IfcPatch and the
+native strategy only move the roots products are placed by. For the georeference strategy
+the placements must be unchanged and the IfcMapConversion must carry the
+transformation instead.
+
+Entity names are matched in upper case, as every IFC exporter writes them.
+"""
+
+import concurrent.futures
+import logging
+import mmap
+import multiprocessing
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from src.batch import init_worker
+from src.fast_text import (
+    length_unit_scale,
+    parse_ref,
+    resolve_unit_scale,
+    split_arguments
+)
+from src.model import STRATEGY_GEOREFERENCE, STRATEGY_IFCPATCH
+from src.utils.transform import offset_matrix
+
+
+logger = logging.getLogger(__name__)
+
+# Allowed position error of root placements and sampled points, in metres
+DEFAULT_TOLERANCE = 1e-4
+
+# Allowed error of each (unit length) axis direction component
+DIRECTION_TOLERANCE = 1e-7
+
+# Most IfcCartesianPoints sampled per file to check geometry is untouched
+SAMPLE_POINTS = 10_000
+
+# Failures described in a result (the counts cover all of them)
+MAX_REPORTED_FAILURES = 20
+
+# Bytes scanned per regular expression call (chunks end at a record start)
+SCAN_CHUNK_BYTES = 16 * 1024 * 1024
+
+# Records needed for the placement structure: local placements (parent
+# and relative placement), IfcAxis2Placement3D and IfcAxis2Placement2D
+# (location, axis and ref direction ids, '' for $) and the unit, CRS and
+# map conversion records
+# with their raw arguments (quoted strings may contain ';')
+_STRUCTURE_RECORD = re.compile(
+    rb"#(\d+)\s*=\s*(?:"
+    rb"IFCLOCALPLACEMENT\s*\(\s*(\$|#\d+)\s*,\s*#(\d+)"
+    rb"|IFCAXIS2PLACEMENT3D\s*\(\s*#(\d+)\s*,\s*(?:\$|#(\d+))\s*,\s*(?:\$|#(\d+))"
+    rb"|IFCAXIS2PLACEMENT2D\s*\(\s*#(\d+)\s*,\s*(?:\$|#(\d+))"
+    rb"|(IFCPROJECTEDCRS|IFCPROJECT|IFCUNITASSIGNMENT|IFCSIUNIT|IFCCONVERSIONBASEDUNIT"
+    rb"|IFCMEASUREWITHUNIT|IFCMAPCONVERSION)\s*\(((?:[^;']|'(?:[^']|'')*')*)\)\s*;)"
+)
+
+# Point and direction records: id, name and the coordinate list body
+_COORDINATE_RECORD = re.compile(rb"#(\d+)\s*=\s*(IFCCARTESIANPOINT|IFCDIRECTION)\s*\(\s*\(([^)]*)\)")
+
+# IfcMapConversion arguments
+_EASTINGS, _NORTHINGS, _HEIGHT, _ABSCISSA, _ORDINATE, _SCALE = range(2, 8)
+
+
+@dataclass
+class VerificationResult:
+    """
+    Outcome of verifying one output file against its input.
+
+    Errors are the largest found, in metres for positions and as the
+    largest component difference for axis directions. failures describes
+    up to MAX_REPORTED_FAILURES problems; failed counts all of them.
+    """
+
+    input_path: str
+    output_path: str
+    strategy: str
+    tolerance: float
+    placements: int = 0  # Root placements compared
+    points: int = 0  # Sampled points compared
+    max_position_error: float = 0.0
+    max_direction_error: float = 0.0
+    max_point_error: float = 0.0
+    failed: int = 0
+    failures: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the output matches the expected transformation."""
+        return self.failed == 0
+
+    def fail(self, message: str):
+        """Record one failure."""
+        self.failed += 1
+        if len(self.failures) < MAX_REPORTED_FAILURES:
+            self.failures.append(message)
+
+    def to_dict(self) -> dict:
+        """Return the result as a JSON-serialisable dictionary."""
+        return dict(asdict(self), ok=self.ok)
+
+    def summary(self) -> str:
+        """Return a one-line summary, e.g. '812 placements, 10000 points; max error 0.000001 m'."""
+        text = (f"{self.placements} placements, {self.points} points; "
+                f"max error {max(self.max_position_error, self.max_point_error):.6f} m")
+        if not self.ok:
+            text += f"; {self.failed} failed, first: {self.failures[0]}"
+        return text
+
+
+class _FileStructure:
+    """The records of one file that verification needs, read from its text."""
+
+    def __init__(self, text):
+        """
+        Index the placement structure of a memory-mapped STEP file.
+
+        Args:
+            text: Bytes-like contents of the file
+        """
+        # local placement id -> relative placement id
+        self.roots = {}
+        # IfcAxis2Placement3D/2D id -> (location, axis, ref direction) id tokens
+        self.axes = {}
+        self.units = {}
+        self.map_conversions = {}
+        self.crs = {}
+
+        for chunk in _chunks(text):
+            for (entity_id, parent, relative, location, axis, ref_direction,
+                 location_2d, ref_direction_2d, name, args) in _STRUCTURE_RECORD.findall(chunk):
+                if relative:
+                    if parent == b'$':
+                        self.roots[int(entity_id)] = int(relative)
+                elif location:
+                    self.axes[int(entity_id)] = (location, axis, ref_direction)
+                elif location_2d:
+                    self.axes[int(entity_id)] = (location_2d, b'', ref_direction_2d)
+                elif name == b'IFCMAPCONVERSION':
+                    self.map_conversions[int(entity_id)] = split_arguments(args)
+                elif name == b'IFCPROJECTEDCRS':
+                    self.crs[int(entity_id)] = split_arguments(args)
+                else:
+                    self.units[int(entity_id)] = (name, split_arguments(args))
+
+    def component_tokens(self) -> set[bytes]:
+        """Return the ids (as digits) of the points and directions of the root placements."""
+        tokens = set()
+        for relative_id in self.roots.values():
+            tokens.update(self.axes.get(relative_id, ()))
+        tokens.discard(b'')
+        return tokens
+
+    def component_refs(self, placement_ids) -> np.ndarray:
+        """Return the (location, axis, ref direction) ids of root placements as an N x 3 array (-1 for $)."""
+        tokens = np.array(
+            [self.axes[self.roots[placement_id]] for placement_id in placement_ids], dtype=bytes
+        ).reshape(-1, 3)
+        tokens[tokens == b''] = b'-1'
+        return tokens.astype(np.int64)
+
+    def map_unit_scale(self, conversion: list[bytes], unit_scale: float) -> float:
+        """Return the size in metres of a map conversion's map unit (default: the project unit)."""
+        crs = self.crs.get(parse_ref(conversion[1]))
+        unit = self.units.get(parse_ref(crs[6])) if crs is not None and len(crs) > 6 else None
+        return length_unit_scale(unit, self.units) if unit is not None else unit_scale
+
+
+class _Coordinates:
+    """Coordinates of points and directions, looked up by entity id."""
+
+    def __init__(self, ids: np.ndarray, values: np.ndarray):
+        order = np.argsort(ids)
+        self.ids = ids[order]
+        self.values = values[order]
+
+    def lookup(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (N x 3 coordinates, found mask) for an array of ids; missing ids read as zero."""
+        if not len(self.ids):
+            return np.zeros((len(ids), 3)), np.zeros(len(ids), dtype=bool)
+        index = np.searchsorted(self.ids, ids).clip(max=len(self.ids) - 1)
+        found = self.ids[index] == ids
+        return np.where(found[:, None], self.values[index], 0.0), found
+
+
+def verify_transform(
+    input_path,
+    output_path,
+    x: float,
+    y: float,
+    z: float,
+    should_rotate_first: bool,
+    rotation_z: float | None = None,
+    strategy: str = STRATEGY_IFCPATCH,
+    tolerance: float = DEFAULT_TOLERANCE
+) -> VerificationResult:
+    """
+    Check that output_path is input_path transformed as requested.
+
+    Takes the same transformation arguments as
+    IFCTransformModel.transform_file (offsets in metres).
+
+    Args:
+        input_path: Original IFC file
+        output_path: Transformed IFC file
+        tolerance: Allowed position error in metres
+
+    Returns:
+        VerificationResult; ok is False if any check failed
+
+    Raises:
+        OSError: If either file cannot be read
+        ValueError: If unit records or coordinates are malformed
+    """
+    start = time.perf_counter()
+    result = VerificationResult(str(input_path), str(output_path), strategy, tolerance)
+
+    with _mapped(input_path) as source, _mapped(output_path) as target:
+        before = _FileStructure(source)
+        after = _FileStructure(target)
+        before_coordinates, sample = _read_coordinates(source, before.component_tokens(), SAMPLE_POINTS)
+        after_coordinates, _ = _read_coordinates(
+            target, after.component_tokens() | {b'%d' % point_id for point_id in sample}
+        )
+        unused = _unused_roots(source, before, after)
+
+    unit_scale = resolve_unit_scale(before.units)
+    if strategy == STRATEGY_GEOREFERENCE:
+        # Placements stay put; the map conversion carries the shift
+        matrix = np.identity(4)
+        _check_map_conversion(before, after, (x, y, z, should_rotate_first, rotation_z), unit_scale, result)
+    else:
+        matrix = np.array(offset_matrix(
+            x / unit_scale, y / unit_scale, z / unit_scale, should_rotate_first, rotation_z
+        ))
+
+    _check_placements(before, after, before_coordinates, after_coordinates, matrix, unit_scale, result, unused)
+    _check_points(sample, before_coordinates, after_coordinates, unit_scale, result)
+
+    result.seconds = round(time.perf_counter() - start, 4)
+    if result.ok:
+        logger.info(f"Verified {output_path}: {result.summary()} ({result.seconds:.2f}s)")
+    else:
+        logger.warning(f"Verification of {output_path} failed: {result.summary()}")
+    return result
+
+
+def audit_outputs(files, output_paths, transform_kwargs: dict, tolerance: float = DEFAULT_TOLERANCE,
+                  workers: int = 1):
+    """
+    Verify existing outputs against their inputs, several files at a time.
+
+    Args:
+        files: Input file paths
+        output_paths: Output file path for each input
+        transform_kwargs: transform_file keyword arguments the outputs were made with
+        tolerance: Allowed position error in metres
+        workers: Number of processes verifying files (scanning is CPU bound)
+
+    Yields:
+        (input_path, VerificationResult or the exception raised) in completion order
+    """
+    pairs = list(zip(files, output_paths))
+    if workers <= 1 or len(pairs) <= 1:
+        for input_path, output_path in pairs:
+            yield input_path, _verify_or_error(input_path, output_path, transform_kwargs, tolerance)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(pairs)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+        initargs=(logging.getLogger().level,)
+    ) as executor:
+        futures = {
+            executor.submit(_verify_or_error, input_path, output_path, transform_kwargs, tolerance): input_path
+            for input_path, output_path in pairs
+        }
+        for future in concurrent.futures.as_completed(futures):
+            yield futures[future], future.result()
+
+
+def _verify_or_error(input_path, output_path, transform_kwargs: dict, tolerance: float):
+    """Verify one file, returning the exception instead of raising it (audit worker)."""
+    try:
+        return verify_transform(input_path, output_path, tolerance=tolerance, **transform_kwargs)
+    except (OSError, ValueError) as e:
+        return e
+
+
+@contextmanager
+def _mapped(path):
+    """Memory-map a file read-only for the duration of a with block (empty files map to b'')."""
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            yield b''
+            return
+        with mapped:
+            yield mapped
+
+
+def _chunks(text):
+    """Yield consecutive pieces of about SCAN_CHUNK_BYTES of text, each ending before a record."""
+    start = 0
+    while start < len(text):
+        end = text.find(b'\n#', start + SCAN_CHUNK_BYTES)
+        end = len(text) if end < 0 else end + 1
+        yield text[start:end]
+        start = end
+
+
+def _read_coordinates(text, wanted: set[bytes], sample_size: int = 0) -> tuple[_Coordinates, np.ndarray]:
+    """
+    Read the coordinates of the given points and directions, plus a point sample.
+
+    wanted holds entity ids as digits (b'123'), as they appear in the text.
+
+    The sample takes every stride-th other IfcCartesianPoint, doubling the
+    stride (and dropping every other sampled point) whenever the sample
+    grows past sample_size, so it spreads evenly over the whole file.
+
+    Returns:
+        (the coordinates, ids of the sampled points)
+    """
+    records = []
+    sample = []
+    stride = 1
+    candidates = 0
+
+    for chunk in _chunks(text):
+        found = _COORDINATE_RECORD.findall(chunk)
+        records.extend((entity_id, body) for entity_id, _, body in found if entity_id in wanted)
+        if not sample_size:
+            continue
+
+        others = [
+            (entity_id, body) for entity_id, name, body in found
+            if name == b'IFCCARTESIANPOINT' and entity_id not in wanted
+        ]
+        # Continue the stride across chunks: candidate indices stay multiples of it
+        sample.extend(others[-candidates % stride::stride])
+        candidates += len(others)
+        while len(sample) > sample_size:
+            sample = sample[::2]
+            stride *= 2
+
+    entity_ids, values = _parse_coordinates(records + sample)
+    return _Coordinates(entity_ids, values), entity_ids[len(records):]
+
+
+def _parse_coordinates(records: list[tuple[bytes, bytes]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse (id, coordinate list body) records into an id array and an N x 3 array.
+
+    All numbers are parsed in one NumPy call; 2D coordinates get z = 0.
+
+    Raises:
+        ValueError: If a coordinate is not a number
+    """
+    if not records:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+
+    entity_ids = np.fromstring(b' '.join(entity_id for entity_id, _ in records), dtype=np.int64, sep=' ')
+    counts = np.array([body.count(b',') + 1 for _, body in records])
+    try:
+        numbers = np.fromstring(b','.join(body for _, body in records), dtype=float, sep=',')
+    except ValueError:
+        numbers = None
+    if numbers is None or len(numbers) != counts.sum():
+        raise ValueError("Invalid IFC file: malformed point or direction coordinates")
+
+    rows = np.repeat(np.arange(len(records)), counts)
+    columns = np.arange(len(numbers)) - np.repeat(np.cumsum(counts) - counts, counts)
+    keep = columns < 3
+    values = np.zeros((len(records), 3))
+    values[rows[keep], columns[keep]] = numbers[keep]
+    return entity_ids, values
+
+
+def _placement_matrices(refs: np.ndarray, coordinates: _Coordinates) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build the 4x4 matrices of root placements as an N x 4 x 4 array.
+
+    Mirrors src.utils.transform.axis2placement_matrix: Z defaults to
+    (0, 0, 1), X to (1, 0, 0) and Y is Z x X.
+
+    Args:
+        refs: N x 3 (location, axis, ref direction) ids, -1 for $
+
+    Returns:
+        (matrices, mask of the placements whose points and directions were all found)
+    """
+    locations, has_location = coordinates.lookup(refs[:, 0])
+    z_axes, has_axis = coordinates.lookup(refs[:, 1])
+    x_axes, has_ref_direction = coordinates.lookup(refs[:, 2])
+    z_axes[refs[:, 1] < 0] = (0.0, 0.0, 1.0)
+    x_axes[refs[:, 2] < 0] = (1.0, 0.0, 0.0)
+
+    matrices = np.zeros((len(refs), 4, 4))
+    matrices[:, :3, 0] = x_axes
+    matrices[:, :3, 1] = np.cross(z_axes, x_axes)
+    matrices[:, :3, 2] = z_axes
+    matrices[:, :3, 3] = locations
+    matrices[:, 3, 3] = 1.0
+    complete = has_location & (has_axis | (refs[:, 1] < 0)) & (has_ref_direction | (refs[:, 2] < 0))
+    return matrices, complete
+
+
+def _fail_rows(result, rows: np.ndarray, describe):
+    """Record a failure per row, describing only the first MAX_REPORTED_FAILURES."""
+    for row in rows[:MAX_REPORTED_FAILURES]:
+        result.fail(describe(row))
+    result.failed += max(0, len(rows) - MAX_REPORTED_FAILURES)
+
+
+def _unused_roots(text, before, after) -> set[int]:
+    """
+    Return the root placements left unchanged in the output that nothing in the input refers to.
+
+    The input is only searched again if some root kept its relative
+    placement, which every strategy replaces for the roots it moves.
+    """
+    unchanged = [
+        placement_id for placement_id, relative in before.roots.items()
+        if after.roots.get(placement_id) == relative
+    ]
+    if not unchanged:
+        return set()
+
+    # References, not the records' own '#id=' definitions
+    reference = re.compile(rb"#(" + b"|".join(b"%d" % i for i in unchanged) + rb")(?!\d)(?!\s*=)")
+    referenced = set()
+    for chunk in _chunks(text):
+        referenced.update(int(placement_id) for placement_id in reference.findall(chunk))
+    return set(unchanged) - referenced
+
+
+def _check_placements(before, after, before_coordinates, after_coordinates, matrix, unit_scale, result,
+                      unused=frozenset()):
+    """
+    Compare every output root placement with the matrix applied to its input placement.
+
+    Roots in unused (see _unused_roots) are not compared.
+    """
+    for placement_id in sorted(before.roots.keys() - after.roots.keys()):
+        result.fail(f"Root placement #{placement_id} is missing from the output")
+    for placement_id in sorted(after.roots.keys() - before.roots.keys()):
+        result.fail(f"Output has a new root placement #{placement_id}")
+
+    ids = []
+    for placement_id in sorted((before.roots.keys() & after.roots.keys()) - unused):
+        for label, structure in (("Input", before), ("Output", after)):
+            if structure.roots[placement_id] not in structure.axes:
+                result.fail(f"{label} root placement #{placement_id} has no IfcAxis2Placement3D or 2D")
+                break
+        else:
+            ids.append(placement_id)
+    ids = np.array(ids, dtype=np.int64)
+
+    before_matrices, before_complete = _placement_matrices(before.component_refs(ids), before_coordinates)
+    after_matrices, after_complete = _placement_matrices(after.component_refs(ids), after_coordinates)
+    incomplete = np.flatnonzero(~(before_complete & after_complete))
+    _fail_rows(result, incomplete,
+               lambda row: f"Root placement #{ids[row]} references a missing point or direction")
+
+    complete = before_complete & after_complete
+    ids = ids[complete]
+    result.placements = len(ids)
+    if not len(ids):
+        return
+
+    expected = matrix @ before_matrices[complete]
+    actual = after_matrices[complete]
+    position_errors = np.linalg.norm(expected[:, :3, 3] - actual[:, :3, 3], axis=1) * unit_scale
+    direction_errors = np.abs(expected[:, :3, :3] - actual[:, :3, :3]).max(axis=(1, 2))
+    result.max_position_error = float(position_errors.max())
+    result.max_direction_error = float(direction_errors.max())
+
+    bad = np.flatnonzero((position_errors > result.tolerance) | (direction_errors > DIRECTION_TOLERANCE))
+    _fail_rows(result, bad, lambda row: f"Root placement #{ids[row]} is off by {position_errors[row]:.6f} m "
+                                        f"(axis error {direction_errors[row]:.2e})")
+
+
+def _check_points(sample: np.ndarray, before_coordinates, after_coordinates, unit_scale, result):
+    """Check that the sampled input points are unchanged in the output."""
+    before_values, _ = before_coordinates.lookup(sample)
+    after_values, found = after_coordinates.lookup(sample)
+    _fail_rows(result, np.flatnonzero(~found), lambda row: f"Point #{sample[row]} is missing from the output")
+
+    result.points = int(found.sum())
+    if not result.points:
+        return
+
+    present = sample[found]
+    errors = np.linalg.norm(before_values[found] - after_values[found], axis=1) * unit_scale
+    result.max_point_error = float(errors.max())
+    _fail_rows(result, np.flatnonzero(errors > result.tolerance),
+               lambda row: f"Point #{present[row]} moved by {errors[row]:.6f} m")
+
+
+def _check_map_conversion(before, after, transform: tuple, unit_scale: float, result):
+    """
+    Check the output's IfcMapConversion is the input's composed with the transformation.
+
+    The updated conversion keeps its id; a new one is compared with the
+    identity conversion. Mirrors IFCTransformModel._apply_map_conversion.
+    """
+    changed = [
+        conversion_id for conversion_id, args in after.map_conversions.items()
+        if before.map_conversions.get(conversion_id) != args
+    ]
+    if len(changed) > 1:
+        result.fail(f"{len(changed)} IfcMapConversions changed, expected one")
+        return
+    if changed:
+        conversion_id = changed[0]
+    elif len(after.map_conversions) == 1:
+        # A zero shift may leave the conversion's text unchanged
+        conversion_id = next(iter(after.map_conversions))
+    else:
+        result.fail("Output has no IfcMapConversion to check")
+        return
+
+    old = before.map_conversions.get(conversion_id)
+    new = after.map_conversions[conversion_id]
+    old_values = _conversion_values(old) if old is not None else (0.0, 0.0, 0.0, 1.0, 0.0, 1.0)
+    eastings, northings, height, abscissa, ordinate, scale = old_values
+
+    map_scale = before.map_unit_scale(old, unit_scale) if old is not None else unit_scale
+    x, y, z, should_rotate_first, rotation_z = transform
+    matrix = np.array(offset_matrix(x / map_scale, y / map_scale, z / map_scale, should_rotate_first, rotation_z))
+    angle = np.arctan2(ordinate, abscissa)
+    current = np.array([
+        [np.cos(angle) * scale, -np.sin(angle) * scale, 0.0, eastings],
+        [np.sin(angle) * scale, np.cos(angle) * scale, 0.0, northings],
+        [0.0, 0.0, scale, height],
+        [0.0, 0.0, 0.0, 1.0],
+    ])
+    expected = matrix @ current
+
+    actual = np.array(_conversion_values(new))
+    position_error = np.linalg.norm(expected[:3, 3] - actual[:3]) * map_scale
+    axis_error = np.abs(expected[:2, 0] / scale - actual[3:5]).max()
+    if position_error > result.tolerance or axis_error > DIRECTION_TOLERANCE:
+        result.fail(f"IfcMapConversion #{conversion_id} is off by {position_error:.6f} m "
+                    f"(axis error {axis_error:.2e})")
+
+
+def _conversion_values(args: list[bytes]) -> tuple:
+    """Return (eastings, northings, height, x abscissa, x ordinate, scale) of an IfcMapConversion."""
+    def real(index, default):
+        token = args[index] if index < len(args) else b'$'
+        return default if token in (b'$', b'') else float(token)
+
+    return (
+        real(_EASTINGS, 0.0), real(_NORTHINGS, 0.0), real(_HEIGHT, 0.0),
+        real(_ABSCISSA, 1.0), real(_ORDINATE, 0.0), real(_SCALE, 1.0)
+    )
@@ -5,10 +5,27 @@ Provides the TransformView class that creates and manages the UI components
 for file selection, transformation parameters, and processing controls.
 """
 
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
 
+# Display labels for IFCTransformModel strategies, in dropdown order
+STRATEGY_LABELS = {
+    'ifcpatch': "Standard (IfcPatch)",
+    'native': "Direct (root placements)",
+    'fast_text': "Fast text (large files)",
+    'georeference': "Georeference only (IFC4)",
+}
+
+# Display labels for MemoryScheduler processing orders, in dropdown order
+ORDER_LABELS = {
+    'largest': "Largest first",
+    'smallest': "Smallest first",
+    'name': "By name",
+}
+
+
 class TransformView:
     """
     Main view for the IFC transformation tool.
@@ -19,6 +36,7 @@ class TransformView:
     - X, Y, Z offset fields (float validated)
     - Rotation field (float validated)
     - Rotate first checkbox
+    - Transform method dropdown
     - Process button
     - Status display
     """
@@ -35,7 +53,7 @@ class TransformView:
 
         # Configure window
         self.root.title("IFC Translate Tool")
-        self.root.geometry("550x680")
+        self.root.geometry("640x780")
 
         # Initialize all StringVars and BooleanVars
         self.input_file_var = tk.StringVar()
@@ -46,13 +64,27 @@ class TransformView:
         self.z_var = tk.StringVar(value="0")
         self.rotation_var = tk.StringVar(value="0")
         self.rotate_first_var = tk.BooleanVar(value=True)
+        self.strategy_var = tk.StringVar(value=STRATEGY_LABELS['ifcpatch'])
+        self.profile_var = tk.BooleanVar(value=False)
         self.batch_mode_var = tk.BooleanVar(value=False)
+        self.workers_var = tk.StringVar(value=str(os.cpu_count() or 1))
+        self.order_var = tk.StringVar(value=ORDER_LABELS['largest'])
+        self.memory_limit_var = tk.StringVar(value="")
+        self.skip_unchanged_var = tk.BooleanVar(value=True)
+        self.recursive_var = tk.BooleanVar(value=False)
+        self.include_var = tk.StringVar(value="")
+        self.exclude_var = tk.StringVar(value="")
         self.status_var = tk.StringVar(value="Ready")
         self.batch_status_var = tk.StringVar(value="")
+        self.batch_detail_var = tk.StringVar(value="")
 
         # Batch processing state
         self.cancel_requested = False
 
+        # Whether any preset exists (the dropdown may show a filtered subset)
+        self.has_presets = False
+        self._preset_filter = ""
+
         # Register float validation command
         validate_float_cmd = self.root.register(self._validate_float)
 
@@ -73,10 +105,12 @@ class TransformView:
         preset_row = tk.Frame(preset_frame)
         preset_row.pack(fill=tk.X)
 
-        # Preset dropdown (readonly to prevent typing)
-        self.preset_combo = ttk.Combobox(preset_row, state='readonly', width=25)
+        # Preset dropdown (typing narrows the list to names with that prefix)
+        self.preset_combo = ttk.Combobox(preset_row, width=25)
         self.preset_combo.pack(side=tk.LEFT, padx=(0, 10))
         self.preset_combo.bind('<<ComboboxSelected>>', self._on_preset_selected)
+        self.preset_combo.bind('<KeyRelease>', self._on_preset_typed)
+        self.preset_combo.bind('<Return>', self._on_preset_selected)
 
         # Save button
         self.save_preset_button = tk.Button(preset_row, text="Save", command=self._on_save_preset_clicked)
@@ -86,6 +120,10 @@ class TransformView:
         self.delete_preset_button = tk.Button(preset_row, text="Delete", command=self._on_delete_preset_clicked)
         self.delete_preset_button.pack(side=tk.LEFT, padx=2)
 
+        # Fan-out button (one output per chosen preset from a single parse)
+        self.fanout_button = tk.Button(preset_row, text="Fan out...", command=self._on_fanout_clicked)
+        self.fanout_button.pack(side=tk.LEFT, padx=2)
+
         # Processing mode toggle
         mode_frame = tk.LabelFrame(main_frame, text="Processing Mode", padx=10, pady=10)
         mode_frame.pack(fill=tk.X, pady=5)
@@ -126,6 +164,62 @@ class TransformView:
         tk.Entry(self.output_frame, textvariable=self.output_dir_var, width=35).pack(side=tk.LEFT, padx=5)
         tk.Button(self.output_frame, text="Browse...", command=self._select_output_dir).pack(side=tk.LEFT)
 
+        # Batch options (initially hidden)
+        self.batch_options_frame = tk.LabelFrame(main_frame, text="Batch Options", padx=10, pady=5)
+
+        options_row = tk.Frame(self.batch_options_frame)
+        options_row.pack(fill=tk.X)
+
+        # Worker count (one process per worker)
+        tk.Label(options_row, text="Workers:").pack(side=tk.LEFT)
+        tk.Spinbox(
+            options_row,
+            from_=1,
+            to=64,
+            textvariable=self.workers_var,
+            width=4
+        ).pack(side=tk.LEFT, padx=(2, 10))
+
+        # Processing order
+        tk.Label(options_row, text="Order:").pack(side=tk.LEFT)
+        ttk.Combobox(
+            options_row,
+            textvariable=self.order_var,
+            values=list(ORDER_LABELS.values()),
+            state='readonly',
+            width=13
+        ).pack(side=tk.LEFT, padx=(2, 10))
+
+        # Memory budget shared by all workers (blank = automatic)
+        tk.Label(options_row, text="RAM limit (GB):").pack(side=tk.LEFT)
+        tk.Entry(
+            options_row,
+            textvariable=self.memory_limit_var,
+            width=6,
+            validate="key",
+            validatecommand=(validate_float_cmd, "%P")
+        ).pack(side=tk.LEFT, padx=2)
+
+        # Incremental mode: skip inputs whose output is already current
+        tk.Checkbutton(
+            options_row,
+            text="Skip unchanged",
+            variable=self.skip_unchanged_var
+        ).pack(side=tk.LEFT, padx=(10, 0))
+
+        # File discovery: subfolders and glob patterns (separated by ';')
+        discovery_row = tk.Frame(self.batch_options_frame)
+        discovery_row.pack(fill=tk.X, pady=(5, 0))
+        tk.Checkbutton(
+            discovery_row,
+            text="Include subfolders",
+            variable=self.recursive_var
+        ).pack(side=tk.LEFT)
+        tk.Label(discovery_row, text="Include:").pack(side=tk.LEFT, padx=(10, 0))
+        tk.Entry(discovery_row, textvariable=self.include_var, width=16).pack(side=tk.LEFT, padx=2)
+        tk.Label(discovery_row, text="Exclude:").pack(side=tk.LEFT, padx=(10, 0))
+        tk.Entry(discovery_row, textvariable=self.exclude_var, width=16).pack(side=tk.LEFT, padx=2)
+
         # Separator
         tk.Frame(main_frame, height=2, bd=1, relief=tk.SUNKEN).pack(fill=tk.X, pady=15)
 
@@ -191,6 +285,25 @@ class TransformView:
             variable=self.rotate_first_var
         ).pack(anchor="w", pady=5)
 
+        # Transform method
+        strategy_frame = tk.Frame(main_frame)
+        strategy_frame.pack(fill=tk.X, pady=5)
+        tk.Label(strategy_frame, text="Method:", width=15, anchor="w").pack(side=tk.LEFT)
+        ttk.Combobox(
+            strategy_frame,
+            textvariable=self.strategy_var,
+            values=list(STRATEGY_LABELS.values()),
+            state='readonly',
+            width=30
+        ).pack(side=tk.LEFT)
+
+        # Diagnostics for slow or memory-hungry files
+        tk.Checkbutton(
+            main_frame,
+            text="Profile (write .prof and allocation reports next to outputs; slower)",
+            variable=self.profile_var
+        ).pack(anchor="w")
+
         # Action button
         button_frame = tk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=15)
@@ -204,7 +317,7 @@ class TransformView:
         )
         self.process_button.pack(side=tk.LEFT, padx=(0, 10))
 
-        # Cancel button (initially hidden)
+        # Cancel button (enabled while a transformation is running)
         self.cancel_button = tk.Button(
             button_frame,
             text="Cancel",
@@ -213,6 +326,7 @@ class TransformView:
             height=2,
             state=tk.DISABLED
         )
+        self.cancel_button.pack(side=tk.LEFT)
 
         # Progress section (initially hidden)
         self.progress_frame = tk.LabelFrame(main_frame, text="Progress", padx=10, pady=10)
@@ -231,6 +345,14 @@ class TransformView:
             anchor="w"
         ).pack(fill=tk.X)
 
+        # Bytes done, throughput and ETA
+        tk.Label(
+            self.progress_frame,
+            textvariable=self.batch_detail_var,
+            anchor="w",
+            fg="gray25"
+        ).pack(fill=tk.X)
+
         # Status display
         status_frame = tk.Frame(main_frame)
         status_frame.pack(fill=tk.X, pady=5)
@@ -296,12 +418,12 @@ class TransformView:
             self.input_file_frame.pack_forget()
             # Pack input_dir_frame before output frame to maintain proper order
             self.input_dir_frame.pack(fill=tk.X, pady=5, before=self.output_frame)
-            self.cancel_button.pack(side=tk.LEFT)
+            self.batch_options_frame.pack(fill=tk.X, pady=5, after=self.output_frame)
         else:
             # Show single file input, hide directory input and progress
             self.input_dir_frame.pack_forget()
             self.input_file_frame.pack(fill=tk.X, pady=5, before=self.output_frame)
-            self.cancel_button.pack_forget()
+            self.batch_options_frame.pack_forget()
 
     def _on_cancel_clicked(self):
         """Handle cancel button click."""
@@ -329,8 +451,13 @@ class TransformView:
         Get all form values as a dictionary.
 
         Returns:
-            Dictionary with keys: input_file, output_dir, x, y, z, rotation, rotate_first
+            Dictionary with keys: input_file, output_dir, x, y, z, rotation,
+            rotate_first, strategy
         """
+        strategy = next(
+            (key for key, label in STRATEGY_LABELS.items() if label == self.strategy_var.get()),
+            'ifcpatch'
+        )
         return {
             'input_file': self.input_file_var.get(),
             'output_dir': self.output_dir_var.get(),
@@ -338,7 +465,8 @@ class TransformView:
             'y': float(self.y_var.get() or "0"),
             'z': float(self.z_var.get() or "0"),
             'rotation': float(self.rotation_var.get() or "0"),
-            'rotate_first': self.rotate_first_var.get()
+            'rotate_first': self.rotate_first_var.get(),
+            'strategy': strategy
         }
 
     def show_status(self, message: str):
@@ -377,16 +505,42 @@ class TransformView:
         """
         if is_processing:
             self.process_button.config(state=tk.DISABLED)
+            self.fanout_button.config(state=tk.DISABLED)
             self.show_status("Processing...")
         else:
             self.process_button.config(state=tk.NORMAL)
+            self.fanout_button.config(state=tk.NORMAL if self.has_presets else tk.DISABLED)
+            self.cancel_button.config(state=tk.DISABLED)
             self.show_status("Ready")
 
+    def set_ready(self, is_ready: bool):
+        """
+        Enable or disable processing while libraries load at startup.
+
+        Args:
+            is_ready: True once the IFC libraries are loaded
+        """
+        if is_ready:
+            self.process_button.config(state=tk.NORMAL)
+            self.fanout_button.config(state=tk.NORMAL if self.has_presets else tk.DISABLED)
+            self.show_status("Ready")
+        else:
+            self.process_button.config(state=tk.DISABLED)
+            self.fanout_button.config(state=tk.DISABLED)
+            self.show_status("Loading IFC libraries...")
+
     def _on_preset_selected(self, event):
         """Handle preset selection from dropdown."""
         if self.controller is not None:
             self.controller.on_preset_selected()
 
+    def _on_preset_typed(self, event):
+        """Narrow the preset dropdown when the typed text changes."""
+        text = self.preset_combo.get()
+        if text != self._preset_filter and self.controller is not None:
+            self._preset_filter = text
+            self.controller.on_preset_filter_changed()
+
     def _on_save_preset_clicked(self):
         """Handle Save preset button click."""
         if self.controller is not None:
@@ -397,14 +551,26 @@ class TransformView:
         if self.controller is not None:
             self.controller.on_delete_preset()
 
+    def _on_fanout_clicked(self):
+        """Handle Fan out button click."""
+        if self.controller is not None:
+            self.controller.on_fanout_clicked()
+
     def update_preset_list(self, preset_names: list):
         """Update the preset dropdown with available presets."""
         self.preset_combo['values'] = preset_names
-        # Disable delete button if no presets
+        self.has_presets = bool(preset_names)
+        # Disable delete and fan-out buttons if no presets
         if preset_names:
             self.delete_preset_button.config(state=tk.NORMAL)
+            self.fanout_button.config(state=tk.NORMAL)
         else:
             self.delete_preset_button.config(state=tk.DISABLED)
+            self.fanout_button.config(state=tk.DISABLED)
+
+    def set_preset_choices(self, preset_names: list):
+        """Replace the dropdown entries with a filtered list of preset names."""
+        self.preset_combo['values'] = preset_names
 
     def get_selected_preset(self) -> str:
         """Get the currently selected preset name."""
@@ -413,6 +579,7 @@ class TransformView:
     def set_selected_preset(self, preset_name: str):
         """Set the selected preset in the dropdown."""
         self.preset_combo.set(preset_name)
+        self._preset_filter = preset_name
 
     def set_values(self, values: dict):
         """Set form field values from a dictionary (opposite of get_values)."""
@@ -421,6 +588,8 @@ class TransformView:
         self.z_var.set(str(values.get('z', 0)))
         self.rotation_var.set(str(values.get('rotation', 0)))
         self.rotate_first_var.set(values.get('rotate_first', True))
+        strategy = values.get('strategy', 'ifcpatch')
+        self.strategy_var.set(STRATEGY_LABELS.get(strategy, STRATEGY_LABELS['ifcpatch']))
 
     def ask_preset_name(self) -> str | None:
         """Show dialog to get preset name from user. Returns None if cancelled."""
@@ -446,26 +615,128 @@ class TransformView:
             f"Preset '{preset_name}' already exists. Overwrite?"
         )
 
+    def ask_fanout_presets(self, preset_names: list[str]) -> list[str] | None:
+        """
+        Show a dialog to choose the presets for a fan-out transformation.
+
+        Args:
+            preset_names: Saved preset names to choose from
+
+        Returns:
+            Chosen preset names in list order, or None if cancelled or none chosen
+        """
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Fan Out")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+
+        tk.Label(
+            dialog,
+            text="Write one output per selected preset\n(the input is read only once):",
+            justify=tk.LEFT
+        ).pack(padx=10, pady=(10, 5), anchor="w")
+
+        listbox = tk.Listbox(dialog, selectmode=tk.MULTIPLE, height=min(len(preset_names), 10), width=40)
+        for name in preset_names:
+            listbox.insert(tk.END, name)
+        listbox.pack(padx=10, pady=5)
+
+        chosen = []
+
+        def on_ok():
+            chosen.extend(preset_names[i] for i in listbox.curselection())
+            dialog.destroy()
+
+        button_row = tk.Frame(dialog)
+        button_row.pack(pady=(5, 10))
+        tk.Button(button_row, text="Transform", width=10, command=on_ok).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_row, text="Cancel", width=10, command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+        return chosen or None
+
+    def confirm_resume(self, remaining: int, total: int, started: str | None) -> bool:
+        """Ask whether to resume an interrupted batch in the output folder."""
+        return messagebox.askyesno(
+            "Resume Batch",
+            f"An interrupted batch (started {started or 'earlier'}) has "
+            f"{remaining} of {total} files remaining in this output folder.\n\n"
+            "Resume it with its original settings?"
+        )
+
     def get_batch_mode(self) -> bool:
         """Return whether batch mode is enabled."""
         return self.batch_mode_var.get()
 
+    def get_worker_count(self) -> int:
+        """Return the number of batch workers (at least 1)."""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except ValueError:
+            return os.cpu_count() or 1
+
+    def get_processing_order(self) -> str:
+        """Return the selected batch processing order key."""
+        return next(
+            (key for key, label in ORDER_LABELS.items() if label == self.order_var.get()),
+            'largest'
+        )
+
+    def get_memory_limit_bytes(self) -> int | None:
+        """Return the batch RAM limit in bytes, or None for automatic."""
+        try:
+            gigabytes = float(self.memory_limit_var.get())
+        except ValueError:
+            return None
+        return int(gigabytes * 1024 ** 3) if gigabytes > 0 else None
+
+    def get_recursive(self) -> bool:
+        """Return whether batch mode searches subfolders."""
+        return self.recursive_var.get()
+
+    def get_include_patterns(self) -> list[str]:
+        """Return the include glob patterns (';' separated in the entry)."""
+        return [p.strip() for p in self.include_var.get().split(';') if p.strip()]
+
+    def get_exclude_patterns(self) -> list[str]:
+        """Return the exclude glob patterns (';' separated in the entry)."""
+        return [p.strip() for p in self.exclude_var.get().split(';') if p.strip()]
+
+    def get_skip_unchanged(self) -> bool:
+        """Return whether batch mode should skip files whose output is current."""
+        return self.skip_unchanged_var.get()
+
+    def get_profile(self) -> bool:
+        """Return whether transformations should be profiled."""
+        return self.profile_var.get()
+
     def get_input_directory(self) -> str:
         """Return the selected input directory path."""
         return self.input_dir_var.get()
 
-    def start_batch_progress(self, total: int):
+    def start_batch_progress(self, total: int | None = None):
         """
         Initialize progress bar for batch processing.
 
         Args:
-            total: Total number of files to process
+            total: Total number of files to process, or None while files
+                   are still being discovered
         """
-        self.progress_bar['maximum'] = total
+        if total is None:
+            self.batch_status_var.set("Scanning for IFC files...")
+        self.progress_bar['maximum'] = total or 1
         self.progress_bar['value'] = 0
         self.progress_frame.pack(fill=tk.X, pady=5)
 
-    def update_batch_progress(self, current: int, total: int, filename: str):
+    def update_batch_progress(
+        self,
+        current: int,
+        total: int,
+        filename: str,
+        fraction: float | None = None,
+        detail: str = ""
+    ):
         """
         Update progress bar and status during batch processing.
 
@@ -473,9 +744,18 @@ class TransformView:
             current: Current file number (1-indexed)
             total: Total number of files
             filename: Name of current file being processed
+            fraction: Share of the batch's bytes done; when given, the bar
+                      is weighted by file size instead of file count
+            detail: Optional second status line (bytes, throughput, ETA)
         """
-        self.progress_bar['value'] = current
+        if fraction is not None:
+            self.progress_bar['maximum'] = 1000
+            self.progress_bar['value'] = fraction * 1000
+        else:
+            self.progress_bar['maximum'] = total
+            self.progress_bar['value'] = current
         self.batch_status_var.set(f"Processing: {filename} ({current}/{total})")
+        self.batch_detail_var.set(detail)
         self.root.update_idletasks()
 
     def end_batch_progress(self):
@@ -483,6 +763,7 @@ class TransformView:
         self.progress_frame.pack_forget()
         self.progress_bar['value'] = 0
         self.batch_status_var.set("")
+        self.batch_detail_var.set("")
 
     def is_cancel_requested(self) -> bool:
         """Return whether user has requested cancellation."""
@@ -0,0 +1,360 @@
+"""
+Watch Folder
+
+This module provides the FolderWatcher class that follows an input
+directory and yields IFC files once they have been completely written, so
+a BatchRunner (which accepts the generator as a lazy file list) can
+transform files as they arrive. Changes are picked up with inotify on
+Linux and by polling directory modification times elsewhere; either way a
+full rescan runs every RESCAN_INTERVAL to catch anything missed (inotify
+does not see files written to a network share by other machines).
+
+A file is yielded once its size and modification time have been unchanged
+for the settle time and it ends with the STEP terminator, and again
+whenever it is replaced or rewritten.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from src.preflight import is_complete
+from src.utils.validation import matches_patterns
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a file's size and modification time must be unchanged before it is processed
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# Seconds between checks of files still being written (and of directories when polling)
+POLL_INTERVAL = 1.0
+
+# Seconds between full rescans of the watched tree
+RESCAN_INTERVAL = 300.0
+
+# Seconds between full rescans when polling. Directory modification times
+# only reveal added, renamed and deleted files, so files overwritten in
+# place are found by these rescans.
+POLL_RESCAN_INTERVAL = 30.0
+
+# Seconds a settled file may lack the STEP terminator (e.g. an exporter
+# that pauses mid-write) before it is processed anyway and fails preflight
+INCOMPLETE_TIMEOUT = 60.0
+
+# inotify event flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class FolderWatcher:
+    """
+    Yields the IFC files of a directory as they finish being written.
+
+    Files already in the directory when watching starts are yielded too.
+    Hidden (dot-prefixed) files are ignored, so temporary outputs are
+    never picked up.
+    """
+
+    def __init__(
+        self,
+        directory,
+        recursive: bool = False,
+        include=None,
+        exclude=None,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        use_inotify: bool = True
+    ):
+        """
+        Initialize watcher.
+
+        Args:
+            directory: Directory to watch
+            recursive: If True, also watch subdirectories (including new ones)
+            include: Optional glob patterns files must match (see iter_ifc_files)
+            exclude: Optional glob patterns for files and subdirectories to ignore
+            settle_seconds: Seconds a file must be unchanged before it is yielded
+            use_inotify: If False, always poll (e.g. for network shares)
+        """
+        self.directory = Path(directory)
+        self.recursive = recursive
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.settle_seconds = settle_seconds
+        self.use_inotify = use_inotify
+        # path -> (mtime_ns, size) when it was last yielded
+        self._seen = {}
+        # path -> [(mtime_ns, size), monotonic time it was first seen unchanged]
+        self._pending = {}
+        # directory -> mtime_ns when it was last listed
+        self._directories = {}
+
+    def watch(self, stop_event):
+        """
+        Yield files as they become ready, until stop_event is set.
+
+        Args:
+            stop_event: threading.Event that ends the watch
+
+        Yields:
+            Path of each new or replaced IFC file
+
+        Raises:
+            OSError: If the watched directory itself cannot be read
+        """
+        inotify = _Inotify.open() if self.use_inotify else None
+        logger.info(f"Watching {self.directory} ({'inotify' if inotify else 'polling'})")
+        rescan_interval = RESCAN_INTERVAL if inotify is not None else POLL_RESCAN_INTERVAL
+        try:
+            self._rescan(inotify)
+            rescan_at = time.monotonic() + rescan_interval
+
+            while not stop_event.is_set():
+                if inotify is not None:
+                    changes, overflowed = inotify.read(POLL_INTERVAL)
+                    for path, is_directory in changes:
+                        if is_directory:
+                            self._directory_added(path, inotify)
+                        else:
+                            self._file_changed(path)
+                    if overflowed:
+                        logger.warning("inotify queue overflowed; rescanning")
+                        rescan_at = 0.0
+                else:
+                    stop_event.wait(POLL_INTERVAL)
+                    for directory in self._changed_directories():
+                        self._scan(directory, None, full=False)
+
+                if time.monotonic() >= rescan_at:
+                    self._rescan(inotify)
+                    rescan_at = time.monotonic() + rescan_interval
+
+                yield from self._settled()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _rescan(self, inotify):
+        """List the whole tree again, forgetting files and directories that are gone."""
+        self._directories = {}
+        found = self._scan(self.directory, inotify, full=True)
+        self._seen = {path: signature for path, signature in self._seen.items() if path in found}
+        self._pending = {path: entry for path, entry in self._pending.items() if path in found}
+
+    def _scan(self, directory: Path, inotify, full: bool) -> set:
+        """
+        List a directory, queueing its IFC files.
+
+        Subdirectories are listed too when recursive: all of them when
+        full, otherwise only ones not seen before.
+
+        Returns:
+            Paths of the IFC files found
+
+        Raises:
+            OSError: If the watched directory itself cannot be read
+        """
+        found = set()
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if inotify is not None:
+                # Watch before listing so files created meanwhile aren't missed
+                try:
+                    inotify.add(current)
+                except OSError as e:
+                    logger.warning(f"{e}; changes there are only found by rescans")
+            try:
+                self._directories[current] = os.stat(current).st_mtime_ns
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError as e:
+                self._directories.pop(current, None)
+                if current == self.directory:
+                    raise
+                logger.warning(f"Skipping unreadable directory {current}: {e}")
+                continue
+
+            for entry in entries:
+                path = Path(entry.path)
+                relative = self._relative(path)
+                if entry.name.startswith('.') or (self.exclude and matches_patterns(relative, self.exclude)):
+                    continue
+                if entry.is_dir():
+                    if self.recursive and (full or path not in self._directories):
+                        stack.append(path)
+                elif self._selected(relative):
+                    found.add(path)
+                    self._file_changed(path)
+        return found
+
+    def _directory_added(self, path: Path, inotify):
+        """Start watching a subdirectory created (or moved in) while watching."""
+        relative = self._relative(path)
+        if (
+            self.recursive
+            and not path.name.startswith('.')
+            and not (self.exclude and matches_patterns(relative, self.exclude))
+        ):
+            self._scan(path, inotify, full=True)
+
+    def _changed_directories(self) -> list[Path]:
+        """Return the directories whose entries changed since they were listed (polling)."""
+        changed = []
+        for directory, mtime_ns in list(self._directories.items()):
+            try:
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    changed.append(directory)
+            except OSError:
+                del self._directories[directory]
+        return changed
+
+    def _file_changed(self, path: Path):
+        """Queue a file to settle unless this version of it was already yielded."""
+        if path.name.startswith('.') or not self._selected(self._relative(path)):
+            return
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._pending.pop(path, None)
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._seen.get(path) == signature:
+            return
+        entry = self._pending.get(path)
+        if entry is None or entry[0] != signature:
+            self._pending[path] = [signature, time.monotonic()]
+
+    def _settled(self):
+        """Yield (and stop tracking) the pending files that have finished being written."""
+        now = time.monotonic()
+        for path, (signature, since) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+
+            current = (stat.st_mtime_ns, stat.st_size)
+            if current != signature:
+                # Still being written
+                self._pending[path] = [current, now]
+                continue
+            if now - since < self.settle_seconds:
+                continue
+            if not is_complete(path) and now - since < INCOMPLETE_TIMEOUT:
+                continue
+
+            del self._pending[path]
+            self._seen[path] = signature
+            logger.info(f"Ready: {path}")
+            yield path
+
+    def _selected(self, relative: str) -> bool:
+        """Return whether a file (path relative to the watched directory) should be processed."""
+        return (
+            relative.lower().endswith('.ifc')
+            and not (self.exclude and matches_patterns(relative, self.exclude))
+            and (not self.include or matches_patterns(relative, self.include))
+        )
+
+    def _relative(self, path: Path) -> str:
+        """Return a path relative to the watched directory, with '/' separators."""
+        return path.relative_to(self.directory).as_posix()
+
+
+class _Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self._fd = fd
+        # watch descriptor -> directory
+        self._directories = {}
+
+    @classmethod
+    def open(cls) -> '_Inotify | None':
+        """Create an inotify instance, or return None where inotify is unavailable."""
+        if not sys.platform.startswith('linux'):
+            return None
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable, polling instead: {e}")
+            return None
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"inotify unavailable, polling instead: {os.strerror(ctypes.get_errno())}")
+            return None
+        return cls(libc, fd)
+
+    def add(self, directory: Path):
+        """
+        Watch a directory for new and rewritten entries.
+
+        Raises:
+            OSError: If the watch cannot be added (e.g. the per-user watch
+                     limit in /proc/sys/fs/inotify/max_user_watches is reached)
+        """
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"Cannot watch directory: {os.strerror(errno)}", str(directory))
+        self._directories[wd] = directory
+
+    def read(self, timeout: float) -> tuple[list[tuple[Path, bool]], bool]:
+        """
+        Wait up to timeout seconds for events.
+
+        Returns:
+            ((path, is_directory) per event, whether events were lost to
+            a queue overflow)
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return [], False
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+
+        changes = []
+        overflowed = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += _EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+            elif mask & IN_IGNORED:
+                # Watched directory was removed
+                self._directories.pop(wd, None)
+            elif wd in self._directories and name:
+                changes.append((self._directories[wd] / os.fsdecode(name), bool(mask & IN_ISDIR)))
+        return changes, overflowed
+
+    def close(self):
+        """Release the inotify instance and all its watches."""
+        os.close(self._fd)
@@ -0,0 +1,30 @@
+"""
+Shared Test Fixtures
+
+Tests run on small synthetic models written by the benchmark corpus
+generator, so no IFC files need to be checked in.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports when running pytest directly
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.corpus import generate_model
+
+
+@pytest.fixture
+def make_model(tmp_path):
+    """Return a function writing a synthetic model into the test's directory."""
+    def make(name: str = "model.ifc", **kwargs) -> Path:
+        path = tmp_path / name
+        kwargs.setdefault('entities', 500)
+        generate_model(path, **kwargs)
+        return path
+
+    return make
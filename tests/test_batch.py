@@ -0,0 +1,70 @@
+"""Tests for the batch engine."""
+
+import queue
+import threading
+
+import pytest
+
+from src.batch import (
+    BatchRunner,
+    MODE_PROCESS,
+    MODE_SERIAL,
+    MODE_THREAD,
+    TransformWorker,
+    build_transform_kwargs
+)
+from src.model import IFCTransformModel, STRATEGY_FAST_TEXT
+
+
+def run_batch(runner, files, output_dir) -> list[dict]:
+    """Run a batch to completion and return the messages it posted."""
+    result_queue = queue.Queue()
+    kwargs = build_transform_kwargs({'x': 10.0, 'y': 5.0, 'z': 0.0, 'rotation': 0.0,
+                                     'rotate_first': True, 'strategy': STRATEGY_FAST_TEXT})
+    runner.run(files, output_dir, kwargs, result_queue, threading.Event())
+    messages = []
+    while not result_queue.empty():
+        messages.append(result_queue.get_nowait())
+    return messages
+
+
+@pytest.mark.parametrize("mode", [MODE_SERIAL, MODE_THREAD, MODE_PROCESS])
+def test_finished_files_leave_no_cached_sizes(make_model, tmp_path, mode):
+    files = [make_model(f"model{i}.ifc", entities=2000 + i) for i in range(4)]
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    runner = BatchRunner(IFCTransformModel(), workers=2, mode=mode)
+
+    messages = run_batch(runner, files, output_dir)
+
+    assert messages[-1]['type'] == 'batch_complete'
+    assert messages[-1]['errors'] == 0
+    assert runner.scheduler._sizes == {}
+
+
+def test_process_workers_measure_every_files_peak(make_model, tmp_path, caplog):
+    # Largest first, so no file after the first sets a new high-water mark
+    files = [make_model(f"model{i}.ifc", entities=40_000 - 5_000 * i) for i in range(4)]
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    runner = BatchRunner(IFCTransformModel(), workers=1, mode=MODE_PROCESS)
+
+    with caplog.at_level('INFO', logger='src.scheduler'):
+        messages = run_batch(runner, files, output_dir)
+
+    results = [m['result'] for m in messages if m['type'] == 'batch_progress']
+    assert len(results) == len(files)
+    assert all(result['memory_bytes'] is not None for result in results)
+    assert caplog.text.count("Memory estimate updated") == len(files)
+
+
+def test_transform_worker_reports_ready_after_loading_libraries(make_model, tmp_path):
+    worker = TransformWorker(IFCTransformModel())
+    try:
+        assert worker.wait_ready() > 0
+
+        output_path = tmp_path / "out.ifc"
+        result = worker.transform(str(make_model()), str(output_path), {'x': 1.0}, threading.Event())
+        assert result.output_bytes == output_path.stat().st_size
+    finally:
+        worker.close()
@@ -0,0 +1,52 @@
+"""Tests for the command line entry point."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def run_cli(*args) -> subprocess.CompletedProcess:
+    """Run the command line tool in a new process, capturing its output."""
+    return subprocess.run(
+        [sys.executable, "-m", "src.cli", *map(str, args)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=300,
+        env={**os.environ, 'PYTHONUNBUFFERED': '1'}
+    )
+
+
+@pytest.mark.parametrize("mode", ["process", "thread", "serial"])
+def test_stdout_is_only_json_lines(make_model, tmp_path, mode):
+    # IfcPatch's offset recipe prints a note when given a rotation
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    make_model("in/a.ifc")
+    make_model("in/b.ifc", tree='deep')
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    completed = run_cli(input_dir, "-o", output_dir, "--x", 10, "--rotation", 15,
+                        "--mode", mode, "--workers", 2, "-q")
+
+    assert completed.returncode == 0, completed.stderr
+    messages = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert messages[-1]['type'] == 'batch_complete'
+    assert messages[-1]['errors'] == 0
+
+
+def test_single_file_stdout_is_only_json_lines(make_model, tmp_path):
+    input_path = make_model()
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    completed = run_cli(input_path, "-o", output_dir, "--x", 10, "--rotation", 15, "-q")
+
+    assert completed.returncode == 0, completed.stderr
+    messages = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert messages[-1]['type'] == 'batch_complete'
@@ -0,0 +1,201 @@
+"""Tests for the controller's result queue polling (no display needed)."""
+
+import queue
+import threading
+import time
+
+from src.controller import QUEUE_DRAIN_BUDGET, QUEUE_POLL_BUSY_MS, QUEUE_POLL_IDLE_MS, TransformController
+
+
+# Simulated cost of reading one message from a slow queue
+SLOW_GET_SECONDS = 0.001
+
+
+class FakeRoot:
+    """Tk root stand-in: keeps after() callbacks instead of running them."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(ms)
+
+
+class FakeView:
+    """Records the progress redraws the controller asks for."""
+
+    def __init__(self):
+        self.root = FakeRoot()
+        self.redraws = []
+        self.calls = []
+
+    def update_batch_progress(self, current, total, filename, fraction=None, detail=""):
+        self.redraws.append((current, total, filename, fraction))
+
+    def __getattr__(self, name):
+        # Any other view call is only recorded
+        return lambda *args, **kwargs: self.calls.append((name, args))
+
+
+class NoPresets:
+    """Presets model stand-in with nothing saved."""
+
+    def list_presets(self):
+        return []
+
+    def search_presets(self, prefix, limit=None):
+        return []
+
+    def get_last_used(self):
+        return None
+
+
+class SlowQueue(queue.Queue):
+    """Queue whose reads take SLOW_GET_SECONDS each."""
+
+    def get_nowait(self):
+        time.sleep(SLOW_GET_SECONDS)
+        return super().get_nowait()
+
+
+def make_controller(result_queue=None):
+    view = FakeView()
+    controller = TransformController(model=None, view=view, presets_model=NoPresets())
+    if result_queue is not None:
+        controller.result_queue = result_queue
+    view.root.scheduled.clear()
+    view.calls.clear()
+    return controller, view
+
+
+def file_progress(filename, fraction, bytes_done):
+    return {
+        'type': 'batch_file_progress', 'filename': filename, 'stage': 'write',
+        'fraction': fraction, 'bytes_done': bytes_done, 'bytes_total': 1000,
+        'mb_per_s': 1.0, 'eta_seconds': None
+    }
+
+
+def test_progress_for_a_file_is_coalesced_into_one_redraw():
+    controller, view = make_controller()
+    controller._batch_count = (0, 2)
+    for step in range(1, 1001):
+        controller.result_queue.put(file_progress("a.ifc", step / 1000, step // 2))
+
+    controller._check_queue()
+
+    assert controller.result_queue.empty()
+    assert view.redraws == [(0, 2, "a.ifc - writing 100%", 0.5)]
+    assert view.root.scheduled == [QUEUE_POLL_BUSY_MS]
+
+
+def test_errors_are_kept_when_progress_is_coalesced():
+    controller, view = make_controller()
+    for current in range(1, 101):
+        controller.result_queue.put({
+            'type': 'batch_error', 'current': current, 'total': 100,
+            'filename': f"{current}.ifc", 'error': "Invalid IFC file"
+        })
+
+    controller._check_queue()
+
+    assert len(controller.batch_errors) == 100
+    assert view.redraws == [(100, 100, "ERROR: 100.ifc", None)]
+
+
+def test_flood_is_drained_within_the_tick_budget():
+    controller, view = make_controller(SlowQueue())
+    events = 10 * int(QUEUE_DRAIN_BUDGET / SLOW_GET_SECONDS)
+    for current in range(1, events + 1):
+        controller.result_queue.put({
+            'type': 'batch_progress', 'current': current, 'total': events,
+            'filename': f"{current}.ifc"
+        })
+
+    ticks = 0
+    while not controller.result_queue.empty():
+        start = time.monotonic()
+        controller._check_queue()
+        elapsed = time.monotonic() - start
+        ticks += 1
+
+        # One message may be read after the deadline, plus scheduling slack
+        assert elapsed < QUEUE_DRAIN_BUDGET + 10 * SLOW_GET_SECONDS + 0.05
+        assert len(view.redraws) == ticks
+        assert view.root.scheduled[-1] == QUEUE_POLL_BUSY_MS
+
+    assert ticks > 1
+    assert view.redraws[-1][:3] == (events, events, f"{events}.ifc")
+
+    controller._check_queue()
+    assert view.root.scheduled[-1] == QUEUE_POLL_IDLE_MS
+
+
+class SlowWorker:
+    """TransformWorker stand-in that is ready once released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def wait_ready(self):
+        self.release.wait()
+        return 1.5
+
+
+def test_process_is_enabled_when_the_worker_is_ready():
+    # No model: the libraries must not be imported in the GUI process
+    controller, view = make_controller()
+    controller.transform_worker = SlowWorker()
+    ready = []
+
+    controller.start_warm_up(on_ready=ready.append)
+    controller._check_queue()
+    assert view.calls == [('set_ready', (False,))]
+
+    controller.transform_worker.release.set()
+    deadline = time.monotonic() + 5
+    while not ready and time.monotonic() < deadline:
+        controller._check_queue()
+        time.sleep(0.01)
+
+    assert ready == [1.5]
+    assert view.calls[-1] == ('set_ready', (True,))
+
+
+class FanoutView(FakeView):
+    """View with a single input file selected and presets chosen for fan-out."""
+
+    def __init__(self, values, chosen):
+        super().__init__()
+        self.values = values
+        self.chosen = chosen
+
+    def get_batch_mode(self):
+        return False
+
+    def get_values(self):
+        return self.values
+
+    def ask_fanout_presets(self, names):
+        return self.chosen
+
+
+class OnePreset(NoPresets):
+    """Presets model listing a preset that has since been deleted."""
+
+    def list_presets(self):
+        return ["Site grid"]
+
+    def get_preset(self, name):
+        return None
+
+
+def test_fanout_with_a_deleted_preset_shows_an_error(make_model, tmp_path):
+    values = {'input_file': str(make_model()), 'output_dir': str(tmp_path), 'strategy': 'native'}
+    view = FanoutView(values, ["Site grid"])
+    controller = TransformController(model=None, view=view, presets_model=OnePreset())
+
+    controller.on_fanout_clicked()
+
+    assert view.calls[-1] == ('show_error', ("Preset not found: Site grid",))
+    assert controller._worker_thread is None
@@ -0,0 +1,98 @@
+"""Tests for the incremental batch manifest."""
+
+import os
+
+import pytest
+
+from src import manifest as manifest_module
+from src.manifest import BatchManifest
+
+
+PARAMS = {'x': 10.0, 'y': 0.0, 'z': 0.0, 'should_rotate_first': True, 'rotation_z': None}
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Record the files the manifest hashes."""
+    files = []
+    real_sha256 = manifest_module.file_sha256
+
+    def file_sha256(path):
+        files.append(path)
+        return real_sha256(path)
+
+    monkeypatch.setattr(manifest_module, 'file_sha256', file_sha256)
+    return files
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    files = []
+    for name in ("a.ifc", "b.ifc"):
+        path = input_dir / name
+        path.write_text(f"ISO-10303-21; {name}")
+        files.append(path)
+    return files
+
+
+def transform(manifest, files, params=PARAMS):
+    """Stand in for a batch: write each output and record it."""
+    for input_file in files:
+        (manifest.output_dir / input_file.name).write_text("output")
+        manifest.record(input_file, params)
+    manifest.save()
+
+
+def test_new_inputs_are_hashed_after_their_transform(tmp_path, inputs, hashed):
+    manifest = BatchManifest(tmp_path)
+
+    to_process, up_to_date = manifest.partition(inputs, PARAMS)
+    assert to_process == inputs and up_to_date == []
+    assert hashed == []
+
+    transform(manifest, inputs)
+    assert hashed == inputs
+
+
+def test_unchanged_inputs_are_current_without_hashing(tmp_path, inputs, hashed):
+    transform(BatchManifest(tmp_path), inputs)
+    hashed.clear()
+
+    to_process, up_to_date = BatchManifest(tmp_path).partition(inputs, PARAMS)
+
+    assert to_process == [] and up_to_date == inputs
+    assert hashed == []
+
+
+def test_changed_params_are_not_hashed_up_front(tmp_path, inputs, hashed):
+    transform(BatchManifest(tmp_path), inputs)
+    hashed.clear()
+
+    to_process, _ = BatchManifest(tmp_path).partition(inputs, {**PARAMS, 'x': 20.0})
+
+    assert to_process == inputs
+    assert hashed == []
+
+
+def test_touched_inputs_are_hashed_and_stay_current(tmp_path, inputs, hashed):
+    transform(BatchManifest(tmp_path), inputs)
+    hashed.clear()
+    os.utime(inputs[0], ns=(0, 0))
+
+    to_process, up_to_date = BatchManifest(tmp_path).partition(inputs, PARAMS)
+
+    assert to_process == [] and up_to_date == inputs
+    assert hashed == [inputs[0]]
+
+
+def test_input_changed_during_transform_is_not_recorded(tmp_path, inputs):
+    manifest = BatchManifest(tmp_path)
+    manifest.partition(inputs, PARAMS)
+    inputs[0].write_text("ISO-10303-21; rewritten while transformed")
+    transform(manifest, inputs)
+
+    to_process, up_to_date = BatchManifest(tmp_path).partition(inputs, PARAMS)
+
+    assert to_process == [inputs[0]] and up_to_date == [inputs[1]]
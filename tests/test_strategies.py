@@ -0,0 +1,73 @@
+"""Tests that the root placement strategies match the IfcPatch strategy."""
+
+import pytest
+
+from benchmarks.bench_strategies import compare_placements, load_placements
+from src.model import IFCTransformModel, STRATEGY_FAST_TEXT, STRATEGY_IFCPATCH, STRATEGY_NATIVE
+
+
+# Allowed placement difference in project units
+TOLERANCE = 1e-6
+
+TRANSFORMS = [
+    {'x': 100.0, 'y': 50.0, 'z': 2.0},
+    {'x': 100.0, 'y': 50.0, 'z': 0.0, 'rotation_z': 30.0},
+    {'x': -20.0, 'y': 5.0, 'z': 0.0, 'should_rotate_first': False, 'rotation_z': -75.0},
+]
+
+
+def placement_matrices(path) -> dict:
+    """Return {step id: absolute matrix} for every IfcLocalPlacement, used or not."""
+    import ifcopenshell
+    import ifcopenshell.util.placement
+
+    ifc_file = ifcopenshell.open(str(path))
+    return {
+        placement.id(): ifcopenshell.util.placement.get_local_placement(placement)
+        for placement in ifc_file.by_type("IfcLocalPlacement")
+    }
+
+
+@pytest.fixture(scope="module")
+def outputs(tmp_path_factory):
+    """Return a function transforming a model with a strategy, caching the output."""
+    cache = {}
+
+    def transform(input_path, strategy, kwargs):
+        key = (input_path, strategy, tuple(sorted(kwargs.items())))
+        if key not in cache:
+            output_path = tmp_path_factory.mktemp(strategy) / input_path.name
+            IFCTransformModel().transform_file(str(input_path), str(output_path), strategy=strategy, **kwargs)
+            cache[key] = output_path
+        return cache[key]
+
+    return transform
+
+
+@pytest.mark.parametrize("kwargs", TRANSFORMS)
+@pytest.mark.parametrize("strategy", [STRATEGY_NATIVE, STRATEGY_FAST_TEXT])
+@pytest.mark.parametrize("tree, units", [
+    ("flat", "mm"),
+    ("deep", "m"),       # nested placements: only the chain heads are roots
+    ("flat2d", "m"),     # root IfcAxis2Placement2Ds
+    ("orphans", "mm"),   # root placements no product uses
+])
+def test_placements_match_ifcpatch(make_model, outputs, strategy, kwargs, tree, units):
+    input_path = make_model(f"{tree}_{units}.ifc", tree=tree, units=units)
+    reference = outputs(input_path, STRATEGY_IFCPATCH, kwargs)
+    output = outputs(input_path, strategy, kwargs)
+
+    products = load_placements(str(reference))
+    assert products
+    mismatches, deviation = compare_placements(products, str(output), TOLERANCE)
+    assert mismatches == 0, f"{mismatches} products differ, largest difference {deviation}"
+
+    if strategy == STRATEGY_FAST_TEXT:
+        return  # Moves every root, used or not (see FastTextTransformer)
+
+    # Placements no product uses must be left where IfcPatch leaves them
+    expected = placement_matrices(reference)
+    actual = placement_matrices(output)
+    assert actual.keys() == expected.keys()
+    for placement_id, matrix in expected.items():
+        assert actual[placement_id] == pytest.approx(matrix, abs=TOLERANCE), f"#{placement_id}"
@@ -0,0 +1,53 @@
+"""Tests for per-operation memory measurement."""
+
+import time
+
+import pytest
+
+from src.utils import timing
+from src.utils.resources import current_rss_bytes
+from src.utils.timing import RSS_SAMPLE_INTERVAL, StageTimer
+
+
+MB = 1024 ** 2
+
+
+def touch(size: int) -> bytearray:
+    """Allocate size bytes and write to every page so they count in RSS."""
+    block = bytearray(size)
+    for offset in range(0, size, 4096):
+        block[offset] = 1
+    return block
+
+
+pytestmark = pytest.mark.skipif(current_rss_bytes() is None, reason="RSS is not readable on this platform")
+
+
+@pytest.mark.parametrize("resettable", [True, False], ids=["reset", "sampled"])
+def test_peak_is_measured_after_a_larger_operation(monkeypatch, resettable):
+    if not resettable:
+        monkeypatch.setattr(timing, 'reset_peak_rss', lambda: False)
+
+    # An earlier, larger file sets the process high-water mark
+    earlier = touch(300 * MB)
+    del earlier
+
+    timer = StageTimer()
+    with timer.stage('patch'):
+        block = touch(100 * MB)
+        time.sleep(4 * RSS_SAMPLE_INTERVAL)
+        del block
+
+    increase = timer.peak_increase()
+    assert increase is not None
+    assert 80 * MB < increase < 200 * MB
+
+
+def test_unmeasured_peak_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(timing, 'reset_peak_rss', lambda: False)
+    monkeypatch.setattr(timing, 'current_rss_bytes', lambda: None)
+
+    timer = StageTimer()
+    with caplog.at_level('INFO', logger=timing.__name__):
+        assert timer.peak_increase() is None
+    assert "could not be measured" in caplog.text
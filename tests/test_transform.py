@@ -0,0 +1,109 @@
+"""Tests for operation chains: composing them, and applying them in one pass."""
+
+import pytest
+
+from benchmarks.bench_strategies import compare_placements, load_placements
+from src.model import IFCTransformModel, STRATEGY_FAST_TEXT, STRATEGY_IFCPATCH, STRATEGY_NATIVE
+from src.utils.transform import chain_parameters, compose_operations, matmul, offset_matrix
+
+
+# Allowed placement difference in project units
+TOLERANCE = 1e-6
+
+# Rotate about a pivot, translate, rotate again about the origin
+CHAIN = [
+    {"op": "rotate", "angle": 30.0, "pivot": [100.0, 50.0]},
+    {"op": "translate", "x": 250.0, "y": -40.0, "z": 2.0},
+    {"op": "rotate", "angle": -12.0},
+]
+
+
+def apply(matrix, point):
+    """Return a 4x4 matrix applied to an (x, y, z) point."""
+    return [sum(row[k] * value for k, value in enumerate([*point, 1.0])) for row in matrix[:3]]
+
+
+def chain_matrix(operations):
+    """Return the single rotate-first matrix chain_parameters reduces a chain to."""
+    x, y, z, rotation_z = chain_parameters(operations)
+    return offset_matrix(x, y, z, True, rotation_z)
+
+
+def test_translate_only_has_no_rotation():
+    assert chain_parameters([{"op": "translate", "x": 1, "y": 2, "z": 3}]) == (1.0, 2.0, 3.0, None)
+
+
+def test_rotate_then_translate_keeps_the_offset():
+    x, y, z, rotation_z = chain_parameters([
+        {"op": "rotate", "angle": 90},
+        {"op": "translate", "x": 10, "y": 5},
+    ])
+    assert (x, y, z) == pytest.approx((10.0, 5.0, 0.0))
+    assert rotation_z == pytest.approx(90.0)
+
+
+def test_translate_then_rotate_rotates_the_offset():
+    x, y, z, rotation_z = chain_parameters([
+        {"op": "translate", "x": 10},
+        {"op": "rotate", "angle": 90},
+    ])
+    assert (x, y, z) == pytest.approx((0.0, 10.0, 0.0), abs=1e-12)
+    assert rotation_z == pytest.approx(90.0)
+
+
+def test_rotations_add_up():
+    assert chain_parameters([{"op": "rotate", "angle": 30}, {"op": "rotate", "angle": 45}])[3] == pytest.approx(75.0)
+
+
+def test_rotations_cancelling_out_leave_no_rotation():
+    assert chain_parameters([{"op": "rotate", "angle": 90}, {"op": "rotate", "angle": -90}])[3] is None
+
+
+def test_rotation_about_a_pivot_keeps_the_pivot_in_place():
+    matrix = chain_matrix([{"op": "rotate", "angle": 90, "pivot": [10, 5]}])
+    assert apply(matrix, (10.0, 5.0, 0.0)) == pytest.approx([10.0, 5.0, 0.0])
+    assert apply(matrix, (11.0, 5.0, 0.0)) == pytest.approx([10.0, 6.0, 0.0])
+
+
+def test_single_transformation_matches_the_chain():
+    composed = compose_operations(CHAIN)
+    step_by_step = compose_operations(CHAIN[:1])
+    for operation in CHAIN[1:]:
+        step_by_step = matmul(compose_operations([operation]), step_by_step)
+
+    for matrix in (chain_matrix(CHAIN), step_by_step):
+        for row, expected in zip(matrix, composed):
+            assert row == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("operations, message", [
+    ([], "empty"),
+    ([{"op": "scale", "factor": 2}], "Unknown operation 'scale'"),
+    ([{"op": "rotate"}], "missing 'angle'"),
+    ([{"op": "translate", "x": "east"}], "Invalid values"),
+    (["translate"], "expected an object"),
+])
+def test_invalid_chains_are_rejected(operations, message):
+    with pytest.raises(ValueError, match=message):
+        chain_parameters(operations)
+
+
+@pytest.mark.parametrize("strategy", [STRATEGY_IFCPATCH, STRATEGY_NATIVE, STRATEGY_FAST_TEXT])
+@pytest.mark.parametrize("tree, units", [("flat", "mm"), ("deep", "m")])
+def test_single_pass_matches_steps_applied_one_by_one(make_model, tmp_path, strategy, tree, units):
+    input_path = make_model(tree=tree, units=units)
+    model = IFCTransformModel()
+
+    chained = tmp_path / "chained.ifc"
+    model.transform_file(str(input_path), str(chained), strategy=strategy, operations=CHAIN)
+
+    current = input_path
+    for index, operation in enumerate(CHAIN):
+        step_output = tmp_path / f"step{index}.ifc"
+        model.transform_file(str(current), str(step_output), strategy=strategy, operations=[operation])
+        current = step_output
+
+    reference = load_placements(str(current))
+    assert reference
+    mismatches, deviation = compare_placements(reference, str(chained), TOLERANCE)
+    assert mismatches == 0, f"largest difference {deviation}"